@@ -1,12 +1,22 @@
-from flask import Flask, render_template, jsonify
+from flask import Flask, Request, current_app, render_template, jsonify
 from flask_mysqldb import MySQL
 from flask_cors import CORS
 from config import Config
 import os
 from werkzeug.utils import secure_filename
 
+class UploadRequest(Request):
+    """Request whose body limit is raised on the bulk upload endpoints"""
+
+    @property
+    def max_content_length(self):
+        if self.endpoint in current_app.config['LARGE_UPLOAD_ENDPOINTS']:
+            return current_app.config['LARGE_UPLOAD_MAX_CONTENT_LENGTH']
+        return super().max_content_length
+
 # Initialize Flask app
 app = Flask(__name__)
+app.request_class = UploadRequest
 app.config.from_object(Config)
 
 # Initialize MySQL
@@ -183,6 +193,36 @@ def athlete_feedback():
 def coach_give_feedback():
     return render_template('coach_give_feedback.html')
 
+# ========== MAINTENANCE COMMANDS ==========
+
+@app.cli.command('reconcile-ratings')
+def reconcile_ratings():
+    """Rebuild stored rating aggregates from feedback and coach reviews"""
+    from utils.ratings import reconcile_rating_aggregates
+    rebuilt = reconcile_rating_aggregates(mysql)
+    print(f'Rebuilt rating aggregates for {rebuilt} users')
+
+@app.cli.command('materialize-calendars')
+def materialize_calendars():
+    """Create dated session instances for every assigned workout plan"""
+    from utils.training_calendar import materialize_all_plans
+    plans, inserted = materialize_all_plans(mysql)
+    print(f'Scheduled {inserted} sessions across {plans} plans')
+
+@app.cli.command('rebuild-personal-records')
+def rebuild_personal_records_command():
+    """Recompute personal records from the full performance history"""
+    from utils.personal_records import rebuild_personal_records
+    stored = rebuild_personal_records(mysql)
+    print(f'Rebuilt {stored} personal records')
+
+@app.cli.command('rebuild-adherence')
+def rebuild_adherence_command():
+    """Recompute workout streaks and weekly adherence from the workout log and calendar"""
+    from utils.adherence import rebuild_adherence
+    athletes, weeks = rebuild_adherence(mysql)
+    print(f'Rebuilt streaks for {athletes} athletes and {weeks} weeks of adherence')
+
 # Error handlers
 @app.errorhandler(404)
 def not_found(error):
@@ -0,0 +1,148 @@
+"""
+Benchmark the consolidated, cached athlete analytics against the previous
+five-query implementation under concurrent load.
+
+Seeds --athletes athletes with --rows-per-athlete performance records and a
+few goals each, then fires --requests analytics requests from --concurrency
+threads through the Flask test client. Athletes are picked from a small hot
+set so repeated reads hit the cache, and a fraction of requests log a new
+performance record first so invalidation is exercised. Seeded users are
+removed again at the end.
+
+Usage:
+    MYSQL_DB=coachmeplay_test python benchmarks/bench_analytics.py --requests 5000 --concurrency 16
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, mysql
+from utils.athlete_analytics import analytics_cache
+
+EMAIL_PREFIX = 'bench-analytics-'
+
+
+def seed(cursor, athletes, rows_per_athlete):
+    cursor.executemany("""
+        INSERT INTO users (email, password_hash, user_type, full_name)
+        VALUES (%s, 'x', 'athlete', %s)
+    """, [(f'{EMAIL_PREFIX}{i}@example.com', f'Athlete {i}') for i in range(athletes)])
+    cursor.execute("SELECT user_id FROM users WHERE email LIKE %s", (f'{EMAIL_PREFIX}%',))
+    cursor.executemany("INSERT INTO athletes (user_id) VALUES (%s)", [(row['user_id'],) for row in cursor.fetchall()])
+    cursor.execute("""
+        SELECT a.athlete_id FROM athletes a JOIN users u ON a.user_id = u.user_id WHERE u.email LIKE %s
+    """, (f'{EMAIL_PREFIX}%',))
+    athlete_ids = [row['athlete_id'] for row in cursor.fetchall()]
+
+    today = date.today()
+    for athlete_id in athlete_ids:
+        cursor.executemany("""
+            INSERT INTO performance_tracking (athlete_id, date, metric_type, metric_value, unit)
+            VALUES (%s, %s, 'Distance', %s, 'km')
+        """, [(athlete_id, today - timedelta(days=random.randint(0, 365)), random.uniform(1, 20))
+              for _ in range(rows_per_athlete)])
+        cursor.executemany("""
+            INSERT INTO goals (athlete_id, goal_type, target_value, current_value, target_date, status)
+            VALUES (%s, 'distance', 100, 10, %s, %s)
+        """, [(athlete_id, today + timedelta(days=60), status) for status in ('active', 'active', 'completed')])
+
+    return athlete_ids
+
+
+def five_queries(cursor, athlete_id):
+    """The analytics endpoint as it was before consolidation"""
+    week_ago = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d')
+    cursor.execute("SELECT COUNT(*) as count FROM performance_tracking WHERE athlete_id = %s", (athlete_id,))
+    cursor.fetchone()
+    cursor.execute("""
+        SELECT COUNT(*) as count FROM performance_tracking WHERE athlete_id = %s AND date >= %s
+    """, (athlete_id, week_ago))
+    cursor.fetchone()
+    cursor.execute("""
+        SELECT DAYNAME(date) as day, COUNT(*) as count FROM performance_tracking
+        WHERE athlete_id = %s AND date >= %s GROUP BY DAYNAME(date)
+    """, (athlete_id, week_ago))
+    cursor.fetchall()
+    cursor.execute("SELECT COUNT(*) as count FROM goals WHERE athlete_id = %s AND status = 'active'", (athlete_id,))
+    cursor.fetchone()
+    cursor.execute("SELECT COUNT(*) as count FROM goals WHERE athlete_id = %s AND status = 'completed'", (athlete_id,))
+    cursor.fetchone()
+
+
+def run_load(fn, hot_ids, requests, concurrency):
+    latencies = []
+
+    def one(_):
+        athlete_id = random.choice(hot_ids)
+        started = time.perf_counter()
+        fn(athlete_id)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return requests / elapsed, statistics.median(latencies), latencies[int(len(latencies) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--athletes', type=int, default=200)
+    parser.add_argument('--rows-per-athlete', type=int, default=2000)
+    parser.add_argument('--hot-athletes', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--write-ratio', type=float, default=0.02)
+    args = parser.parse_args()
+
+    client = app.test_client()
+
+    with app.app_context():
+        cursor = mysql.connection.cursor()
+        athlete_ids = seed(cursor, args.athletes, args.rows_per_athlete)
+        mysql.connection.commit()
+        cursor.close()
+
+    hot_ids = athlete_ids[:args.hot_athletes]
+
+    def old_endpoint(athlete_id):
+        with app.app_context():
+            cursor = mysql.connection.cursor()
+            five_queries(cursor, athlete_id)
+            cursor.close()
+
+    def new_endpoint(athlete_id):
+        if random.random() < args.write_ratio:
+            client.post('/api/athlete/performance', json={
+                'athlete_id': athlete_id, 'date': date.today().isoformat(),
+                'metric_type': 'Distance', 'metric_value': 5, 'unit': 'km'
+            })
+        response = client.get(f'/api/athlete/analytics/{athlete_id}')
+        assert response.status_code == 200, response.json
+
+    try:
+        print(f'{args.athletes} athletes x {args.rows_per_athlete} records, {args.hot_athletes} hot, '
+              f'{args.requests} requests on {args.concurrency} threads')
+        for label, fn in (('five queries', old_endpoint), ('cached', new_endpoint)):
+            analytics_cache.clear()
+            throughput, median, p99 = run_load(fn, hot_ids, args.requests, args.concurrency)
+            print(f'{label:13} {throughput:8.0f} req/s  median {median:7.2f} ms  p99 {p99:7.2f} ms')
+    finally:
+        with app.app_context():
+            cursor = mysql.connection.cursor()
+            cursor.execute("DELETE FROM users WHERE email LIKE %s", (f'{EMAIL_PREFIX}%',))
+            mysql.connection.commit()
+            cursor.close()
+
+
+if __name__ == '__main__':
+    main()
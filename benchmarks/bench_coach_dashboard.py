@@ -0,0 +1,56 @@
+"""
+Compare coach page time-to-data: the old sequential fetches against the
+aggregated /api/coach/dashboard endpoint.
+
+Usage:
+    python benchmarks/bench_coach_dashboard.py --token <jwt> --user-id 18 --coach-id 2
+
+Needs a running app (python app.py) and a coach token from /api/auth/login.
+"""
+import argparse
+import statistics
+import time
+
+import requests
+
+
+def sequential(session, base, user_id, coach_id):
+    session.get(f'{base}/coach/coach-info/{user_id}').raise_for_status()
+    session.get(f'{base}/coach/my-athletes/{coach_id}').raise_for_status()
+    session.get(f'{base}/coach/analytics/{coach_id}').raise_for_status()
+    session.get(f'{base}/coach/coaching-requests/coach/{coach_id}').raise_for_status()
+
+
+def aggregated(session, base, user_id, coach_id):
+    session.get(f'{base}/coach/coach-info/{user_id}').raise_for_status()
+    session.get(f'{base}/coach/dashboard/{coach_id}').raise_for_status()
+
+
+def measure(fn, runs, *args):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn(*args)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), max(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--base', default='http://localhost:5000/api')
+    parser.add_argument('--token', required=True)
+    parser.add_argument('--user-id', type=int, required=True)
+    parser.add_argument('--coach-id', type=int, required=True)
+    parser.add_argument('--runs', type=int, default=50)
+    args = parser.parse_args()
+
+    session = requests.Session()
+    session.headers['Authorization'] = f'Bearer {args.token}'
+
+    for name, fn in (('sequential', sequential), ('dashboard', aggregated)):
+        median, worst = measure(fn, args.runs, session, args.base, args.user_id, args.coach_id)
+        print(f'{name:<12} median {median:7.1f} ms   max {worst:7.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+"""
+Benchmark the paginated people directory against the full recipient dump the
+compose dialog used to load (every user of the other role).
+
+Seeds one coach and --users athletes (default 100000), with a small roster and
+a few recent messages so the ranked part of the directory is exercised, times
+both access patterns through the Flask test client, then removes the seeded
+users again.
+
+Usage:
+    MYSQL_DB=coachmeplay_test python benchmarks/bench_directory.py --users 100000
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import string
+import sys
+import time
+from datetime import datetime, timedelta
+
+import jwt
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, mysql
+
+EMAIL_PREFIX = 'bench-directory-'
+BATCH_SIZE = 5000
+
+# The SQL behind the removed /api/coach/all-athletes endpoint
+FULL_DUMP_QUERY = """
+    SELECT u.user_id, u.full_name, u.profile_picture, a.athlete_id
+    FROM users u
+    JOIN athletes a ON u.user_id = a.user_id
+    WHERE u.user_type = 'athlete'
+    ORDER BY u.full_name
+"""
+
+
+def random_name():
+    first = ''.join(random.choices(string.ascii_lowercase, k=random.randint(4, 8))).title()
+    last = ''.join(random.choices(string.ascii_lowercase, k=random.randint(5, 10))).title()
+    return f'{first} {last}'
+
+
+def seed(cursor, users, roster_size, correspondents):
+    cursor.execute("""
+        INSERT INTO users (email, password_hash, user_type, full_name)
+        VALUES (%s, 'x', 'coach', 'Bench Coach')
+    """, (f'{EMAIL_PREFIX}coach@example.com',))
+    coach_user_id = cursor.lastrowid
+    cursor.execute("INSERT INTO coaches (user_id) VALUES (%s)", (coach_user_id,))
+    coach_id = cursor.lastrowid
+
+    for start in range(0, users, BATCH_SIZE):
+        cursor.executemany("""
+            INSERT INTO users (email, password_hash, user_type, full_name)
+            VALUES (%s, 'x', 'athlete', %s)
+        """, [(f'{EMAIL_PREFIX}{i}@example.com', random_name())
+              for i in range(start, min(start + BATCH_SIZE, users))])
+
+    cursor.execute("SELECT user_id FROM users WHERE email LIKE %s AND user_type = 'athlete'", (f'{EMAIL_PREFIX}%',))
+    user_ids = [row['user_id'] for row in cursor.fetchall()]
+
+    roster = set(random.sample(user_ids, roster_size))
+    for start in range(0, len(user_ids), BATCH_SIZE):
+        cursor.executemany("""
+            INSERT INTO athletes (user_id, coach_id) VALUES (%s, %s)
+        """, [(uid, coach_id if uid in roster else None) for uid in user_ids[start:start + BATCH_SIZE]])
+
+    cursor.executemany("""
+        INSERT INTO messages (sender_id, receiver_id, message_text) VALUES (%s, %s, 'Bench message')
+    """, [(coach_user_id, uid) for uid in random.sample(user_ids, correspondents)])
+
+    return coach_user_id, coach_id
+
+
+def cleanup(cursor):
+    cursor.execute("""
+        DELETE m FROM messages m JOIN users u ON m.sender_id = u.user_id WHERE u.email LIKE %s
+    """, (f'{EMAIL_PREFIX}%',))
+    cursor.execute("DELETE FROM users WHERE email LIKE %s", (f'{EMAIL_PREFIX}%',))
+
+
+def timed(fn, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--roster-size', type=int, default=30)
+    parser.add_argument('--correspondents', type=int, default=50)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    client = app.test_client()
+
+    with app.app_context():
+        cursor = mysql.connection.cursor()
+        coach_user_id, coach_id = seed(cursor, args.users, args.roster_size, args.correspondents)
+        mysql.connection.commit()
+
+        token = jwt.encode({
+            'user_id': coach_user_id,
+            'user_type': 'coach',
+            'email': f'{EMAIL_PREFIX}coach@example.com',
+            'coach_id': coach_id,
+            'exp': datetime.utcnow() + timedelta(hours=1)
+        }, app.config['JWT_SECRET_KEY'], algorithm='HS256')
+        headers = {'Authorization': f'Bearer {token}'}
+
+        def full_dump():
+            cursor.execute(FULL_DUMP_QUERY)
+            return cursor.fetchall()
+
+        def directory(query, page):
+            response = client.get(f'/api/messages/directory?q={query}&page={page}', headers=headers)
+            assert response.status_code == 200, response.json
+            return response
+
+        try:
+            dump_payload = len(json.dumps(list(full_dump()), default=str))
+            print(f'{args.users} athletes')
+            print(f'full dump                median {timed(full_dump, args.runs):9.1f} ms  '
+                  f'payload {dump_payload / 1024:9.1f} KiB')
+
+            for query, page in (('', 1), ('', 50), ('a', 1), ('ma', 1), ('mar', 3), ('zzzz', 1)):
+                payload = len(directory(query, page).data)
+                elapsed = timed(lambda: directory(query, page), args.runs)
+                print(f'directory q={query!r:7} p={page:<3} median {elapsed:9.1f} ms  '
+                      f'payload {payload / 1024:9.1f} KiB')
+        finally:
+            cleanup(cursor)
+            mysql.connection.commit()
+            cursor.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark bulk performance ingestion against one POST per record.
+
+Seeds one athlete, streams --rows records (default 50000) as CSV and as JSON
+Lines through /api/athlete/performance/bulk, re-sends the CSV upload to time
+the dedupe path, times --single-rows records through the old single-record
+endpoint for comparison, then removes the seeded user again.
+
+Usage:
+    MYSQL_DB=coachmeplay_test python benchmarks/bench_ingest.py --rows 50000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+import jwt
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, mysql
+
+EMAIL_PREFIX = 'bench-ingest-'
+METRICS = [('Distance', 'km'), ('Heart Rate', 'bpm'), ('Weight Lifted', 'kg')]
+
+
+def seed(cursor):
+    cursor.execute("""
+        INSERT INTO users (email, password_hash, user_type, full_name)
+        VALUES (%s, 'x', 'athlete', 'Bench Athlete')
+    """, (f'{EMAIL_PREFIX}athlete@example.com',))
+    user_id = cursor.lastrowid
+    cursor.execute("INSERT INTO athletes (user_id) VALUES (%s)", (user_id,))
+    return user_id, cursor.lastrowid
+
+
+def make_records(rows, key_prefix):
+    start = date.today() - timedelta(days=rows)
+    for i in range(rows):
+        metric_type, unit = random.choice(METRICS)
+        yield {
+            'date': (start + timedelta(days=i % 3650)).isoformat(),
+            'metric_type': metric_type,
+            'metric_value': round(random.uniform(1, 200), 2),
+            'unit': unit,
+            'dedupe_key': f'{key_prefix}-{i}',
+        }
+
+
+def csv_body(records):
+    lines = ['date,metric_type,metric_value,unit,dedupe_key']
+    lines.extend(f"{r['date']},{r['metric_type']},{r['metric_value']},{r['unit']},{r['dedupe_key']}" for r in records)
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def jsonl_body(records):
+    return ''.join(json.dumps(r) + '\n' for r in records).encode('utf-8')
+
+
+def cleanup(cursor):
+    cursor.execute("DELETE FROM users WHERE email LIKE %s", (f'{EMAIL_PREFIX}%',))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--single-rows', type=int, default=500)
+    args = parser.parse_args()
+
+    client = app.test_client()
+
+    with app.app_context():
+        cursor = mysql.connection.cursor()
+        user_id, athlete_id = seed(cursor)
+        mysql.connection.commit()
+
+        token = jwt.encode({
+            'user_id': user_id,
+            'user_type': 'athlete',
+            'email': f'{EMAIL_PREFIX}athlete@example.com',
+            'exp': datetime.utcnow() + timedelta(hours=1)
+        }, app.config['JWT_SECRET_KEY'], algorithm='HS256')
+        headers = {'Authorization': f'Bearer {token}'}
+
+        def upload(body, content_type):
+            started = time.perf_counter()
+            response = client.post(
+                f'/api/athlete/performance/bulk?athlete_id={athlete_id}',
+                data=body, headers=dict(headers, **{'Content-Type': content_type})
+            )
+            elapsed = time.perf_counter() - started
+            assert response.status_code == 200, response.json
+            return response.json, elapsed
+
+        try:
+            uploads = (
+                ('csv', csv_body(make_records(args.rows, 'csv')), 'text/csv'),
+                ('jsonl', jsonl_body(make_records(args.rows, 'jsonl')), 'application/x-ndjson'),
+            )
+            csv_upload = uploads[0][1]
+            for label, body, content_type in uploads:
+                report, elapsed = upload(body, content_type)
+                print(f'bulk {label:6} {report["inserted"]:7d} inserted  {elapsed:7.2f} s  '
+                      f'{report["received"] / elapsed:9.0f} rows/s  ({len(body) / 1048576:.1f} MiB)')
+
+            report, elapsed = upload(csv_upload, 'text/csv')
+            print(f're-upload     {report["duplicates"]:7d} duplicates {elapsed:6.2f} s  '
+                  f'{report["received"] / elapsed:9.0f} rows/s')
+
+            started = time.perf_counter()
+            for record in make_records(args.single_rows, 'single'):
+                response = client.post('/api/athlete/performance', json=dict(record, athlete_id=athlete_id))
+                assert response.status_code == 201, response.json
+            elapsed = time.perf_counter() - started
+            print(f'single POSTs  {args.single_rows:7d} inserted  {elapsed:7.2f} s  '
+                  f'{args.single_rows / elapsed:9.0f} rows/s')
+        finally:
+            cleanup(cursor)
+            mysql.connection.commit()
+            cursor.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""
+Benchmark the enriched coach roster against the per-athlete follow-up calls
+the students/analytics pages used to make.
+
+Seeds one coach with --athletes athletes (default 1000) plus performance,
+workout log, goal, assignment and message rows into the configured database,
+times both access patterns through the Flask test client, then removes the
+seeded users again.
+
+Usage:
+    MYSQL_DB=coachmeplay_test python benchmarks/bench_roster.py --athletes 1000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, mysql
+
+EMAIL_PREFIX = 'bench-roster-'
+
+
+def seed(cursor, athletes, rows_per_athlete):
+    cursor.execute("""
+        INSERT INTO users (email, password_hash, user_type, full_name)
+        VALUES (%s, 'x', 'coach', 'Bench Coach')
+    """, (f'{EMAIL_PREFIX}coach@example.com',))
+    coach_user_id = cursor.lastrowid
+    cursor.execute("INSERT INTO coaches (user_id) VALUES (%s)", (coach_user_id,))
+    coach_id = cursor.lastrowid
+
+    cursor.execute("""
+        INSERT INTO workout_plans (coach_id, plan_name) VALUES (%s, 'Bench plan')
+    """, (coach_id,))
+    plan_id = cursor.lastrowid
+    cursor.execute("""
+        INSERT INTO workout_sessions (plan_id, session_name, day_number) VALUES (%s, 'Bench session', 1)
+    """, (plan_id,))
+    session_id = cursor.lastrowid
+
+    cursor.executemany("""
+        INSERT INTO users (email, password_hash, user_type, full_name)
+        VALUES (%s, 'x', 'athlete', %s)
+    """, [(f'{EMAIL_PREFIX}{i}@example.com', f'Athlete {i:05d}') for i in range(athletes)])
+    cursor.execute("SELECT user_id FROM users WHERE email LIKE %s AND user_type = 'athlete'", (f'{EMAIL_PREFIX}%',))
+    user_ids = [row['user_id'] for row in cursor.fetchall()]
+
+    cursor.executemany("""
+        INSERT INTO athletes (user_id, coach_id, sport_type, skill_level) VALUES (%s, %s, %s, %s)
+    """, [(uid, coach_id, random.choice(['running', 'swimming', 'cycling']),
+           random.choice(['beginner', 'intermediate', 'advanced'])) for uid in user_ids])
+    cursor.execute("SELECT athlete_id, user_id FROM athletes WHERE coach_id = %s", (coach_id,))
+    roster = cursor.fetchall()
+
+    today = date.today()
+    performance, logs, goals, assignments, messages = [], [], [], [], []
+    for athlete in roster:
+        for _ in range(rows_per_athlete):
+            day = today - timedelta(days=random.randint(0, 120))
+            performance.append((athlete['athlete_id'], day, 'sprint_100m', random.uniform(10, 15), 's'))
+            logs.append((athlete['athlete_id'], session_id, day, 'completed'))
+        goals.append((athlete['athlete_id'], 'sprint', 11, 12, today + timedelta(days=60), 'active'))
+        assignments.append((coach_id, athlete['athlete_id'], 'Bench task', today + timedelta(days=7), 'pending'))
+        messages.append((coach_user_id, athlete['user_id'], 'Bench message'))
+
+    cursor.executemany("""
+        INSERT INTO performance_tracking (athlete_id, date, metric_type, metric_value, unit)
+        VALUES (%s, %s, %s, %s, %s)
+    """, performance)
+    cursor.executemany("""
+        INSERT INTO workout_logs (athlete_id, session_id, completed_date, completion_status)
+        VALUES (%s, %s, %s, %s)
+    """, logs)
+    cursor.executemany("""
+        INSERT INTO goals (athlete_id, goal_type, target_value, current_value, target_date, status)
+        VALUES (%s, %s, %s, %s, %s, %s)
+    """, goals)
+    cursor.executemany("""
+        INSERT INTO coach_assignments (coach_id, athlete_id, task_title, due_date, status)
+        VALUES (%s, %s, %s, %s, %s)
+    """, assignments)
+    cursor.executemany("""
+        INSERT INTO messages (sender_id, receiver_id, message_text) VALUES (%s, %s, %s)
+    """, messages)
+
+    return coach_id, [athlete['athlete_id'] for athlete in roster]
+
+
+def cleanup(cursor, coach_id):
+    cursor.execute("DELETE FROM coach_assignments WHERE coach_id = %s", (coach_id,))
+    cursor.execute("DELETE FROM workout_plans WHERE coach_id = %s", (coach_id,))
+    cursor.execute("""
+        DELETE m FROM messages m JOIN users u ON m.sender_id = u.user_id WHERE u.email LIKE %s
+    """, (f'{EMAIL_PREFIX}%',))
+    cursor.execute("DELETE FROM users WHERE email LIKE %s", (f'{EMAIL_PREFIX}%',))
+
+
+def timed(fn, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--athletes', type=int, default=1000)
+    parser.add_argument('--rows-per-athlete', type=int, default=20)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    client = app.test_client()
+
+    with app.app_context():
+        cursor = mysql.connection.cursor()
+        coach_id, athlete_ids = seed(cursor, args.athletes, args.rows_per_athlete)
+        mysql.connection.commit()
+
+        def follow_up_calls():
+            client.get(f'/api/coach/my-athletes/{coach_id}')
+            for athlete_id in athlete_ids:
+                client.get(f'/api/athlete/analytics/{athlete_id}')
+                client.get(f'/api/coach/assignments/athlete/{athlete_id}')
+
+        def roster_view():
+            response = client.get(f'/api/coach/roster/{coach_id}?sort=last_performance_date&order=desc')
+            assert response.status_code == 200, response.json
+
+        try:
+            response = client.get(f'/api/coach/roster/{coach_id}')
+            payload = len(response.data)
+            print(f'{args.athletes} athletes, roster payload {payload / 1024:.1f} KiB')
+            print(f'per-athlete calls  median {timed(follow_up_calls, args.runs):9.1f} ms')
+            print(f'roster view        median {timed(roster_view, args.runs):9.1f} ms')
+        finally:
+            cleanup(cursor, coach_id)
+            mysql.connection.commit()
+            cursor.close()
+
+
+if __name__ == '__main__':
+    main()
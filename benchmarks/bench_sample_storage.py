@@ -0,0 +1,128 @@
+"""
+Benchmark storage per hour of 1 Hz samples: compressed sample-stream blobs
+against one performance_tracking row per sample.
+
+Synthesizes --hours hours of heart-rate and speed data. The encoded blob sizes
+are always reported. With --db, both layouts are also written to the
+configured database and their on-disk size is read from information_schema
+before the seeded athlete is removed again.
+
+Usage:
+    python benchmarks/bench_sample_storage.py --hours 1
+    MYSQL_DB=coachmeplay_test python benchmarks/bench_sample_storage.py --hours 10 --db
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from datetime import date, datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.sample_streams import SAMPLE_CHANNELS, decode_stream, encode_stream
+
+EMAIL_PREFIX = 'bench-samples-'
+BATCH_SIZE = 5000
+
+
+def synthesize(seconds):
+    """Heart rate drifting around effort changes, speed with GPS jitter"""
+    heart_rate, speed = [], []
+    for second in range(seconds):
+        effort = 0.5 + 0.4 * math.sin(second / 600)
+        heart_rate.append(round(110 + 60 * effort + random.gauss(0, 1.5)))
+        speed.append(max(0.0, 2.5 + 1.5 * effort + random.gauss(0, 0.15)))
+    return {'heart_rate': heart_rate, 'speed': speed}
+
+
+def table_bytes(cursor, table):
+    cursor.execute(f"ANALYZE TABLE {table}")
+    cursor.fetchall()
+    cursor.execute("""
+        SELECT data_length + index_length AS size
+        FROM information_schema.tables
+        WHERE table_schema = DATABASE() AND table_name = %s
+    """, (table,))
+    return int(cursor.fetchone()['size'])
+
+
+def measure_database(series, seconds, hours):
+    from app import app, mysql
+
+    with app.app_context():
+        cursor = mysql.connection.cursor()
+        try:
+            cursor.execute("""
+                INSERT INTO users (email, password_hash, user_type, full_name)
+                VALUES (%s, 'x', 'athlete', 'Bench Athlete')
+            """, (f'{EMAIL_PREFIX}athlete@example.com',))
+            cursor.execute("INSERT INTO athletes (user_id) VALUES (%s)", (cursor.lastrowid,))
+            athlete_id = cursor.lastrowid
+            cursor.execute("""
+                INSERT INTO activity_imports (athlete_id, file_format, file_name, file_sha1, status)
+                VALUES (%s, 'gpx', 'bench.gpx', '', 'completed')
+            """, (athlete_id,))
+            import_id = cursor.lastrowid
+            mysql.connection.commit()
+
+            rows_before = table_bytes(cursor, 'performance_tracking')
+            today = date.today()
+            for channel, values in series.items():
+                for start in range(0, seconds, BATCH_SIZE):
+                    cursor.executemany("""
+                        INSERT INTO performance_tracking (athlete_id, date, metric_type, metric_value, unit)
+                        VALUES (%s, %s, %s, %s, %s)
+                    """, [(athlete_id, today, channel, value, SAMPLE_CHANNELS[channel][0])
+                          for value in values[start:start + BATCH_SIZE]])
+            mysql.connection.commit()
+            rows_after = table_bytes(cursor, 'performance_tracking')
+
+            streams_before = table_bytes(cursor, 'activity_sample_streams')
+            cursor.executemany("""
+                INSERT INTO activity_sample_streams
+                (athlete_id, import_id, channel, started_at, sample_count, value_scale, samples)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+            """, [(athlete_id, import_id, channel, datetime.now(), seconds, SAMPLE_CHANNELS[channel][1],
+                   encode_stream(range(seconds), values, SAMPLE_CHANNELS[channel][1]))
+                  for channel, values in series.items()])
+            mysql.connection.commit()
+            streams_after = table_bytes(cursor, 'activity_sample_streams')
+
+            print(f'row per sample  {(rows_after - rows_before) / hours / 1024:10.1f} KiB/hour on disk')
+            print(f'sample streams  {(streams_after - streams_before) / hours / 1024:10.1f} KiB/hour on disk '
+                  f'(page granularity; use --hours 10+ for a stable figure)')
+        finally:
+            cursor.execute("DELETE FROM users WHERE email LIKE %s", (f'{EMAIL_PREFIX}%',))
+            mysql.connection.commit()
+            cursor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--hours', type=int, default=1)
+    parser.add_argument('--db', action='store_true')
+    args = parser.parse_args()
+
+    seconds = args.hours * 3600
+    series = synthesize(seconds)
+
+    print(f'{args.hours} h at 1 Hz, {len(series)} channels, {seconds} samples each')
+    for channel, values in series.items():
+        scale = SAMPLE_CHANNELS[channel][1]
+        started = time.perf_counter()
+        blob = encode_stream(range(seconds), values, scale)
+        encode_ms = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        decode_stream(blob, scale)
+        decode_ms = (time.perf_counter() - started) * 1000
+        print(f'{channel:11} blob {len(blob) / args.hours / 1024:8.1f} KiB/hour  '
+              f'({len(blob) / seconds:.2f} B/sample)  encode {encode_ms:6.1f} ms  decode {decode_ms:6.1f} ms')
+
+    if args.db:
+        measure_database(series, seconds, args.hours)
+
+
+if __name__ == '__main__':
+    main()
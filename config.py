@@ -20,3 +20,24 @@ class Config:
     UPLOAD_FOLDER = 'static/uploads/profiles'
     MAX_CONTENT_LENGTH = 5 * 1024 * 1024
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
+    
+    # Body limit for the bulk upload routes instead of MAX_CONTENT_LENGTH. A GPX
+    # track costs about 200 bytes per point, so a 10 hour ride at 1 s sampling
+    # is around 7 MB; performance CSV/JSONL uploads stream through the same cap.
+    # A reverse proxy in front of the app (nginx client_max_body_size) must allow
+    # at least this much on these paths.
+    LARGE_UPLOAD_MAX_CONTENT_LENGTH = 64 * 1024 * 1024
+    LARGE_UPLOAD_ENDPOINTS = ('athlete.import_activity', 'athlete.bulk_add_performance')
+    
+    # Activity files wait here until the import worker pool has processed them
+    ACTIVITY_UPLOAD_FOLDER = 'uploads/activities'
+    
+    # Metrics with personal records and metric-linked goals, and which direction is better
+    RECORD_METRICS = {
+        'Distance': 'higher',
+        'Time': 'lower',
+        'Pace': 'lower',
+        'Speed': 'higher',
+        'Weight Lifted': 'higher',
+        'Repetitions': 'higher',
+    }
@@ -0,0 +1,56 @@
+-- Meal plans built by coaches for their athletes.
+-- Per-day and per-plan macro totals are computed once when the plan is written
+-- so athlete reads never re-aggregate items or recipes.
+
+CREATE TABLE IF NOT EXISTS meal_plans (
+    meal_plan_id INT AUTO_INCREMENT PRIMARY KEY,
+    coach_id INT NOT NULL,
+    athlete_id INT NOT NULL,
+    plan_name VARCHAR(255) NOT NULL,
+    description TEXT,
+    target_calories INT,
+    target_protein INT,
+    target_carbs INT,
+    target_fats INT,
+    total_days INT NOT NULL DEFAULT 1,
+    total_calories DECIMAL(10,2) NOT NULL DEFAULT 0,
+    total_protein DECIMAL(8,2) NOT NULL DEFAULT 0,
+    total_carbs DECIMAL(8,2) NOT NULL DEFAULT 0,
+    total_fats DECIMAL(8,2) NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (coach_id) REFERENCES coaches(coach_id) ON DELETE CASCADE,
+    FOREIGN KEY (athlete_id) REFERENCES athletes(athlete_id) ON DELETE CASCADE,
+    INDEX idx_coach_created (coach_id, created_at),
+    INDEX idx_athlete_created (athlete_id, created_at)
+);
+
+CREATE TABLE IF NOT EXISTS meal_plan_days (
+    day_id INT AUTO_INCREMENT PRIMARY KEY,
+    meal_plan_id INT NOT NULL,
+    day_number INT NOT NULL,
+    total_calories DECIMAL(10,2) NOT NULL DEFAULT 0,
+    total_protein DECIMAL(8,2) NOT NULL DEFAULT 0,
+    total_carbs DECIMAL(8,2) NOT NULL DEFAULT 0,
+    total_fats DECIMAL(8,2) NOT NULL DEFAULT 0,
+    FOREIGN KEY (meal_plan_id) REFERENCES meal_plans(meal_plan_id) ON DELETE CASCADE,
+    UNIQUE KEY uq_plan_day (meal_plan_id, day_number)
+);
+
+CREATE TABLE IF NOT EXISTS meal_plan_items (
+    item_id INT AUTO_INCREMENT PRIMARY KEY,
+    day_id INT NOT NULL,
+    meal_type ENUM('breakfast', 'lunch', 'dinner', 'snack') NOT NULL,
+    recipe_id INT NULL,
+    meal_name VARCHAR(255),
+    servings DECIMAL(5,2) NOT NULL DEFAULT 1,
+    calories DECIMAL(8,2) NOT NULL DEFAULT 0,
+    protein DECIMAL(6,2) NOT NULL DEFAULT 0,
+    carbs DECIMAL(6,2) NOT NULL DEFAULT 0,
+    fats DECIMAL(6,2) NOT NULL DEFAULT 0,
+    ingredients TEXT,
+    instructions TEXT,
+    order_number INT,
+    FOREIGN KEY (day_id) REFERENCES meal_plan_days(day_id) ON DELETE CASCADE,
+    INDEX idx_day_order (day_id, order_number),
+    INDEX idx_recipe (recipe_id)
+);
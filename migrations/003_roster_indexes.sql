@@ -0,0 +1,8 @@
+-- Access paths for the coach roster view (/api/coach/roster/<coach_id>).
+-- Each grouped subquery in that view reads one of these ranges per athlete.
+
+CREATE INDEX idx_workout_logs_athlete_date ON workout_logs (athlete_id, completed_date);
+CREATE INDEX idx_goals_athlete_status ON goals (athlete_id, status);
+CREATE INDEX idx_assignments_coach_status ON coach_assignments (coach_id, status, athlete_id);
+CREATE INDEX idx_messages_sender_receiver ON messages (sender_id, receiver_id, sent_at);
+CREATE INDEX idx_messages_receiver_sender ON messages (receiver_id, sender_id, sent_at);
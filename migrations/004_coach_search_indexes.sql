@@ -0,0 +1,9 @@
+-- Indexes for filtering the coach directory in SQL (specialization, rate,
+-- experience, rating) and full-text lookups over bio and certifications.
+-- /api/coach/search itself is served from the in-memory index in utils/coach_search.py.
+
+CREATE INDEX idx_coaches_specialization ON coaches (specialization);
+CREATE INDEX idx_coaches_rate ON coaches (hourly_rate);
+CREATE INDEX idx_coaches_experience ON coaches (experience_years);
+CREATE INDEX idx_coaches_rating ON coaches (rating, total_reviews);
+CREATE FULLTEXT INDEX ft_coaches_bio_certifications ON coaches (bio, certifications);
@@ -0,0 +1,43 @@
+-- Stored rating aggregates, one row per rated user. Athletes are rated by
+-- their coach's feedback (feedback.performance_rating, seeded below); coaches
+-- are rated by their athletes through coach_reviews, which starts empty, and
+-- their aggregate is copied into coaches.rating / total_reviews as reviews
+-- arrive. Both are maintained in the same transaction as the feedback or
+-- review write; `flask reconcile-ratings` rebuilds them from their sources.
+
+CREATE TABLE IF NOT EXISTS rating_aggregates (
+    user_id INT PRIMARY KEY,
+    rating_count INT NOT NULL DEFAULT 0,
+    rating_sum INT NOT NULL DEFAULT 0,
+    rating_1 INT NOT NULL DEFAULT 0,
+    rating_2 INT NOT NULL DEFAULT 0,
+    rating_3 INT NOT NULL DEFAULT 0,
+    rating_4 INT NOT NULL DEFAULT 0,
+    rating_5 INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+);
+
+-- One review per athlete and coach; a second submission replaces the first
+CREATE TABLE IF NOT EXISTS coach_reviews (
+    review_id INT AUTO_INCREMENT PRIMARY KEY,
+    coach_id INT NOT NULL,
+    athlete_id INT NOT NULL,
+    rating TINYINT NOT NULL,
+    review_text TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (coach_id) REFERENCES coaches(coach_id) ON DELETE CASCADE,
+    FOREIGN KEY (athlete_id) REFERENCES athletes(athlete_id) ON DELETE CASCADE,
+    UNIQUE KEY uq_coach_reviews_coach_athlete (coach_id, athlete_id),
+    INDEX idx_coach_reviews_athlete (athlete_id)
+);
+
+-- Seed athlete aggregates from existing feedback
+INSERT INTO rating_aggregates (user_id, rating_count, rating_sum, rating_1, rating_2, rating_3, rating_4, rating_5)
+SELECT athlete_id, COUNT(*), SUM(performance_rating),
+       SUM(performance_rating = 1), SUM(performance_rating = 2), SUM(performance_rating = 3),
+       SUM(performance_rating = 4), SUM(performance_rating = 5)
+FROM feedback
+WHERE performance_rating IS NOT NULL
+GROUP BY athlete_id;
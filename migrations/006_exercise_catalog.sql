@@ -0,0 +1,36 @@
+-- Normalized exercise catalog referenced by workout_exercises.
+-- normalized_name is lowercase words separated by single spaces (see
+-- utils/exercise_catalog.normalize_exercise_name), so "Bench-Press" and
+-- "bench press" share one entry.
+
+CREATE TABLE IF NOT EXISTS exercises (
+    exercise_id INT AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    normalized_name VARCHAR(255) NOT NULL,
+    category VARCHAR(100),
+    created_by INT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_exercises_normalized_name (normalized_name),
+    FOREIGN KEY (created_by) REFERENCES coaches(coach_id) ON DELETE SET NULL
+);
+
+ALTER TABLE workout_exercises
+    ADD COLUMN exercise_id INT NULL AFTER session_id,
+    ADD INDEX idx_workout_exercises_exercise (exercise_id),
+    ADD CONSTRAINT fk_workout_exercises_exercise
+        FOREIGN KEY (exercise_id) REFERENCES exercises(exercise_id) ON DELETE SET NULL;
+
+-- Seed the catalog from existing free-text names. Punctuation is collapsed to
+-- single spaces the same way the application normalizes new names.
+INSERT IGNORE INTO exercises (name, normalized_name)
+SELECT MIN(TRIM(exercise_name)),
+       TRIM(REGEXP_REPLACE(LOWER(exercise_name), '[^a-z0-9]+', ' '))
+FROM workout_exercises
+WHERE TRIM(REGEXP_REPLACE(LOWER(exercise_name), '[^a-z0-9]+', ' ')) <> ''
+GROUP BY TRIM(REGEXP_REPLACE(LOWER(exercise_name), '[^a-z0-9]+', ' '));
+
+UPDATE workout_exercises we
+JOIN exercises e
+  ON e.normalized_name = TRIM(REGEXP_REPLACE(LOWER(we.exercise_name), '[^a-z0-9]+', ' '))
+SET we.exercise_id = e.exercise_id,
+    we.exercise_name = e.name;
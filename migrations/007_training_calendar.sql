@@ -0,0 +1,27 @@
+-- Dated session instances materialized when a workout plan is assigned.
+-- "Today"/"this week" read (athlete_id, scheduled_date); missed sessions read
+-- (athlete_id, status, due_date). Run `flask materialize-calendars` after this
+-- migration to backfill plans that were assigned before it.
+
+ALTER TABLE workout_plans ADD COLUMN start_date DATE NULL;
+
+CREATE TABLE IF NOT EXISTS athlete_session_instances (
+    instance_id INT AUTO_INCREMENT PRIMARY KEY,
+    athlete_id INT NOT NULL,
+    plan_id INT NOT NULL,
+    session_id INT NOT NULL,
+    scheduled_date DATE NOT NULL,
+    due_date DATE NOT NULL,
+    status ENUM('scheduled', 'completed', 'partial', 'skipped') NOT NULL DEFAULT 'scheduled',
+    log_id INT NULL,
+    completed_at TIMESTAMP NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_instance_session_date (athlete_id, session_id, scheduled_date),
+    INDEX idx_instances_athlete_date (athlete_id, scheduled_date),
+    INDEX idx_instances_athlete_status_due (athlete_id, status, due_date),
+    INDEX idx_instances_plan_status (plan_id, status),
+    FOREIGN KEY (athlete_id) REFERENCES athletes(athlete_id) ON DELETE CASCADE,
+    FOREIGN KEY (plan_id) REFERENCES workout_plans(plan_id) ON DELETE CASCADE,
+    FOREIGN KEY (session_id) REFERENCES workout_sessions(session_id) ON DELETE CASCADE,
+    FOREIGN KEY (log_id) REFERENCES workout_logs(log_id) ON DELETE SET NULL
+);
@@ -0,0 +1,12 @@
+-- Precomputed public coach profile documents served by
+-- /api/coach/public-profile/<coach_id>. Rebuilt by the application whenever
+-- the coach's profile, ratings or roster change; etag is the MD5
+-- of the stored JSON body. Missing rows are built on first request.
+
+CREATE TABLE IF NOT EXISTS coach_profile_documents (
+    coach_id INT PRIMARY KEY,
+    document MEDIUMTEXT NOT NULL,
+    etag CHAR(32) NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (coach_id) REFERENCES coaches(coach_id) ON DELETE CASCADE
+);
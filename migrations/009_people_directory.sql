@@ -0,0 +1,7 @@
+-- Name-prefix directory search for /api/messages/directory. The stored
+-- normalized name lets "LIKE 'prefix%'" within one user type be answered in
+-- name order straight from the index instead of scanning and sorting users.
+
+ALTER TABLE users
+    ADD COLUMN full_name_normalized VARCHAR(255) AS (LOWER(TRIM(full_name))) STORED,
+    ADD INDEX idx_users_type_name (user_type, full_name_normalized);
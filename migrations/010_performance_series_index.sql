@@ -0,0 +1,6 @@
+-- Covering access path for /api/athlete/performance/series. Bucket aggregates
+-- and LTTB reads for one athlete and metric over a date range are answered
+-- from this index alone (performance_id rides along as the primary key).
+
+CREATE INDEX idx_performance_athlete_metric_date
+    ON performance_tracking (athlete_id, metric_type, date, metric_value);
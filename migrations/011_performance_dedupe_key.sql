@@ -0,0 +1,7 @@
+-- Client-supplied dedupe keys for /api/athlete/performance/bulk. Re-sending an
+-- upload skips rows whose key is already stored for the athlete; rows without
+-- a key (NULL) are never treated as duplicates.
+
+ALTER TABLE performance_tracking
+    ADD COLUMN dedupe_key VARCHAR(64) NULL,
+    ADD UNIQUE INDEX uq_performance_athlete_dedupe (athlete_id, dedupe_key);
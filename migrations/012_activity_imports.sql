@@ -0,0 +1,19 @@
+-- GPX/TCX activity imports (/api/athlete/activities/import). Each upload is
+-- queued here and processed by the import worker pool, which writes the
+-- activity summary as performance_tracking rows keyed by the file hash.
+
+CREATE TABLE IF NOT EXISTS activity_imports (
+    import_id INT AUTO_INCREMENT PRIMARY KEY,
+    athlete_id INT NOT NULL,
+    file_format ENUM('gpx', 'tcx') NOT NULL,
+    file_name VARCHAR(255),
+    file_sha1 CHAR(40) NOT NULL,
+    status ENUM('queued', 'processing', 'completed', 'failed') DEFAULT 'queued',
+    activity_date DATE NULL,
+    summary TEXT NULL,
+    error VARCHAR(500) NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    completed_at TIMESTAMP NULL,
+    FOREIGN KEY (athlete_id) REFERENCES athletes(athlete_id) ON DELETE CASCADE,
+    INDEX idx_activity_imports_athlete (athlete_id, created_at)
+);
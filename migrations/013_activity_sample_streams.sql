@@ -0,0 +1,17 @@
+-- Per-second sample streams of imported activities, one row per channel
+-- (heart_rate, speed, elevation, distance). samples holds second offsets and
+-- values (stored as round(value * value_scale)) as delta-encoded zigzag
+-- varints compressed with zlib; see utils/sample_streams.py.
+
+CREATE TABLE IF NOT EXISTS activity_sample_streams (
+    athlete_id INT NOT NULL,
+    import_id INT NOT NULL,
+    channel VARCHAR(32) NOT NULL,
+    started_at DATETIME NOT NULL,
+    sample_count INT NOT NULL,
+    value_scale INT NOT NULL,
+    samples MEDIUMBLOB NOT NULL,
+    PRIMARY KEY (athlete_id, import_id, channel),
+    FOREIGN KEY (athlete_id) REFERENCES athletes(athlete_id) ON DELETE CASCADE,
+    FOREIGN KEY (import_id) REFERENCES activity_imports(import_id) ON DELETE CASCADE
+);
@@ -0,0 +1,17 @@
+-- Personal best per athlete and metric, maintained by the application in the
+-- same transaction as the performance_tracking insert. Only the metrics in
+-- RECORD_METRICS (app config, defaulting to utils/personal_records.py) get
+-- records, and that setting also says whether higher or lower is better.
+-- Backfill or repair with: flask rebuild-personal-records
+
+CREATE TABLE IF NOT EXISTS personal_records (
+    athlete_id INT NOT NULL,
+    metric_type VARCHAR(100) NOT NULL,
+    best_value DECIMAL(10,2) NOT NULL,
+    best_date DATE NOT NULL,
+    previous_value DECIMAL(10,2) NULL,
+    previous_date DATE NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (athlete_id, metric_type),
+    FOREIGN KEY (athlete_id) REFERENCES athletes(athlete_id) ON DELETE CASCADE
+);
@@ -0,0 +1,13 @@
+-- Goals optionally linked to a tracked metric. When a performance_tracking row
+-- for that metric arrives (single insert, bulk upload or activity import), the
+-- application advances current_value in the same transaction and completes the
+-- goal once the target is reached. last_metric_date is the newest record counted.
+--
+-- The index answers "active goals of this athlete on these metrics" directly,
+-- so an insert never scans the athlete's other goals.
+
+ALTER TABLE goals
+    ADD COLUMN metric_type VARCHAR(100) NULL,
+    ADD COLUMN metric_aggregation ENUM('best', 'latest', 'total') NOT NULL DEFAULT 'best',
+    ADD COLUMN last_metric_date DATE NULL,
+    ADD INDEX idx_goals_athlete_metric_status (athlete_id, metric_type, status);
@@ -0,0 +1,26 @@
+-- Per-athlete training streaks and planned-versus-completed counts per week
+-- (weeks start on Monday). Both are maintained by the application: logging a
+-- session updates them by primary key, and assigning or rescheduling a plan
+-- recounts `planned` for the affected weeks. Roster and analytics read these
+-- rows instead of the workout log history.
+-- Backfill or repair with: flask rebuild-adherence
+
+CREATE TABLE IF NOT EXISTS athlete_streaks (
+    athlete_id INT PRIMARY KEY,
+    current_streak INT NOT NULL DEFAULT 0,
+    longest_streak INT NOT NULL DEFAULT 0,
+    streak_start DATE NULL,
+    last_active_date DATE NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (athlete_id) REFERENCES athletes(athlete_id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS athlete_weekly_adherence (
+    athlete_id INT NOT NULL,
+    week_start DATE NOT NULL,
+    planned INT NOT NULL DEFAULT 0,
+    completed INT NOT NULL DEFAULT 0,
+    skipped INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (athlete_id, week_start),
+    FOREIGN KEY (athlete_id) REFERENCES athletes(athlete_id) ON DELETE CASCADE
+);
@@ -0,0 +1,30 @@
+-- Offline session sync (/api/athlete/sessions/sync). Clients queue sessions
+-- and per-exercise set results under ids they generate; the unique keys make
+-- a replayed queue a no-op instead of a second log. Logs written by
+-- /log-workout have no client id (NULL) and are never treated as duplicates.
+
+ALTER TABLE workout_logs
+    ADD COLUMN client_log_id VARCHAR(64) NULL,
+    ADD UNIQUE INDEX uq_workout_logs_athlete_client (athlete_id, client_log_id);
+
+CREATE TABLE IF NOT EXISTS workout_set_results (
+    result_id INT AUTO_INCREMENT PRIMARY KEY,
+    log_id INT NOT NULL,
+    athlete_id INT NOT NULL,
+    client_set_id VARCHAR(64) NOT NULL,
+    exercise_id INT NULL,
+    exercise_name VARCHAR(255) NULL,
+    order_number INT NULL,
+    set_number INT NOT NULL DEFAULT 1,
+    status ENUM('completed', 'partial', 'skipped') NOT NULL DEFAULT 'completed',
+    reps INT NULL,
+    weight DECIMAL(10,2) NULL,
+    duration_seconds INT NULL,
+    recorded_at DATETIME NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_set_results_athlete_client (athlete_id, client_set_id),
+    INDEX idx_set_results_log (log_id, order_number, set_number),
+    FOREIGN KEY (log_id) REFERENCES workout_logs(log_id) ON DELETE CASCADE,
+    FOREIGN KEY (athlete_id) REFERENCES athletes(athlete_id) ON DELETE CASCADE,
+    FOREIGN KEY (exercise_id) REFERENCES exercises(exercise_id) ON DELETE SET NULL
+);
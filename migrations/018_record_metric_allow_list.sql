@@ -0,0 +1,10 @@
+-- Imported activity durations were stored as 'Time', the lower-is-better race
+-- time metric, so every shorter workout was announced as a personal record.
+-- They now have their own metric (dedupe keys end in ':time'), and personal
+-- records and metric-linked goals only cover the metrics in RECORD_METRICS.
+-- Run `flask rebuild-personal-records` after this migration to drop records
+-- for metrics outside that list and recompute 'Time' without the imports.
+
+UPDATE performance_tracking
+SET metric_type = 'Activity Duration'
+WHERE metric_type = 'Time' AND dedupe_key LIKE 'activity:%:time';
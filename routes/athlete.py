@@ -1,6 +1,25 @@
-from flask import Blueprint, request, jsonify, current_app
-from datetime import datetime, timedelta
-from utils import create_notification
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from routes.auth import token_required
+from utils import create_notification, logger
+from utils.athlete_analytics import invalidate_athlete_analytics, load_athlete_analytics
+from utils.adherence import load_adherence, record_workout
+from utils.activity_import import activity_format, save_upload, submit_import
+from utils.exports import EXPORT_DATASETS, EXPORT_FORMATS, build_export_query, export_filename, stream_export
+from utils.goal_progress import DEFAULT_GOAL_AGGREGATION, GOAL_AGGREGATIONS, apply_goal_progress
+from utils.identity import invalidate_identities, resolve_identities
+from utils.nutrition import calculate_nutrition
+from utils.personal_records import apply_personal_records, record_metrics
+from utils.performance_ingest import detect_format, ingest_performance, iter_records, iter_text_lines
+from utils.session_sync import apply_session_sync, load_sync_state, parse_sync_payload
+from utils.sample_streams import SAMPLE_CHANNELS, decode_stream, parse_stream_points, stream_window
+from utils.timeseries import (
+    BUCKET_AGGREGATES, BUCKET_EXPRESSIONS, SERIES_MODES,
+    downsample_records, group_series, parse_max_points, resolve_date_range
+)
+from utils.training_calendar import CALENDAR_SELECT, calendar_window, close_session_instance
+import json
 import jwt
 import os
 from werkzeug.utils import secure_filename
@@ -17,19 +36,331 @@ def get_performance():
     if not athlete_id:
         return jsonify({'error': 'Athlete ID required'}), 400
     
-    cursor = mysql.connection.cursor()
-    cursor.execute("""
+    query = """
         SELECT performance_id, date, metric_type, metric_value, unit, notes 
         FROM performance_tracking 
         WHERE athlete_id = %s 
         ORDER BY date DESC
-    """, (athlete_id,))
+    """
+    params = [athlete_id]
+    
+    # Optional cap for history lists; charts should use /performance/series instead
+    limit = request.args.get('limit', type=int)
+    if limit:
+        query += " LIMIT %s"
+        params.append(limit)
+    
+    cursor = mysql.connection.cursor()
+    cursor.execute(query, tuple(params))
     
     performance_records = cursor.fetchall()
     cursor.close()
     
     return jsonify({'performance': performance_records}), 200
 
+@athlete_bp.route('/performance/bulk', methods=['POST'])
+@token_required
+def bulk_add_performance(current_user):
+    """
+    Stream many performance records in one request. The body is CSV with a
+    header row (date, metric_type, metric_value, unit, notes, dedupe_key) or
+    JSON Lines with the same fields; rows are validated and inserted as they
+    are read.
+    """
+    from app import mysql
+    
+    athlete_id = request.args.get('athlete_id', type=int)
+    if not athlete_id:
+        return jsonify({'error': 'Athlete ID required'}), 400
+    
+    try:
+        fmt = detect_format(request.content_type, request.args.get('format'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    cursor = mysql.connection.cursor()
+    cursor.execute("""
+        SELECT a.user_id, c.coach_id, c.user_id AS coach_user_id
+        FROM athletes a
+        LEFT JOIN coaches c ON a.coach_id = c.coach_id
+        WHERE a.athlete_id = %s
+    """, (athlete_id,))
+    athlete = cursor.fetchone()
+    cursor.close()
+    
+    if not athlete:
+        return jsonify({'error': 'Athlete not found'}), 404
+    
+    # The athlete uploads their own data; their coach uploads on their behalf
+    if athlete['user_id'] == current_user['user_id']:
+        recorded_by = None
+    elif athlete['coach_user_id'] and athlete['coach_user_id'] == current_user['user_id']:
+        recorded_by = athlete['coach_id']
+    else:
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    records = iter_records(iter_text_lines(request.stream), fmt)
+    
+    try:
+        report = ingest_performance(mysql, records, athlete_id, recorded_by)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        invalidate_athlete_analytics(athlete_id)
+    
+    # Batches before a malformed line are committed, so the report goes back either way
+    if report.aborted:
+        return jsonify({'error': report.aborted['error'], **report.to_dict()}), 400
+    return jsonify(report.to_dict()), 200
+
+@athlete_bp.route('/activities/import', methods=['POST'])
+@token_required
+def import_activity(current_user):
+    """Upload a GPX/TCX activity file; it is summarized into performance records in the background"""
+    from app import mysql
+    
+    if 'file' not in request.files:
+        return jsonify({'error': 'No file provided'}), 400
+    
+    file = request.files['file']
+    fmt = activity_format(file.filename)
+    if not fmt:
+        return jsonify({'error': 'File must be a .gpx or .tcx activity'}), 400
+    
+    cursor = mysql.connection.cursor()
+    cursor.execute("SELECT athlete_id FROM athletes WHERE user_id = %s", (current_user['user_id'],))
+    athlete = cursor.fetchone()
+    
+    if not athlete:
+        cursor.close()
+        return jsonify({'error': 'Athlete not found'}), 404
+    
+    upload_folder = current_app.config['ACTIVITY_UPLOAD_FOLDER']
+    os.makedirs(upload_folder, exist_ok=True)
+    
+    try:
+        cursor.execute("""
+            INSERT INTO activity_imports (athlete_id, file_format, file_name, file_sha1, status)
+            VALUES (%s, %s, %s, '', 'queued')
+        """, (athlete['athlete_id'], fmt, secure_filename(file.filename)[:255]))
+        import_id = cursor.lastrowid
+        
+        path = os.path.join(upload_folder, f'{import_id}.{fmt}')
+        file_sha1 = save_upload(file, path)
+        
+        cursor.execute("UPDATE activity_imports SET file_sha1 = %s WHERE import_id = %s", (file_sha1, import_id))
+        mysql.connection.commit()
+        cursor.close()
+    except Exception as e:
+        mysql.connection.rollback()
+        cursor.close()
+        return jsonify({'error': str(e)}), 500
+    
+    submit_import(current_app._get_current_object(), mysql, import_id, path)
+    
+    return jsonify({
+        'message': 'Activity queued for import',
+        'import_id': import_id,
+        'status': 'queued'
+    }), 202
+
+@athlete_bp.route('/activities/imports/<int:import_id>', methods=['GET'])
+@token_required
+def get_activity_import(current_user, import_id):
+    """Status and summary of an activity import"""
+    from app import mysql
+    
+    cursor = mysql.connection.cursor()
+    cursor.execute("""
+        SELECT ai.import_id, ai.athlete_id, ai.file_format, ai.file_name, ai.status,
+               ai.activity_date, ai.summary, ai.error, ai.created_at, ai.completed_at
+        FROM activity_imports ai
+        JOIN athletes a ON ai.athlete_id = a.athlete_id
+        WHERE ai.import_id = %s AND a.user_id = %s
+    """, (import_id, current_user['user_id']))
+    activity_import = cursor.fetchone()
+    cursor.close()
+    
+    if not activity_import:
+        return jsonify({'error': 'Import not found'}), 404
+    
+    if activity_import['summary']:
+        activity_import['summary'] = json.loads(activity_import['summary'])
+    
+    return jsonify(activity_import), 200
+
+@athlete_bp.route('/activities/<int:import_id>/streams', methods=['GET'])
+@token_required
+def get_activity_streams(current_user, import_id):
+    """
+    Decoded sample streams of an imported activity. start/end select a window
+    in seconds from the activity start; max_points (default 500, 0 for full
+    resolution) downsamples each channel with LTTB.
+    """
+    from app import mysql
+    
+    requested = [c for c in request.args.get('channels', '').split(',') if c]
+    unknown = [c for c in requested if c not in SAMPLE_CHANNELS]
+    if unknown:
+        return jsonify({'error': f'Unknown channels: {", ".join(unknown)}'}), 400
+    
+    try:
+        start = request.args.get('start', type=int)
+        end = request.args.get('end', type=int)
+        max_points = parse_stream_points(request.args.get('max_points'))
+    except ValueError:
+        return jsonify({'error': 'Invalid max_points'}), 400
+    
+    query = """
+        SELECT s.channel, s.started_at, s.sample_count, s.value_scale, s.samples
+        FROM activity_sample_streams s
+        JOIN athletes a ON s.athlete_id = a.athlete_id
+        LEFT JOIN coaches c ON a.coach_id = c.coach_id
+        WHERE s.import_id = %s AND (a.user_id = %s OR c.user_id = %s)
+    """
+    params = [import_id, current_user['user_id'], current_user['user_id']]
+    
+    if requested:
+        query += f" AND s.channel IN ({', '.join(['%s'] * len(requested))})"
+        params.extend(requested)
+    
+    cursor = mysql.connection.cursor()
+    cursor.execute(query, tuple(params))
+    rows = cursor.fetchall()
+    cursor.close()
+    
+    if not rows:
+        return jsonify({'error': 'No streams found for this activity'}), 404
+    
+    streams = {}
+    for row in rows:
+        offsets, values = decode_stream(row['samples'], row['value_scale'])
+        streams[row['channel']] = {
+            'unit': SAMPLE_CHANNELS[row['channel']][0],
+            'sample_count': row['sample_count'],
+            'points': stream_window(offsets, values, start, end, max_points)
+        }
+    
+    return jsonify({
+        'import_id': import_id,
+        'started_at': rows[0]['started_at'],
+        'start': start,
+        'end': end,
+        'max_points': max_points,
+        'streams': streams
+    }), 200
+
+@athlete_bp.route('/export/<dataset>', methods=['GET'])
+@token_required
+def export_athlete_history(current_user, dataset):
+    """Stream an athlete's full history of one dataset as CSV or JSON Lines"""
+    from app import mysql
+    
+    athlete_id = request.args.get('athlete_id', type=int)
+    fmt = request.args.get('format', 'csv')
+    
+    if dataset not in EXPORT_DATASETS:
+        return jsonify({'error': f'Dataset must be one of {", ".join(EXPORT_DATASETS)}'}), 400
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': 'Format must be csv or jsonl'}), 400
+    if not athlete_id:
+        return jsonify({'error': 'Athlete ID required'}), 400
+    
+    cursor = mysql.connection.cursor()
+    cursor.execute("""
+        SELECT a.user_id, c.user_id AS coach_user_id
+        FROM athletes a
+        LEFT JOIN coaches c ON a.coach_id = c.coach_id
+        WHERE a.athlete_id = %s
+    """, (athlete_id,))
+    athlete = cursor.fetchone()
+    cursor.close()
+    
+    if not athlete:
+        return jsonify({'error': 'Athlete not found'}), 404
+    if current_user['user_id'] not in (athlete['user_id'], athlete['coach_user_id']):
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    chunks = stream_export(mysql.connection, build_export_query(dataset, 'athlete'), (athlete_id,), fmt)
+    
+    return Response(
+        stream_with_context(chunks),
+        mimetype=EXPORT_FORMATS[fmt],
+        headers={'Content-Disposition': f'attachment; filename={export_filename(dataset, f"athlete-{athlete_id}", fmt)}'}
+    )
+
+@athlete_bp.route('/performance/series', methods=['GET'])
+def get_performance_series():
+    """Bucketed (or LTTB-downsampled) performance series for one athlete"""
+    from app import mysql
+    
+    athlete_id = request.args.get('athlete_id', type=int)
+    metric_type = request.args.get('metric_type')
+    bucket = request.args.get('bucket', 'week')
+    mode = request.args.get('mode', 'buckets')
+    
+    if not athlete_id:
+        return jsonify({'error': 'Athlete ID required'}), 400
+    if bucket not in BUCKET_EXPRESSIONS:
+        return jsonify({'error': 'Bucket must be day, week or month'}), 400
+    if mode not in SERIES_MODES:
+        return jsonify({'error': 'Mode must be buckets or lttb'}), 400
+    if mode == 'lttb' and not metric_type:
+        return jsonify({'error': 'metric_type is required for lttb mode'}), 400
+    
+    try:
+        start, end = resolve_date_range(bucket, request.args.get('start'), request.args.get('end'))
+        max_points = parse_max_points(request.args.get('max_points'))
+    except ValueError:
+        return jsonify({'error': 'Invalid date range or max_points'}), 400
+    
+    cursor = mysql.connection.cursor()
+    
+    try:
+        # Both queries read only (athlete_id, metric_type, date, metric_value),
+        # which the idx_performance_athlete_metric_date index covers
+        if mode == 'lttb':
+            cursor.execute("""
+                SELECT pt.date, pt.metric_value
+                FROM performance_tracking pt
+                WHERE pt.athlete_id = %s AND pt.metric_type = %s AND pt.date BETWEEN %s AND %s
+                ORDER BY pt.date, pt.performance_id
+            """, (athlete_id, metric_type, start, end))
+            series = {metric_type: downsample_records(cursor.fetchall(), max_points)}
+        else:
+            query = f"""
+                SELECT pt.athlete_id, pt.metric_type, {BUCKET_EXPRESSIONS[bucket]} as bucket,
+                       {BUCKET_AGGREGATES}
+                FROM performance_tracking pt
+                WHERE pt.athlete_id = %s AND pt.date BETWEEN %s AND %s
+            """
+            params = [athlete_id, start, end]
+            
+            if metric_type:
+                query += " AND pt.metric_type = %s"
+                params.append(metric_type)
+            
+            query += " GROUP BY pt.athlete_id, pt.metric_type, bucket ORDER BY pt.metric_type, bucket"
+            
+            cursor.execute(query, tuple(params))
+            series = group_series(cursor.fetchall(), max_points).get(athlete_id, {})
+        
+        cursor.close()
+        
+        return jsonify({
+            'athlete_id': athlete_id,
+            'mode': mode,
+            'bucket': bucket if mode == 'buckets' else None,
+            'start': start,
+            'end': end,
+            'max_points': max_points,
+            'series': series
+        }), 200
+    
+    except Exception as e:
+        cursor.close()
+        return jsonify({'error': str(e)}), 500
+
 @athlete_bp.route('/performance', methods=['POST'])
 def add_performance():
     """Add a new performance record"""
@@ -41,6 +372,12 @@ def add_performance():
     if not all(field in data for field in required_fields):
         return jsonify({'error': 'Missing required fields'}), 400
     
+    try:
+        record_date = date.fromisoformat(str(data['date']))
+        metric_value = Decimal(str(data['metric_value']))
+    except (ValueError, InvalidOperation):
+        return jsonify({'error': 'Invalid date or metric value'}), 400
+    
     cursor = mysql.connection.cursor()
     
     try:
@@ -50,20 +387,28 @@ def add_performance():
             VALUES (%s, %s, %s, %s, %s, %s)
         """, (
             data['athlete_id'], 
-            data['date'], 
+            record_date, 
             data['metric_type'], 
-            data['metric_value'],
+            metric_value,
             data['unit'],
             data.get('notes', '')
         ))
+        performance_id = cursor.lastrowid
+        
+        new_records = [(record_date, data['metric_type'], metric_value)]
+        personal_records = apply_personal_records(cursor, data['athlete_id'], new_records)
+        completed_goals = apply_goal_progress(cursor, data['athlete_id'], new_records)
         
         mysql.connection.commit()
-        performance_id = cursor.lastrowid
         cursor.close()
         
+        invalidate_athlete_analytics(data['athlete_id'])
+        
         return jsonify({
             'message': 'Performance record added successfully',
-            'performance_id': performance_id
+            'performance_id': performance_id,
+            'personal_records': personal_records,
+            'completed_goals': completed_goals
         }), 201
         
     except Exception as e:
@@ -71,6 +416,33 @@ def add_performance():
         cursor.close()
         return jsonify({'error': str(e)}), 500
 
+@athlete_bp.route('/personal-records/<int:athlete_id>', methods=['GET'])
+def get_personal_records(athlete_id):
+    """Personal best per metric, with the best it replaced, and the metrics that have records"""
+    from app import mysql
+    
+    cursor = mysql.connection.cursor()
+    cursor.execute("""
+        SELECT metric_type, best_value, best_date, previous_value, previous_date, updated_at
+        FROM personal_records
+        WHERE athlete_id = %s
+        ORDER BY metric_type
+    """, (athlete_id,))
+    records = cursor.fetchall()
+    cursor.close()
+    
+    directions = record_metrics()
+    for record in records:
+        record['lower_is_better'] = directions.get(record['metric_type']) == 'lower'
+    
+    # The metrics that can have records and drive metric-linked goals
+    metrics = [
+        {'metric_type': metric_type, 'lower_is_better': direction == 'lower'}
+        for metric_type, direction in directions.items()
+    ]
+    
+    return jsonify({'personal_records': records, 'record_metrics': metrics}), 200
+
 @athlete_bp.route('/athlete-info/<int:user_id>', methods=['GET'])
 def get_athlete_info(user_id):
     """Get athlete ID from user ID"""
@@ -139,34 +511,15 @@ def update_athlete_profile():
         mysql.connection.commit()
         cursor.close()
         
-        bmi = None
-        bmi_category = None
-        recommended_calories = None
+        invalidate_identities(athlete_ids=[data['athlete_id']])
         
-        if data.get('height') and data.get('weight'):
-            height_m = float(data['height']) / 100
-            weight_kg = float(data['weight'])
-            bmi = round(weight_kg / (height_m ** 2), 2)
-            
-            if bmi < 18.5:
-                bmi_category = 'Underweight'
-            elif 18.5 <= bmi < 25:
-                bmi_category = 'Normal'
-            elif 25 <= bmi < 30:
-                bmi_category = 'Overweight'
-            else:
-                bmi_category = 'Obese'
-            
-            if data.get('age'):
-                age = int(data['age'])
-                bmr = (10 * weight_kg) + (6.25 * float(data['height'])) - (5 * age) + 5
-                recommended_calories = round(bmr * 1.55)
+        nutrition = calculate_nutrition(data.get('height'), data.get('weight'), data.get('age'))
         
         return jsonify({
             'message': 'Profile updated successfully',
-            'bmi': bmi,
-            'bmi_category': bmi_category,
-            'recommended_calories': recommended_calories
+            'bmi': nutrition['bmi'],
+            'bmi_category': nutrition['bmi_category'],
+            'recommended_calories': nutrition['daily_calories']
         }), 200
         
     except Exception as e:
@@ -223,80 +576,13 @@ def get_athlete_analytics(athlete_id):
     """Get comprehensive analytics for athlete"""
     from app import mysql
     
-    cursor = mysql.connection.cursor()
-    
     try:
-        # Total workouts
-        cursor.execute("""
-            SELECT COUNT(*) as count 
-            FROM performance_tracking 
-            WHERE athlete_id = %s
-        """, (athlete_id,))
-        result = cursor.fetchone()
-        total_workouts = result['count'] if result else 0
-        
-        # Workouts in last week
-        week_ago = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d')
-        cursor.execute("""
-            SELECT COUNT(*) as count 
-            FROM performance_tracking 
-            WHERE athlete_id = %s AND date >= %s
-        """, (athlete_id, week_ago))
-        result = cursor.fetchone()
-        week_workouts = result['count'] if result else 0
-        
-        # Weekly data grouped by dayname
-        cursor.execute("""
-            SELECT DAYNAME(date) as day, COUNT(*) as count 
-            FROM performance_tracking 
-            WHERE athlete_id = %s AND date >= %s
-            GROUP BY DAYNAME(date)
-        """, (athlete_id, week_ago))
-        rows = cursor.fetchall()
-        weekly_data = {row['day']: row['count'] for row in rows} if rows else {}
-        
-        # Active goals count
-        cursor.execute("""
-            SELECT COUNT(*) as count 
-            FROM goals 
-            WHERE athlete_id = %s AND status = 'active'
-        """, (athlete_id,))
-        result = cursor.fetchone()
-        active_goals = result['count'] if result else 0
-        
-        # Completed goals count
-        cursor.execute("""
-            SELECT COUNT(*) as count 
-            FROM goals 
-            WHERE athlete_id = %s AND status = 'completed'
-        """, (athlete_id,))
-        result = cursor.fetchone()
-        completed_goals = result['count'] if result else 0
-        
-        cursor.close()
-        
-        return jsonify({
-            'total_workouts': total_workouts,
-            'week_workouts': week_workouts,
-            # Removed below two data sets per your request
-            # 'performance_trend': [],
-            # 'metric_distribution': {},
-            'weekly_data': weekly_data,
-            'active_goals': active_goals,
-            'completed_goals': completed_goals
-        }), 200
-        
+        analytics = load_athlete_analytics(mysql, athlete_id)
     except Exception as e:
-        cursor.close()
-        print(f"Analytics error: {str(e)}")
-        return jsonify({
-            'total_workouts': 0,
-            'week_workouts': 0,
-            'weekly_data': {},
-            'active_goals': 0,
-            'completed_goals': 0,
-            'error': str(e)
-        }), 200
+        logger.error(f"Analytics error for athlete {athlete_id}: {str(e)}")
+        return jsonify({'error': 'Could not load analytics'}), 500
+    
+    return jsonify(analytics), 200
 
 
 @athlete_bp.route('/goals/<int:athlete_id>', methods=['GET'])
@@ -306,7 +592,8 @@ def get_athlete_goals(athlete_id):
     
     cursor = mysql.connection.cursor()
     cursor.execute("""
-        SELECT goal_id, goal_type, target_value, current_value, target_date, status, created_date
+        SELECT goal_id, goal_type, metric_type, metric_aggregation, target_value, current_value,
+               last_metric_date, target_date, status, created_date
         FROM goals 
         WHERE athlete_id = %s
         ORDER BY created_date DESC
@@ -331,15 +618,26 @@ def create_goal():
     athlete_id = data['athlete_id']
     goal_type = data['goal_type']
     
+    # Optional link to a tracked metric; progress then follows new performance records
+    metric_type = (data.get('metric_type') or '').strip() or None
+    metric_aggregation = data.get('metric_aggregation') or DEFAULT_GOAL_AGGREGATION
+    if metric_aggregation not in GOAL_AGGREGATIONS:
+        return jsonify({'error': f'metric_aggregation must be one of: {", ".join(GOAL_AGGREGATIONS)}'}), 400
+    if metric_type and metric_type not in record_metrics():
+        return jsonify({'error': f'metric_type must be one of: {", ".join(record_metrics())}'}), 400
+    
     cursor = mysql.connection.cursor()
     
     try:
         cursor.execute("""
-            INSERT INTO goals (athlete_id, goal_type, target_value, current_value, target_date, status)
-            VALUES (%s, %s, %s, %s, %s, 'active')
+            INSERT INTO goals (athlete_id, goal_type, metric_type, metric_aggregation,
+                               target_value, current_value, target_date, status)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, 'active')
         """, (
             athlete_id,
             goal_type,
+            metric_type,
+            metric_aggregation,
             data['target_value'],
             data['current_value'],
             data['target_date']
@@ -347,28 +645,20 @@ def create_goal():
         
         mysql.connection.commit()
         goal_id = cursor.lastrowid
+        invalidate_athlete_analytics(athlete_id)
         
         # Notify coach about new goal if athlete has a coach
-        cursor.execute("SELECT coach_id FROM athletes WHERE athlete_id = %s", (athlete_id,))
-        result = cursor.fetchone()
-        
-        if result and result['coach_id']:
-            cursor.execute("SELECT u.full_name FROM athletes a JOIN users u ON a.user_id = u.user_id WHERE a.athlete_id = %s", (athlete_id,))
-            athlete_result = cursor.fetchone()
-            athlete_name = athlete_result['full_name'] if athlete_result else 'An athlete'
-            
-            cursor.execute("SELECT user_id FROM coaches WHERE coach_id = %s", (result['coach_id'],))
-            coach_result = cursor.fetchone()
-            
-            if coach_result:
-                create_notification(
-                    mysql,
-                    coach_result['user_id'],
-                    'goal',
-                    ' New Goal Set',
-                    f'{athlete_name} set a new goal: {goal_type}',
-                    goal_id
-                )
+        athlete_result = resolve_identities(mysql, athlete_ids=[athlete_id]).athlete(athlete_id)
+        
+        if athlete_result and athlete_result['coach_user_id']:
+            create_notification(
+                mysql,
+                athlete_result['coach_user_id'],
+                'goal',
+                ' New Goal Set',
+                f'{athlete_result["full_name"] or "An athlete"} set a new goal: {goal_type}',
+                goal_id
+            )
         
         cursor.close()
         
@@ -391,10 +681,9 @@ def complete_goal(goal_id):
     
     try:
         cursor.execute("""
-            SELECT g.athlete_id, g.goal_type, a.coach_id
-            FROM goals g
-            JOIN athletes a ON g.athlete_id = a.athlete_id
-            WHERE g.goal_id = %s
+            SELECT athlete_id, goal_type
+            FROM goals
+            WHERE goal_id = %s
         """, (goal_id,))
         
         goal_info = cursor.fetchone()
@@ -407,23 +696,20 @@ def complete_goal(goal_id):
         
         mysql.connection.commit()
         
-        if goal_info and goal_info['coach_id']:
-            cursor.execute("SELECT u.full_name FROM athletes a JOIN users u ON a.user_id = u.user_id WHERE a.athlete_id = %s", (goal_info['athlete_id'],))
-            athlete_result = cursor.fetchone()
-            athlete_name = athlete_result['full_name'] if athlete_result else 'An athlete'
-            
-            cursor.execute("SELECT user_id FROM coaches WHERE coach_id = %s", (goal_info['coach_id'],))
-            coach_result = cursor.fetchone()
-            
-            if coach_result:
-                create_notification(
-                    mysql,
-                    coach_result['user_id'],
-                    'goal',
-                    ' Goal Completed!',
-                    f'{athlete_name} completed their {goal_info["goal_type"]} goal!',
-                    goal_id
-                )
+        athlete_result = None
+        if goal_info:
+            invalidate_athlete_analytics(goal_info['athlete_id'])
+            athlete_result = resolve_identities(mysql, athlete_ids=[goal_info['athlete_id']]).athlete(goal_info['athlete_id'])
+        
+        if athlete_result and athlete_result['coach_user_id']:
+            create_notification(
+                mysql,
+                athlete_result['coach_user_id'],
+                'goal',
+                ' Goal Completed!',
+                f'{athlete_result["full_name"] or "An athlete"} completed their {goal_info["goal_type"]} goal!',
+                goal_id
+            )
         
         cursor.close()
         
@@ -454,7 +740,7 @@ def update_goal_progress(goal_id):
         """, (data['current_value'], goal_id))
         
         cursor.execute("""
-            SELECT target_value, current_value 
+            SELECT athlete_id, target_value, current_value 
             FROM goals 
             WHERE goal_id = %s
         """, (goal_id,))
@@ -470,6 +756,9 @@ def update_goal_progress(goal_id):
         mysql.connection.commit()
         cursor.close()
         
+        if goal:
+            invalidate_athlete_analytics(goal['athlete_id'])
+        
         return jsonify({'message': 'Progress updated!'}), 200
         
     except Exception as e:
@@ -508,12 +797,13 @@ def update_assignment_status(assignment_id):
         mysql.connection.commit()
         
         if status == 'completed' and assignment_info:
-            cursor.execute("SELECT u.full_name FROM athletes a JOIN users u ON a.user_id = u.user_id WHERE a.athlete_id = %s", (assignment_info['athlete_id'],))
-            athlete_result = cursor.fetchone()
-            athlete_name = athlete_result['full_name'] if athlete_result else 'An athlete'
-            
-            cursor.execute("SELECT user_id FROM coaches WHERE coach_id = %s", (assignment_info['coach_id'],))
-            coach_result = cursor.fetchone()
+            identities = resolve_identities(
+                mysql,
+                athlete_ids=[assignment_info['athlete_id']],
+                coach_ids=[assignment_info['coach_id']]
+            )
+            athlete_name = identities.name(identities.athlete(assignment_info['athlete_id']), 'An athlete')
+            coach_result = identities.coach(assignment_info['coach_id'])
             
             if coach_result:
                 create_notification(
@@ -534,33 +824,12 @@ def update_assignment_status(assignment_id):
         cursor.close()
         return jsonify({'error': str(e)}), 500
 
-@athlete_bp.route('/all-coaches', methods=['GET'])
-def get_all_coaches():
-    """Get all coaches for messaging"""
-    from app import mysql
-    
-    cursor = mysql.connection.cursor()
-    cursor.execute("""
-        SELECT 
-            u.user_id, 
-            u.full_name, 
-            u.profile_picture,
-            c.coach_id
-        FROM users u
-        JOIN coaches c ON u.user_id = c.user_id
-        WHERE u.user_type = 'coach'
-        ORDER BY u.full_name
-    """)
-    
-    coaches = cursor.fetchall()
-    cursor.close()
-    
-    return jsonify({'coaches': coaches}), 200
-
 @athlete_bp.route('/log-workout', methods=['POST'])
 def log_workout():
     from app import mysql
     data = request.json
+    completion_status = data.get('completion_status', 'completed')
+    log_date = date.today()
     
     cursor = mysql.connection.cursor()
     
@@ -568,24 +837,132 @@ def log_workout():
         cursor.execute("""
             INSERT INTO workout_logs 
             (athlete_id, session_id, completed_date, completion_status, notes)
-            VALUES (%s, %s, CURDATE(), %s, %s)
+            VALUES (%s, %s, %s, %s, %s)
         """, (
             data['athlete_id'],
             data['session_id'],
-            data.get('completion_status', 'completed'),
+            log_date,
+            completion_status,
             data.get('notes')
         ))
         
+        instance_id = close_session_instance(
+            cursor,
+            data['athlete_id'],
+            data['session_id'],
+            cursor.lastrowid,
+            completion_status,
+            data.get('instance_id')
+        )
+        record_workout(cursor, data['athlete_id'], log_date, completion_status)
+        
         mysql.connection.commit()
         cursor.close()
         
-        return jsonify({'message': 'Workout logged successfully'}), 201
+        invalidate_athlete_analytics(data['athlete_id'])
+        
+        return jsonify({'message': 'Workout logged successfully', 'instance_id': instance_id}), 201
     
     except Exception as e:
         mysql.connection.rollback()
         cursor.close()
         return jsonify({'error': str(e)}), 500
 
+@athlete_bp.route('/sessions/sync', methods=['POST'])
+@token_required
+def sync_workout_sessions(current_user):
+    """
+    Apply a queue of workout sessions recorded offline, with their per-exercise
+    set results, in one transaction. Every session and set carries a
+    client-generated id, so a replayed queue is acknowledged without logging
+    anything twice. Entries that can never be saved come back under
+    `rejected` for the client to drop; entries past the per-request limits
+    come back under `deferred` for its next request.
+    """
+    from app import mysql
+    
+    try:
+        batch = parse_sync_payload(request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    cursor = mysql.connection.cursor()
+    cursor.execute("SELECT athlete_id FROM athletes WHERE user_id = %s", (current_user['user_id'],))
+    athlete = cursor.fetchone()
+    
+    if not athlete:
+        cursor.close()
+        return jsonify({'error': 'Athlete not found'}), 404
+    
+    athlete_id = athlete['athlete_id']
+    
+    try:
+        outcome = apply_session_sync(cursor, athlete_id, batch)
+        mysql.connection.commit()
+    except Exception as e:
+        mysql.connection.rollback()
+        cursor.close()
+        logger.error(f"Session sync failed for athlete {athlete_id}: {str(e)}")
+        return jsonify({'error': 'Sync failed; nothing was saved'}), 500
+    
+    invalidate_athlete_analytics(athlete_id)
+    
+    try:
+        synced = load_sync_state(cursor, athlete_id, list(outcome))
+        adherence = load_adherence(cursor, athlete_id)
+    finally:
+        cursor.close()
+    
+    for session in synced:
+        session['duplicate'] = outcome[session['client_id']]['duplicate']
+    
+    return jsonify({
+        'message': 'Sessions synced',
+        'created': sum(1 for result in outcome.values() if not result['duplicate']),
+        'duplicates': sum(1 for result in outcome.values() if result['duplicate']),
+        'sessions': synced,
+        'rejected': batch.rejected,
+        'deferred': batch.deferred,
+        'adherence': adherence
+    }), 200
+
+@athlete_bp.route('/calendar/<int:athlete_id>', methods=['GET'])
+def get_training_calendar(athlete_id):
+    """Dated training sessions for today, this week, a date range, or missed ones"""
+    from app import mysql
+    
+    view = request.args.get('view', 'week')
+    cursor = mysql.connection.cursor()
+    
+    if view == 'missed':
+        cursor.execute(CALENDAR_SELECT + """
+            WHERE si.athlete_id = %s AND si.status = 'scheduled' AND si.due_date < CURDATE()
+            ORDER BY si.due_date DESC
+        """, (athlete_id,))
+        sessions = cursor.fetchall()
+        cursor.close()
+        return jsonify({'view': view, 'sessions': sessions}), 200
+    
+    try:
+        start_date, end_date = calendar_window(view, request.args.get('start'), request.args.get('end'))
+    except ValueError as e:
+        cursor.close()
+        return jsonify({'error': str(e)}), 400
+    
+    cursor.execute(CALENDAR_SELECT + """
+        WHERE si.athlete_id = %s AND si.scheduled_date BETWEEN %s AND %s
+        ORDER BY si.scheduled_date, ws.day_number
+    """, (athlete_id, start_date, end_date))
+    sessions = cursor.fetchall()
+    cursor.close()
+    
+    return jsonify({
+        'view': view,
+        'start_date': start_date.isoformat(),
+        'end_date': end_date.isoformat(),
+        'sessions': sessions
+    }), 200
+
 @athlete_bp.route('/recipes', methods=['GET'])
 def get_recipes():
     """Browse all recipes"""
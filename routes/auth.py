@@ -3,6 +3,10 @@ import bcrypt
 import jwt
 from datetime import datetime, timedelta
 from functools import wraps
+from utils.coach_search import refresh_coach_in_index
+from utils.coach_matching import refresh_coach_features
+from utils.identity import invalidate_identities
+from utils.coach_profiles import rebuild_coach_documents
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -269,6 +273,14 @@ def profile():
             
             mysql.connection.commit()
             cursor.close()
+            
+            invalidate_identities(user_ids=[user_id])
+            
+            if user and user['user_type'] == 'coach':
+                refresh_coach_in_index(mysql, user_id=user_id)
+                refresh_coach_features(mysql, user_id=user_id)
+                rebuild_coach_documents(mysql, user_id=user_id)
+            
             return jsonify({'message': 'Profile updated successfully'}), 200
             
         except Exception as e:
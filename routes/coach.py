@@ -1,12 +1,44 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 from datetime import datetime, timedelta
-from utils import create_notification
+from routes.auth import token_required
+from utils import create_notification, create_notifications
+from utils.adherence import SQL_WEEK_START, adherence_ratio
+from utils.coach_search import ensure_coach_index, refresh_coach_in_index
+from utils.coach_matching import ensure_coach_features, refresh_coach_features
+from utils.coach_profiles import load_coach_document, rebuild_coach_documents
+from utils.exports import EXPORT_DATASETS, EXPORT_FORMATS, build_export_query, export_filename, stream_export
+from utils.identity import invalidate_identities, resolve_identities
+from utils.ratings import AGGREGATE_COLUMNS, HISTOGRAM_COLUMNS, format_aggregate
+from utils.exercise_catalog import (
+    AUTOCOMPLETE_LIMIT, AUTOCOMPLETE_MAX_LIMIT, add_to_catalog, ensure_exercise_catalog,
+    normalize_exercise_name, resolve_exercises
+)
+from utils.training_calendar import materialize_plan, parse_start_date, reschedule_plan
+from utils.timeseries import BUCKET_AGGREGATES, BUCKET_EXPRESSIONS, resolve_date_range, parse_max_points, group_series
+from utils.nutrition import (
+    ACTIVITY_MULTIPLIERS, DEFAULT_ACTIVITY_LEVEL, calculate_nutrition, calculate_roster_nutrition,
+    meal_item_macros, sum_macros
+)
 import jwt
 import os
+import time
 from werkzeug.utils import secure_filename
 
 coach_bp = Blueprint('coach', __name__)
 
+DASHBOARD_ASSIGNMENT_LIMIT = 50
+
+SEARCH_PAGE_SIZE = 20
+SEARCH_MAX_PAGE_SIZE = 100
+RECOMMENDATION_LIMIT = 10
+RECOMMENDATION_MAX_LIMIT = 50
+
+ROSTER_COUNT_FIELDS = (
+    'workouts_7d', 'workouts_30d', 'active_goals', 'open_assignments',
+    'current_streak', 'longest_streak', 'week_planned', 'week_completed'
+)
+ROSTER_SORT_FIELDS = ('full_name', 'last_performance_date', 'last_message_at') + ROSTER_COUNT_FIELDS
+
 @coach_bp.route('/coaches', methods=['GET'])
 def get_coaches():
     """Get all coaches with their profile info"""
@@ -15,7 +47,8 @@ def get_coaches():
     cursor = mysql.connection.cursor()
     cursor.execute("""
         SELECT c.coach_id, u.user_id, u.full_name, u.email, u.profile_picture,
-               c.specialization, c.experience_years, c.bio, c.hourly_rate
+               c.specialization, c.experience_years, c.bio, c.hourly_rate,
+               c.rating, c.total_reviews
         FROM coaches c
         JOIN users u ON c.user_id = u.user_id
         ORDER BY u.full_name
@@ -26,6 +59,81 @@ def get_coaches():
     
     return jsonify({'coaches': coaches}), 200
 
+@coach_bp.route('/search', methods=['GET'])
+def search_coaches():
+    """Search the coach directory with filters, ranking, pagination and facets"""
+    from app import mysql
+    
+    try:
+        filters = {
+            'specialization': request.args.get('specialization'),
+            'min_rate': float(request.args['min_rate']) if request.args.get('min_rate') else None,
+            'max_rate': float(request.args['max_rate']) if request.args.get('max_rate') else None,
+            'min_experience': int(request.args['min_experience']) if request.args.get('min_experience') else None,
+            'min_rating': float(request.args['min_rating']) if request.args.get('min_rating') else None,
+        }
+        page = max(int(request.args.get('page', 1)), 1)
+        per_page = min(max(int(request.args.get('per_page', SEARCH_PAGE_SIZE)), 1), SEARCH_MAX_PAGE_SIZE)
+    except ValueError:
+        return jsonify({'error': 'Invalid filter value'}), 400
+    
+    try:
+        index = ensure_coach_index(mysql)
+        results, total, facets = index.search(request.args.get('q'), filters, page, per_page)
+        
+        return jsonify({
+            'coaches': results,
+            'total': total,
+            'page': page,
+            'per_page': per_page,
+            'facets': facets
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@coach_bp.route('/recommendations/<int:athlete_id>', methods=['GET'])
+def recommend_coaches(athlete_id):
+    """Rank coaches for an athlete by sport, skill, budget, rating, experience and roster load"""
+    from app import mysql
+    
+    try:
+        budget = float(request.args['budget']) if request.args.get('budget') else None
+        limit = min(max(int(request.args.get('limit', RECOMMENDATION_LIMIT)), 1), RECOMMENDATION_MAX_LIMIT)
+    except ValueError:
+        return jsonify({'error': 'Invalid budget or limit'}), 400
+    
+    cursor = mysql.connection.cursor()
+    
+    try:
+        cursor.execute("""
+            SELECT athlete_id, sport_type, skill_level, coach_id
+            FROM athletes
+            WHERE athlete_id = %s
+        """, (athlete_id,))
+        athlete = cursor.fetchone()
+        cursor.close()
+        
+        if not athlete:
+            return jsonify({'error': 'Athlete not found'}), 404
+        
+        matrix = ensure_coach_features(mysql)
+        matches = matrix.recommend(athlete['sport_type'], athlete['skill_level'], budget, limit)
+        
+        recommendations = []
+        for coach, score, components in matches:
+            recommendations.append({
+                **coach,
+                'score': score,
+                'components': components,
+                'is_current_coach': coach['coach_id'] == athlete['coach_id']
+            })
+        
+        return jsonify({'athlete': athlete, 'recommendations': recommendations}), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @coach_bp.route('/coach/<int:coach_id>', methods=['GET'])
 def get_coach_details(coach_id):
     """Get detailed information about a specific coach"""
@@ -35,7 +143,7 @@ def get_coach_details(coach_id):
     cursor.execute("""
         SELECT c.coach_id, u.user_id, u.full_name, u.email, u.phone_number,
                u.profile_picture, c.specialization, c.experience_years, 
-               c.bio, c.hourly_rate, c.certifications
+               c.bio, c.hourly_rate, c.certifications, c.rating, c.total_reviews
         FROM coaches c
         JOIN users u ON c.user_id = u.user_id
         WHERE c.coach_id = %s
@@ -82,12 +190,10 @@ def send_coaching_request():
         mysql.connection.commit()
         request_id = cursor.lastrowid
         
-        cursor.execute("SELECT u.full_name FROM athletes a JOIN users u ON a.user_id = u.user_id WHERE a.athlete_id = %s", (athlete_id,))
-        athlete_result = cursor.fetchone()
-        athlete_name = athlete_result['full_name'] if athlete_result else 'An athlete'
+        identities = resolve_identities(mysql, athlete_ids=[athlete_id], coach_ids=[coach_id])
+        athlete_name = identities.name(identities.athlete(athlete_id), 'An athlete')
         
-        cursor.execute("SELECT user_id FROM coaches WHERE coach_id = %s", (coach_id,))
-        coach_result = cursor.fetchone()
+        coach_result = identities.coach(coach_id)
         if coach_result:
             create_notification(
                 mysql,
@@ -131,12 +237,7 @@ def get_athlete_requests(athlete_id):
     
     return jsonify({'requests': requests}), 200
 
-@coach_bp.route('/coaching-requests/coach/<int:coach_id>', methods=['GET'])
-def get_coach_requests(coach_id):
-    """Get all coaching requests received by a coach"""
-    from app import mysql
-    
-    cursor = mysql.connection.cursor()
+def _fetch_coach_requests(cursor, coach_id):
     cursor.execute("""
         SELECT cr.request_id, cr.message, cr.status, cr.request_date,
                a.athlete_id, u.full_name as athlete_name, u.email as athlete_email
@@ -146,8 +247,15 @@ def get_coach_requests(coach_id):
         WHERE cr.coach_id = %s
         ORDER BY cr.request_date DESC
     """, (coach_id,))
+    return cursor.fetchall()
+
+@coach_bp.route('/coaching-requests/coach/<int:coach_id>', methods=['GET'])
+def get_coach_requests(coach_id):
+    """Get all coaching requests received by a coach"""
+    from app import mysql
     
-    requests = cursor.fetchall()
+    cursor = mysql.connection.cursor()
+    requests = _fetch_coach_requests(cursor, coach_id)
     cursor.close()
     
     return jsonify({'requests': requests}), 200
@@ -167,9 +275,10 @@ def respond_to_request(request_id):
     
     try:
         cursor.execute("""
-            SELECT athlete_id, coach_id 
-            FROM coaching_requests 
-            WHERE request_id = %s
+            SELECT cr.athlete_id, cr.coach_id, a.coach_id as previous_coach_id
+            FROM coaching_requests cr
+            JOIN athletes a ON cr.athlete_id = a.athlete_id
+            WHERE cr.request_id = %s
         """, (request_id,))
         
         request_info = cursor.fetchone()
@@ -196,12 +305,14 @@ def respond_to_request(request_id):
         
         mysql.connection.commit()
         
-        cursor.execute("SELECT user_id FROM athletes WHERE athlete_id = %s", (athlete_id,))
-        athlete_result = cursor.fetchone()
+        if status == 'accepted':
+            invalidate_identities(athlete_ids=[athlete_id])
+            refresh_coach_features(mysql, coach_ids=[coach_id, request_info['previous_coach_id']])
+            rebuild_coach_documents(mysql, coach_ids=[coach_id, request_info['previous_coach_id']])
         
-        cursor.execute("SELECT u.full_name FROM coaches c JOIN users u ON c.user_id = u.user_id WHERE c.coach_id = %s", (coach_id,))
-        coach_result = cursor.fetchone()
-        coach_name = coach_result['full_name'] if coach_result else 'Your coach'
+        identities = resolve_identities(mysql, athlete_ids=[athlete_id], coach_ids=[coach_id])
+        athlete_result = identities.athlete(athlete_id)
+        coach_name = identities.name(identities.coach(coach_id), 'Your coach')
         
         if athlete_result:
             if status == 'accepted':
@@ -232,6 +343,96 @@ def respond_to_request(request_id):
         cursor.close()
         return jsonify({'error': str(e)}), 500
 
+@coach_bp.route('/coaching-requests/batch', methods=['PUT'])
+def respond_to_requests_batch():
+    """Coach accepts or rejects many pending coaching requests in one transaction"""
+    from app import mysql
+
+    data = request.json
+
+    if 'status' not in data or data['status'] not in ['accepted', 'rejected']:
+        return jsonify({'error': 'Invalid status'}), 400
+
+    if 'coach_id' not in data or not data.get('request_ids'):
+        return jsonify({'error': 'Coach ID and request IDs required'}), 400
+
+    status = data['status']
+    coach_id = data['coach_id']
+    request_ids = [int(request_id) for request_id in data['request_ids']]
+    placeholders = ', '.join(['%s'] * len(request_ids))
+
+    cursor = mysql.connection.cursor()
+
+    try:
+        # Lock the pending requests and resolve athlete users and the coach name together
+        cursor.execute(f"""
+            SELECT cr.request_id, cr.athlete_id, a.user_id as athlete_user_id,
+                   a.coach_id as previous_coach_id, cu.full_name as coach_name
+            FROM coaching_requests cr
+            JOIN athletes a ON cr.athlete_id = a.athlete_id
+            JOIN coaches c ON cr.coach_id = c.coach_id
+            JOIN users cu ON c.user_id = cu.user_id
+            WHERE cr.coach_id = %s AND cr.status = 'pending'
+            AND cr.request_id IN ({placeholders})
+            FOR UPDATE
+        """, (coach_id, *request_ids))
+
+        pending = cursor.fetchall()
+
+        if not pending:
+            cursor.close()
+            return jsonify({'error': 'No pending requests found'}), 404
+
+        pending_ids = [row['request_id'] for row in pending]
+        pending_placeholders = ', '.join(['%s'] * len(pending_ids))
+
+        cursor.execute(f"""
+            UPDATE coaching_requests
+            SET status = %s, response_date = NOW()
+            WHERE request_id IN ({pending_placeholders})
+        """, (status, *pending_ids))
+
+        if status == 'accepted':
+            athlete_ids = sorted({row['athlete_id'] for row in pending})
+            cursor.execute(f"""
+                UPDATE athletes
+                SET coach_id = %s
+                WHERE athlete_id IN ({', '.join(['%s'] * len(athlete_ids))})
+            """, (coach_id, *athlete_ids))
+
+        coach_name = pending[0]['coach_name'] or 'Your coach'
+        if status == 'accepted':
+            title, message = 'Request Accepted!', f'{coach_name} accepted your coaching request!'
+        else:
+            title, message = 'Request Declined', 'Your coaching request was declined.'
+
+        create_notifications(mysql, [
+            (row['athlete_user_id'], 'request', title, message, row['request_id'])
+            for row in pending
+        ], commit=False)
+
+        mysql.connection.commit()
+        cursor.close()
+
+        if status == 'accepted':
+            affected_coaches = [coach_id] + [row['previous_coach_id'] for row in pending]
+            invalidate_identities(athlete_ids=[row['athlete_id'] for row in pending])
+            refresh_coach_features(mysql, coach_ids=affected_coaches)
+            rebuild_coach_documents(mysql, coach_ids=affected_coaches)
+
+        skipped = sorted(set(request_ids) - set(pending_ids))
+
+        return jsonify({
+            'message': f'{len(pending_ids)} requests {status} successfully',
+            'updated': pending_ids,
+            'skipped': skipped
+        }), 200
+
+    except Exception as e:
+        mysql.connection.rollback()
+        cursor.close()
+        return jsonify({'error': str(e)}), 500
+
 @coach_bp.route('/coach-info/<int:user_id>', methods=['GET'])
 def get_coach_info(user_id):
     """Get coach ID from user ID"""
@@ -252,13 +453,15 @@ def get_coach_profile(coach_id):
     from app import mysql
     
     cursor = mysql.connection.cursor()
-    cursor.execute("""
+    cursor.execute(f"""
         SELECT c.coach_id, c.specialization, c.experience_years, c.bio, 
                c.hourly_rate, c.certifications, c.achievements, c.coaching_philosophy,
                c.rating, c.total_reviews,
-               u.user_id, u.full_name, u.email, u.phone_number, u.profile_picture
+               u.user_id, u.full_name, u.email, u.phone_number, u.profile_picture,
+               {AGGREGATE_COLUMNS}
         FROM coaches c
         JOIN users u ON c.user_id = u.user_id
+        LEFT JOIN rating_aggregates ra ON ra.user_id = c.user_id
         WHERE c.coach_id = %s
     """, (coach_id,))
     
@@ -266,9 +469,30 @@ def get_coach_profile(coach_id):
     cursor.close()
     
     if profile:
+        profile['ratings'] = format_aggregate(profile)
+        for column in ('rating_count', 'rating_sum') + HISTOGRAM_COLUMNS:
+            profile.pop(column, None)
         return jsonify({'profile': profile}), 200
     return jsonify({'error': 'Profile not found'}), 404
 
+@coach_bp.route('/public-profile/<int:coach_id>', methods=['GET'])
+def get_public_coach_profile(coach_id):
+    """Precomputed coach page document: profile, ratings and roster size"""
+    from app import mysql
+    
+    try:
+        body, etag = load_coach_document(mysql, coach_id)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    
+    if body is None:
+        return jsonify({'error': 'Profile not found'}), 404
+    
+    response = current_app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
 @coach_bp.route('/profile', methods=['PUT'])
 def update_coach_profile():
     """Update coach's profile"""
@@ -302,6 +526,11 @@ def update_coach_profile():
         mysql.connection.commit()
         cursor.close()
         
+        invalidate_identities(coach_ids=[data['coach_id']])
+        refresh_coach_in_index(mysql, coach_id=data['coach_id'])
+        refresh_coach_features(mysql, coach_ids=[data['coach_id']])
+        rebuild_coach_documents(mysql, coach_ids=[data['coach_id']])
+        
         return jsonify({'message': 'Profile updated successfully'}), 200
         
     except Exception as e:
@@ -309,12 +538,7 @@ def update_coach_profile():
         cursor.close()
         return jsonify({'error': str(e)}), 500
 
-@coach_bp.route('/my-athletes/<int:coach_id>', methods=['GET'])
-def get_coach_athletes(coach_id):
-    """Get list of athletes assigned to this coach"""
-    from app import mysql
-    
-    cursor = mysql.connection.cursor()
+def _fetch_coach_athletes(cursor, coach_id):
     cursor.execute("""
         SELECT a.athlete_id, u.user_id, u.full_name, u.email, u.profile_picture,
                a.sport_type, a.skill_level, a.age, a.height, a.weight
@@ -323,12 +547,139 @@ def get_coach_athletes(coach_id):
         WHERE a.coach_id = %s
         ORDER BY u.full_name
     """, (coach_id,))
+    return cursor.fetchall()
+
+@coach_bp.route('/my-athletes/<int:coach_id>', methods=['GET'])
+def get_coach_athletes(coach_id):
+    """Get list of athletes assigned to this coach"""
+    from app import mysql
     
-    athletes = cursor.fetchall()
+    cursor = mysql.connection.cursor()
+    athletes = _fetch_coach_athletes(cursor, coach_id)
     cursor.close()
     
     return jsonify({'athletes': athletes}), 200
 
+@coach_bp.route('/roster/<int:coach_id>', methods=['GET'])
+def get_coach_roster(coach_id):
+    """Get the coach's athletes with activity, goal, assignment and message stats"""
+    from app import mysql
+    
+    sort = request.args.get('sort', 'full_name')
+    order = request.args.get('order', 'asc').lower()
+    
+    if sort not in ROSTER_SORT_FIELDS or order not in ('asc', 'desc'):
+        return jsonify({'error': 'Invalid sort field or order'}), 400
+    
+    # Every stat is computed per athlete by a grouped subquery scoped to this
+    # coach's roster, so the whole view costs one statement instead of N calls.
+    query = """
+        SELECT * FROM (
+            SELECT a.athlete_id, u.user_id, u.full_name, u.email, u.profile_picture,
+                   a.sport_type, a.skill_level, a.age, a.height, a.weight,
+                   p.last_performance_date,
+                   COALESCE(w.workouts_7d, 0) as workouts_7d,
+                   COALESCE(w.workouts_30d, 0) as workouts_30d,
+                   COALESCE(g.active_goals, 0) as active_goals,
+                   COALESCE(t.open_assignments, 0) as open_assignments,
+                   IF(s.last_active_date >= CURDATE() - INTERVAL 1 DAY, s.current_streak, 0) as current_streak,
+                   COALESCE(s.longest_streak, 0) as longest_streak,
+                   COALESCE(wa.planned, 0) as week_planned,
+                   COALESCE(wa.completed, 0) as week_completed,
+                   m.last_message_at
+            FROM athletes a
+            JOIN users u ON a.user_id = u.user_id
+            LEFT JOIN athlete_streaks s ON s.athlete_id = a.athlete_id
+            LEFT JOIN athlete_weekly_adherence wa
+                ON wa.athlete_id = a.athlete_id AND wa.week_start = """ + SQL_WEEK_START.format(column='CURDATE()') + """
+            LEFT JOIN (
+                SELECT pt.athlete_id, MAX(pt.date) as last_performance_date
+                FROM performance_tracking pt
+                JOIN athletes ra ON pt.athlete_id = ra.athlete_id
+                WHERE ra.coach_id = %s
+                GROUP BY pt.athlete_id
+            ) p ON p.athlete_id = a.athlete_id
+            LEFT JOIN (
+                SELECT wl.athlete_id,
+                       SUM(wl.completed_date >= DATE_SUB(CURDATE(), INTERVAL 7 DAY)) as workouts_7d,
+                       COUNT(*) as workouts_30d
+                FROM workout_logs wl
+                JOIN athletes ra ON wl.athlete_id = ra.athlete_id
+                WHERE ra.coach_id = %s
+                AND wl.completed_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)
+                GROUP BY wl.athlete_id
+            ) w ON w.athlete_id = a.athlete_id
+            LEFT JOIN (
+                SELECT gl.athlete_id, COUNT(*) as active_goals
+                FROM goals gl
+                JOIN athletes ra ON gl.athlete_id = ra.athlete_id
+                WHERE ra.coach_id = %s AND gl.status = 'active'
+                GROUP BY gl.athlete_id
+            ) g ON g.athlete_id = a.athlete_id
+            LEFT JOIN (
+                SELECT athlete_id, COUNT(*) as open_assignments
+                FROM coach_assignments
+                WHERE coach_id = %s AND status != 'completed'
+                GROUP BY athlete_id
+            ) t ON t.athlete_id = a.athlete_id
+            LEFT JOIN (
+                SELECT CASE WHEN msg.sender_id = c.user_id THEN msg.receiver_id ELSE msg.sender_id END as other_user_id,
+                       MAX(msg.sent_at) as last_message_at
+                FROM messages msg
+                JOIN coaches c ON c.coach_id = %s
+                WHERE msg.sender_id = c.user_id OR msg.receiver_id = c.user_id
+                GROUP BY other_user_id
+            ) m ON m.other_user_id = u.user_id
+            WHERE a.coach_id = %s
+        ) roster
+        WHERE 1=1
+    """
+    params = [coach_id] * 6
+    
+    if request.args.get('sport_type'):
+        query += " AND sport_type = %s"
+        params.append(request.args['sport_type'])
+    
+    if request.args.get('skill_level'):
+        query += " AND skill_level = %s"
+        params.append(request.args['skill_level'])
+    
+    try:
+        for field in ROSTER_COUNT_FIELDS:
+            if request.args.get(f'min_{field}') is not None:
+                query += f" AND {field} >= %s"
+                params.append(int(request.args[f'min_{field}']))
+            if request.args.get(f'max_{field}') is not None:
+                query += f" AND {field} <= %s"
+                params.append(int(request.args[f'max_{field}']))
+        
+        if request.args.get('inactive_days') is not None:
+            # Athletes with no performance record in the last N days (or none at all)
+            query += " AND (last_performance_date IS NULL OR last_performance_date < DATE_SUB(CURDATE(), INTERVAL %s DAY))"
+            params.append(int(request.args['inactive_days']))
+    except ValueError:
+        return jsonify({'error': 'Filters must be integers'}), 400
+    
+    query += f" ORDER BY {sort} {order.upper()}, full_name ASC"
+    
+    cursor = mysql.connection.cursor()
+    
+    try:
+        cursor.execute(query, tuple(params))
+        athletes = cursor.fetchall()
+        cursor.close()
+        
+        for athlete in athletes:
+            for field in ROSTER_COUNT_FIELDS:
+                athlete[field] = int(athlete[field])
+            athlete['week_adherence'] = adherence_ratio(athlete['week_planned'], athlete['week_completed'])
+        
+        return jsonify({'athletes': athletes, 'count': len(athletes)}), 200
+        
+    except Exception as e:
+        cursor.close()
+        return jsonify({'error': str(e)}), 500
+
 @coach_bp.route('/athlete-detail/<int:athlete_id>', methods=['GET'])
 def get_athlete_detail(athlete_id):
     """Get detailed information about a specific athlete"""
@@ -362,29 +713,6 @@ def get_athlete_detail(athlete_id):
     
     return jsonify({'error': 'Athlete not found'}), 404
 
-@coach_bp.route('/all-athletes', methods=['GET'])
-def get_all_athletes():
-    """Get all athletes for messaging"""
-    from app import mysql
-    
-    cursor = mysql.connection.cursor()
-    cursor.execute("""
-        SELECT 
-            u.user_id, 
-            u.full_name, 
-            u.profile_picture,
-            a.athlete_id
-        FROM users u
-        JOIN athletes a ON u.user_id = a.user_id
-        WHERE u.user_type = 'athlete'
-        ORDER BY u.full_name
-    """)
-    
-    athletes = cursor.fetchall()
-    cursor.close()
-    
-    return jsonify({'athletes': athletes}), 200
-
 @coach_bp.route('/assignments', methods=['POST'])
 def create_assignment():
     """Coach creates task assignment for athlete"""
@@ -418,12 +746,9 @@ def create_assignment():
         mysql.connection.commit()
         assignment_id = cursor.lastrowid
         
-        cursor.execute("SELECT u.full_name FROM coaches c JOIN users u ON c.user_id = u.user_id WHERE c.coach_id = %s", (coach_id,))
-        coach_result = cursor.fetchone()
-        coach_name = coach_result['full_name'] if coach_result else 'Your coach'
-        
-        cursor.execute("SELECT user_id FROM athletes WHERE athlete_id = %s", (athlete_id,))
-        athlete_result = cursor.fetchone()
+        identities = resolve_identities(mysql, athlete_ids=[athlete_id], coach_ids=[coach_id])
+        coach_name = identities.name(identities.coach(coach_id), 'Your coach')
+        athlete_result = identities.athlete(athlete_id)
         
         if athlete_result:
             create_notification(
@@ -447,6 +772,111 @@ def create_assignment():
         cursor.close()
         return jsonify({'error': str(e)}), 500
 
+@coach_bp.route('/assignments/bulk', methods=['POST'])
+def create_bulk_assignments():
+    """Coach assigns the same task to many athletes at once"""
+    from app import mysql
+
+    data = request.json
+    required_fields = ['coach_id', 'task_title', 'due_date']
+
+    if not all(field in data for field in required_fields):
+        return jsonify({'error': 'Missing required fields'}), 400
+
+    athlete_ids = data.get('athlete_ids') or []
+    roster_filter = data.get('filter') or {}
+
+    if not athlete_ids and not roster_filter:
+        return jsonify({'error': 'Provide athlete_ids or a roster filter'}), 400
+
+    coach_id = data['coach_id']
+    task_title = data['task_title']
+
+    cursor = mysql.connection.cursor()
+
+    try:
+        # Resolve the target athletes within this coach's roster in one query
+        query = """
+            SELECT a.athlete_id, a.user_id
+            FROM athletes a
+            WHERE a.coach_id = %s
+        """
+        params = [coach_id]
+
+        if athlete_ids:
+            query += f" AND a.athlete_id IN ({', '.join(['%s'] * len(athlete_ids))})"
+            params.extend(int(athlete_id) for athlete_id in athlete_ids)
+        if roster_filter.get('sport_type'):
+            query += " AND a.sport_type = %s"
+            params.append(roster_filter['sport_type'])
+        if roster_filter.get('skill_level'):
+            query += " AND a.skill_level = %s"
+            params.append(roster_filter['skill_level'])
+
+        cursor.execute(query, tuple(params))
+        targets = cursor.fetchall()
+
+        if not targets:
+            cursor.close()
+            return jsonify({'error': 'No matching athletes on your roster'}), 404
+
+        cursor.execute("SELECT u.full_name FROM coaches c JOIN users u ON c.user_id = u.user_id WHERE c.coach_id = %s", (coach_id,))
+        coach_result = cursor.fetchone()
+        coach_name = coach_result['full_name'] if coach_result else 'Your coach'
+
+        # One explicit multi-row INSERT: InnoDB gives a single statement's rows
+        # consecutive ids (stepped by auto_increment_increment) starting at
+        # lastrowid. executemany may split long batches into several statements.
+        row_values = []
+        for target in targets:
+            row_values.extend((
+                coach_id,
+                target['athlete_id'],
+                task_title,
+                data.get('task_description', ''),
+                data['due_date'],
+                data.get('priority', 'medium')
+            ))
+        cursor.execute(f"""
+            INSERT INTO coach_assignments (coach_id, athlete_id, task_title, task_description, due_date, priority, status)
+            VALUES {', '.join(["(%s, %s, %s, %s, %s, %s, 'pending')"] * len(targets))}
+        """, tuple(row_values))
+        first_assignment_id = cursor.lastrowid
+
+        cursor.execute("SELECT @@SESSION.auto_increment_increment AS step")
+        step = cursor.fetchone()['step']
+        assignment_ids = {
+            target['athlete_id']: first_assignment_id + position * step
+            for position, target in enumerate(targets)
+        }
+
+        create_notifications(mysql, [
+            (
+                target['user_id'],
+                'task',
+                'New Assignment',
+                f'{coach_name} assigned you: {task_title}',
+                assignment_ids.get(target['athlete_id'])
+            )
+            for target in targets
+        ], commit=False)
+
+        mysql.connection.commit()
+        cursor.close()
+
+        return jsonify({
+            'message': f'Assignment created for {len(targets)} athletes',
+            'assignments': [
+                {'athlete_id': athlete_id, 'assignment_id': assignment_id}
+                for athlete_id, assignment_id in assignment_ids.items()
+            ]
+        }), 201
+
+    except Exception as e:
+        mysql.connection.rollback()
+        cursor.close()
+        return jsonify({'error': str(e)}), 500
+
 @coach_bp.route('/assignments/athlete/<int:athlete_id>', methods=['GET'])
 def get_athlete_assignments(athlete_id):
     """Get all assignments for an athlete"""
@@ -476,13 +906,18 @@ def create_workout_plan():
     from app import mysql
     data = request.json
     
+    try:
+        start_date = parse_start_date(data.get('start_date'))
+    except ValueError:
+        return jsonify({'error': 'start_date must be YYYY-MM-DD'}), 400
+    
     cursor = mysql.connection.cursor()
     
     try:
         cursor.execute("""
             INSERT INTO workout_plans 
-            (coach_id, athlete_id, plan_name, description, duration_weeks, difficulty_level, is_template)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            (coach_id, athlete_id, plan_name, description, duration_weeks, difficulty_level, is_template, start_date)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
         """, (
             data['coach_id'],
             data.get('athlete_id'),
@@ -490,11 +925,19 @@ def create_workout_plan():
             data.get('description'),
             data.get('duration_weeks'),
             data.get('difficulty_level'),
-            data.get('is_template', False)
+            data.get('is_template', False),
+            start_date if data.get('athlete_id') else None
         ))
         
         plan_id = cursor.lastrowid
         
+        exercise_names = [
+            exercise['name']
+            for session in data.get('sessions', [])
+            for exercise in session.get('exercises', [])
+        ]
+        catalog_entries, new_exercises = resolve_exercises(mysql, cursor, exercise_names, data['coach_id'])
+        
         for session in data.get('sessions', []):
             cursor.execute("""
                 INSERT INTO workout_sessions 
@@ -505,13 +948,15 @@ def create_workout_plan():
             session_id = cursor.lastrowid
             
             for idx, exercise in enumerate(session.get('exercises', [])):
+                catalog_entry = catalog_entries.get(normalize_exercise_name(exercise['name']))
                 cursor.execute("""
                     INSERT INTO workout_exercises 
-                    (session_id, exercise_name, sets, reps, duration, rest_time, notes, order_number)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                    (session_id, exercise_id, exercise_name, sets, reps, duration, rest_time, notes, order_number)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
                 """, (
                     session_id,
-                    exercise['name'],
+                    catalog_entry['exercise_id'] if catalog_entry else None,
+                    catalog_entry['name'] if catalog_entry else exercise['name'],
                     exercise.get('sets'),
                     exercise.get('reps'),
                     exercise.get('duration'),
@@ -520,15 +965,19 @@ def create_workout_plan():
                     idx + 1
                 ))
         
+        materialize_plan(cursor, plan_id, data.get('athlete_id'), start_date, data.get('duration_weeks') or None)
+        
         mysql.connection.commit()
         cursor.close()
-        
-        return jsonify({'message': 'Workout plan created successfully', 'plan_id': plan_id}), 201
     
     except Exception as e:
         mysql.connection.rollback()
         cursor.close()
         return jsonify({'error': str(e)}), 500
+    
+    add_to_catalog(mysql, new_exercises)
+    
+    return jsonify({'message': 'Workout plan created successfully', 'plan_id': plan_id}), 201
 
 @coach_bp.route('/workout-plans/<int:coach_id>', methods=['GET'])
 def get_coach_workout_plans(coach_id):
@@ -616,6 +1065,11 @@ def duplicate_workout_plan():
     from app import mysql
     data = request.json
     
+    try:
+        start_date = parse_start_date(data.get('start_date'))
+    except ValueError:
+        return jsonify({'error': 'start_date must be YYYY-MM-DD'}), 400
+    
     cursor = mysql.connection.cursor()
     
     try:
@@ -628,8 +1082,8 @@ def duplicate_workout_plan():
         
         cursor.execute("""
             INSERT INTO workout_plans 
-            (coach_id, athlete_id, plan_name, description, duration_weeks, difficulty_level, is_template)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            (coach_id, athlete_id, plan_name, description, duration_weeks, difficulty_level, is_template, start_date)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
         """, (
             original_plan['coach_id'],
             data['athlete_id'],
@@ -637,7 +1091,8 @@ def duplicate_workout_plan():
             original_plan['description'],
             original_plan['duration_weeks'],
             original_plan['difficulty_level'],
-            False
+            False,
+            start_date
         ))
         
         new_plan_id = cursor.lastrowid
@@ -660,10 +1115,11 @@ def duplicate_workout_plan():
             for exercise in exercises:
                 cursor.execute("""
                     INSERT INTO workout_exercises 
-                    (session_id, exercise_name, sets, reps, duration, rest_time, notes, order_number)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                    (session_id, exercise_id, exercise_name, sets, reps, duration, rest_time, notes, order_number)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
                 """, (
                     new_session_id,
+                    exercise['exercise_id'],
                     exercise['exercise_name'],
                     exercise['sets'],
                     exercise['reps'],
@@ -673,6 +1129,8 @@ def duplicate_workout_plan():
                     exercise['order_number']
                 ))
         
+        materialize_plan(cursor, new_plan_id, data['athlete_id'], start_date, original_plan['duration_weeks'])
+        
         mysql.connection.commit()
         cursor.close()
         
@@ -683,8 +1141,426 @@ def duplicate_workout_plan():
         cursor.close()
         return jsonify({'error': str(e)}), 500
 
+@coach_bp.route('/workout-plans/<int:plan_id>/schedule', methods=['PUT'])
+def reschedule_workout_plan(plan_id):
+    """Change a plan's athlete or start date and rebuild its open calendar sessions"""
+    from app import mysql
+    data = request.json or {}
+    
+    cursor = mysql.connection.cursor()
+    
+    try:
+        cursor.execute("SELECT * FROM workout_plans WHERE plan_id = %s FOR UPDATE", (plan_id,))
+        plan = cursor.fetchone()
+        
+        if not plan:
+            cursor.close()
+            return jsonify({'error': 'Plan not found'}), 404
+        
+        athlete_id = data.get('athlete_id', plan['athlete_id'])
+        if data.get('start_date'):
+            try:
+                start_date = parse_start_date(data['start_date'])
+            except ValueError:
+                cursor.close()
+                return jsonify({'error': 'start_date must be YYYY-MM-DD'}), 400
+        else:
+            start_date = plan['start_date'] or parse_start_date(None)
+        
+        cursor.execute("""
+            UPDATE workout_plans SET athlete_id = %s, start_date = %s WHERE plan_id = %s
+        """, (athlete_id, start_date, plan_id))
+        
+        scheduled = reschedule_plan(cursor, plan_id, athlete_id, start_date, plan['duration_weeks'])
+        
+        mysql.connection.commit()
+        cursor.close()
+        
+        return jsonify({'message': 'Plan rescheduled', 'scheduled_sessions': scheduled}), 200
+    
+    except Exception as e:
+        mysql.connection.rollback()
+        cursor.close()
+        return jsonify({'error': str(e)}), 500
+
+# ========== EXERCISE CATALOG ==========
+
+@coach_bp.route('/exercises/autocomplete', methods=['GET'])
+def autocomplete_exercises():
+    """Prefix lookup over the exercise catalog for the workout builder"""
+    from app import mysql
+    
+    try:
+        limit = min(max(int(request.args.get('limit', AUTOCOMPLETE_LIMIT)), 1), AUTOCOMPLETE_MAX_LIMIT)
+    except ValueError:
+        return jsonify({'error': 'Invalid limit'}), 400
+    
+    try:
+        exercises = ensure_exercise_catalog(mysql).complete(request.args.get('q', ''), limit)
+        return jsonify({'exercises': exercises}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@coach_bp.route('/exercises', methods=['POST'])
+def create_exercise():
+    """Add an exercise to the catalog, or return the existing entry with the same name"""
+    from app import mysql
+    
+    data = request.json
+    
+    if not data.get('name') or not normalize_exercise_name(data['name']):
+        return jsonify({'error': 'Exercise name required'}), 400
+    
+    cursor = mysql.connection.cursor()
+    
+    try:
+        catalog_entries, new_exercises = resolve_exercises(mysql, cursor, [data['name']], data.get('coach_id'))
+        exercise = catalog_entries[normalize_exercise_name(data['name'])]
+        
+        if new_exercises and data.get('category'):
+            cursor.execute(
+                "UPDATE exercises SET category = %s WHERE exercise_id = %s",
+                (data['category'], exercise['exercise_id'])
+            )
+            exercise['category'] = data['category']
+        
+        mysql.connection.commit()
+        cursor.close()
+    
+    except Exception as e:
+        mysql.connection.rollback()
+        cursor.close()
+        return jsonify({'error': str(e)}), 500
+    
+    add_to_catalog(mysql, new_exercises)
+    
+    return jsonify({'exercise': exercise, 'created': bool(new_exercises)}), 201 if new_exercises else 200
+
+# ========== NUTRITION ==========
+
+@coach_bp.route('/calculate-nutrition/<int:athlete_id>', methods=['GET'])
+def calculate_athlete_nutrition(athlete_id):
+    """Calculate BMI, calories and macro targets for one athlete"""
+    from app import mysql
+
+    activity_level = request.args.get('activity_level', DEFAULT_ACTIVITY_LEVEL)
+    if activity_level not in ACTIVITY_MULTIPLIERS:
+        return jsonify({'error': 'Invalid activity level'}), 400
+
+    cursor = mysql.connection.cursor()
+    cursor.execute("""
+        SELECT a.athlete_id, a.height, a.weight,
+               COALESCE(a.age, TIMESTAMPDIFF(YEAR, u.date_of_birth, CURDATE())) as age
+        FROM athletes a
+        JOIN users u ON a.user_id = u.user_id
+        WHERE a.athlete_id = %s
+    """, (athlete_id,))
+
+    athlete = cursor.fetchone()
+    cursor.close()
+
+    if not athlete:
+        return jsonify({'error': 'Athlete not found'}), 404
+
+    nutrition = calculate_nutrition(athlete['height'], athlete['weight'], athlete['age'], activity_level)
+    nutrition['athlete_id'] = athlete_id
+
+    return jsonify(nutrition), 200
+
+@coach_bp.route('/calculate-nutrition/roster/<int:coach_id>', methods=['GET'])
+def calculate_roster_nutrition_targets(coach_id):
+    """Calculate nutrition targets for every athlete of a coach in one pass"""
+    from app import mysql
+
+    activity_level = request.args.get('activity_level', DEFAULT_ACTIVITY_LEVEL)
+    if activity_level not in ACTIVITY_MULTIPLIERS:
+        return jsonify({'error': 'Invalid activity level'}), 400
+
+    cursor = mysql.connection.cursor()
+    cursor.execute("""
+        SELECT a.athlete_id, u.full_name, a.height, a.weight,
+               COALESCE(a.age, TIMESTAMPDIFF(YEAR, u.date_of_birth, CURDATE())) as age
+        FROM athletes a
+        JOIN users u ON a.user_id = u.user_id
+        WHERE a.coach_id = %s
+        ORDER BY u.full_name
+    """, (coach_id,))
+
+    athletes = cursor.fetchall()
+    cursor.close()
+
+    targets = calculate_roster_nutrition(athletes, activity_level)
+    for athlete, nutrition in zip(athletes, targets):
+        nutrition['athlete_id'] = athlete['athlete_id']
+        nutrition['full_name'] = athlete['full_name']
+
+    return jsonify({'athletes': targets}), 200
+
+# ========== MEAL PLANS ==========
+
+@coach_bp.route('/meal-plans/create', methods=['POST'])
+def create_meal_plan():
+    """Create a meal plan with its days and items, storing macro totals"""
+    from app import mysql
+
+    data = request.json
+    required_fields = ['coach_id', 'athlete_id', 'plan_name']
+
+    if not all(field in data for field in required_fields):
+        return jsonify({'error': 'Missing required fields'}), 400
+
+    # The create page sends a single day as a flat list of meals
+    days = data.get('days') or [{'day_number': 1, 'meals': data.get('meals', [])}]
+
+    cursor = mysql.connection.cursor()
+
+    try:
+        recipe_ids = sorted({
+            int(meal['recipe_id'])
+            for day in days for meal in day.get('meals', [])
+            if meal.get('recipe_id')
+        })
+        recipes = {}
+        if recipe_ids:
+            placeholders = ', '.join(['%s'] * len(recipe_ids))
+            cursor.execute(f"""
+                SELECT recipe_id, recipe_name, calories, protein, carbs, fats
+                FROM recipes
+                WHERE recipe_id IN ({placeholders})
+            """, tuple(recipe_ids))
+            recipes = {row['recipe_id']: row for row in cursor.fetchall()}
+
+        plan_days = []
+        for idx, day in enumerate(days):
+            items = []
+            for order, meal in enumerate(day.get('meals', [])):
+                recipe = recipes.get(int(meal['recipe_id'])) if meal.get('recipe_id') else None
+                item = meal_item_macros(meal, recipe)
+                item.update({
+                    'meal_type': meal.get('meal_type', 'snack'),
+                    'recipe_id': recipe['recipe_id'] if recipe else None,
+                    'meal_name': meal.get('meal_name') or (recipe['recipe_name'] if recipe else None),
+                    'servings': meal.get('servings') or 1,
+                    'ingredients': meal.get('ingredients'),
+                    'instructions': meal.get('instructions'),
+                    'order_number': order + 1
+                })
+                items.append(item)
+
+            plan_days.append({
+                'day_number': int(day.get('day_number', idx + 1)),
+                'items': items,
+                'totals': sum_macros(items)
+            })
+
+        plan_totals = sum_macros([day['totals'] for day in plan_days])
+
+        cursor.execute("""
+            INSERT INTO meal_plans
+            (coach_id, athlete_id, plan_name, description, target_calories, target_protein,
+             target_carbs, target_fats, total_days, total_calories, total_protein, total_carbs, total_fats)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, (
+            data['coach_id'],
+            data['athlete_id'],
+            data['plan_name'],
+            data.get('description'),
+            data.get('daily_calories') or None,
+            data.get('protein_grams') or None,
+            data.get('carbs_grams') or None,
+            data.get('fats_grams') or None,
+            len(plan_days),
+            plan_totals['calories'],
+            plan_totals['protein'],
+            plan_totals['carbs'],
+            plan_totals['fats']
+        ))
+
+        meal_plan_id = cursor.lastrowid
+
+        # executemany sends each batch as one multi-row INSERT
+        cursor.executemany("""
+            INSERT INTO meal_plan_days
+            (meal_plan_id, day_number, total_calories, total_protein, total_carbs, total_fats)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, [
+            (meal_plan_id, day['day_number'], day['totals']['calories'], day['totals']['protein'],
+             day['totals']['carbs'], day['totals']['fats'])
+            for day in plan_days
+        ])
+
+        cursor.execute("SELECT day_id, day_number FROM meal_plan_days WHERE meal_plan_id = %s", (meal_plan_id,))
+        day_ids = {row['day_number']: row['day_id'] for row in cursor.fetchall()}
+
+        item_rows = [
+            (day_ids[day['day_number']], item['meal_type'], item['recipe_id'], item['meal_name'],
+             item['servings'], item['calories'], item['protein'], item['carbs'], item['fats'],
+             item['ingredients'], item['instructions'], item['order_number'])
+            for day in plan_days for item in day['items']
+        ]
+        if item_rows:
+            cursor.executemany("""
+                INSERT INTO meal_plan_items
+                (day_id, meal_type, recipe_id, meal_name, servings, calories, protein, carbs, fats,
+                 ingredients, instructions, order_number)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """, item_rows)
+
+        mysql.connection.commit()
+        cursor.close()
+
+        return jsonify({
+            'message': 'Meal plan created successfully',
+            'meal_plan_id': meal_plan_id,
+            'totals': plan_totals
+        }), 201
+
+    except Exception as e:
+        mysql.connection.rollback()
+        cursor.close()
+        return jsonify({'error': str(e)}), 500
+
+@coach_bp.route('/meal-plans/<int:coach_id>', methods=['GET'])
+def get_coach_meal_plans(coach_id):
+    """Get all meal plans created by a coach"""
+    from app import mysql
+
+    cursor = mysql.connection.cursor()
+    cursor.execute("""
+        SELECT mp.*, u.full_name as athlete_name
+        FROM meal_plans mp
+        JOIN athletes a ON mp.athlete_id = a.athlete_id
+        JOIN users u ON a.user_id = u.user_id
+        WHERE mp.coach_id = %s
+        ORDER BY mp.created_at DESC
+    """, (coach_id,))
+
+    plans = cursor.fetchall()
+    cursor.close()
+
+    return jsonify({'plans': plans}), 200
+
+@coach_bp.route('/athlete-meal-plans/<int:athlete_id>', methods=['GET'])
+def get_athlete_meal_plans(athlete_id):
+    """Get an athlete's meal plans with their stored totals"""
+    from app import mysql
+
+    cursor = mysql.connection.cursor()
+    cursor.execute("""
+        SELECT mp.*, u.full_name as coach_name
+        FROM meal_plans mp
+        JOIN coaches c ON mp.coach_id = c.coach_id
+        JOIN users u ON c.user_id = u.user_id
+        WHERE mp.athlete_id = %s
+        ORDER BY mp.created_at DESC
+    """, (athlete_id,))
+
+    plans = cursor.fetchall()
+    cursor.close()
+
+    return jsonify({'plans': plans}), 200
+
+@coach_bp.route('/meal-plans/detail/<int:meal_plan_id>', methods=['GET'])
+def get_meal_plan_detail(meal_plan_id):
+    """Get a meal plan with its days and items"""
+    from app import mysql
+
+    cursor = mysql.connection.cursor()
+
+    cursor.execute("SELECT * FROM meal_plans WHERE meal_plan_id = %s", (meal_plan_id,))
+    plan = cursor.fetchone()
+
+    if not plan:
+        cursor.close()
+        return jsonify({'error': 'Meal plan not found'}), 404
+
+    cursor.execute("""
+        SELECT * FROM meal_plan_days
+        WHERE meal_plan_id = %s
+        ORDER BY day_number
+    """, (meal_plan_id,))
+    days = cursor.fetchall()
+
+    cursor.execute("""
+        SELECT mi.*
+        FROM meal_plan_items mi
+        JOIN meal_plan_days md ON mi.day_id = md.day_id
+        WHERE md.meal_plan_id = %s
+        ORDER BY mi.day_id, mi.order_number
+    """, (meal_plan_id,))
+    items = cursor.fetchall()
+    cursor.close()
+
+    items_by_day = {}
+    for item in items:
+        items_by_day.setdefault(item['day_id'], []).append(item)
+
+    for day in days:
+        day['items'] = items_by_day.get(day['day_id'], [])
+
+    plan['days'] = days
+    return jsonify({'plan': plan}), 200
+
 # ========== ANALYTICS ==========
 
+def _fetch_coach_analytics(cursor, coach_id):
+    """Collect the coach analytics counters using an open cursor"""
+    cursor.execute("""
+        SELECT COUNT(*) as count 
+        FROM athletes 
+        WHERE coach_id = %s
+    """, (coach_id,))
+    result = cursor.fetchone()
+    total_athletes = result['count'] if result else 0
+    
+    cursor.execute("""
+        SELECT COUNT(DISTINCT pt.athlete_id) as count 
+        FROM performance_tracking pt
+        JOIN athletes a ON pt.athlete_id = a.athlete_id
+        WHERE a.coach_id = %s
+        AND pt.date >= DATE_SUB(CURDATE(), INTERVAL 7 DAY)
+    """, (coach_id,))
+    result = cursor.fetchone()
+    active_athletes = result['count'] if result else 0
+    
+    cursor.execute("""
+        SELECT DATE_FORMAT(request_date, '%%Y-%%m-%%d') as date, COUNT(*) as count 
+        FROM coaching_requests 
+        WHERE coach_id = %s AND request_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)
+        GROUP BY DATE_FORMAT(request_date, '%%Y-%%m-%%d')
+        ORDER BY date
+    """, (coach_id,))
+    request_trends = cursor.fetchall()
+    
+    cursor.execute("""
+        SELECT status, COUNT(*) as count 
+        FROM coaching_requests 
+        WHERE coach_id = %s
+        GROUP BY status
+    """, (coach_id,))
+    rows = cursor.fetchall()
+    request_status = {row['status']: row['count'] for row in rows} if rows else {}
+    
+    cursor.execute("""
+        SELECT status, COUNT(*) as count 
+        FROM coach_assignments 
+        WHERE coach_id = %s
+        GROUP BY status
+    """, (coach_id,))
+    rows = cursor.fetchall()
+    task_completion = {row['status']: row['count'] for row in rows} if rows else {}
+    
+    # Pending requests and completed tasks fall out of the grouped status counts
+    return {
+        'total_athletes': total_athletes,
+        'active_athletes': active_athletes,
+        'pending_requests': request_status.get('pending', 0),
+        'completed_tasks': task_completion.get('completed', 0),
+        'request_trends': request_trends,
+        'request_status': request_status,
+        'task_completion': task_completion
+    }
+
 @coach_bp.route('/analytics/<int:coach_id>', methods=['GET'])
 def get_coach_analytics(coach_id):
     """Get comprehensive analytics for coach"""
@@ -693,78 +1569,200 @@ def get_coach_analytics(coach_id):
     cursor = mysql.connection.cursor()
     
     try:
-        cursor.execute("""
-            SELECT COUNT(*) as count 
-            FROM athletes 
-            WHERE coach_id = %s
-        """, (coach_id,))
-        result = cursor.fetchone()
-        total_athletes = result['count'] if result else 0
+        analytics = _fetch_coach_analytics(cursor, coach_id)
+        cursor.close()
         
-        cursor.execute("""
-            SELECT COUNT(DISTINCT athlete_id) as count 
-            FROM performance_tracking 
-            WHERE athlete_id IN (SELECT athlete_id FROM athletes WHERE coach_id = %s)
-            AND date >= DATE_SUB(CURDATE(), INTERVAL 7 DAY)
-        """, (coach_id,))
-        result = cursor.fetchone()
-        active_athletes = result['count'] if result else 0
+        return jsonify(analytics), 200
         
+    except Exception as e:
+        cursor.close()
+        return jsonify({'error': str(e)}), 500
+
+@coach_bp.route('/dashboard/<int:coach_id>', methods=['GET'])
+@token_required
+def get_coach_dashboard(current_user, coach_id):
+    """Get coach info, roster, analytics, requests and assignments in one response"""
+    from app import mysql
+    
+    if current_user.get('user_type') != 'coach' or int(current_user.get('coach_id') or 0) != coach_id:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    started = time.perf_counter()
+    cursor = mysql.connection.cursor()
+    
+    try:
+        # mysqlclient can't run queries concurrently on one connection and opening
+        # extra connections per request costs more than these indexed reads, so the
+        # independent queries are batched back to back on the request's connection.
         cursor.execute("""
-            SELECT COUNT(*) as count 
-            FROM coaching_requests 
-            WHERE coach_id = %s AND status = 'pending'
+            SELECT c.coach_id, c.specialization, c.experience_years, c.hourly_rate,
+                   c.rating, c.total_reviews,
+                   u.user_id, u.full_name, u.email, u.profile_picture
+            FROM coaches c
+            JOIN users u ON c.user_id = u.user_id
+            WHERE c.coach_id = %s
         """, (coach_id,))
-        result = cursor.fetchone()
-        pending_requests = result['count'] if result else 0
+        coach = cursor.fetchone()
         
-        cursor.execute("""
-            SELECT COUNT(*) as count 
-            FROM coach_assignments 
-            WHERE coach_id = %s AND status = 'completed'
-        """, (coach_id,))
-        result = cursor.fetchone()
-        completed_tasks = result['count'] if result else 0
+        if not coach:
+            cursor.close()
+            return jsonify({'error': 'Coach not found'}), 404
         
-        cursor.execute("""
-            SELECT DATE_FORMAT(request_date, '%%Y-%%m-%%d') as date, COUNT(*) as count 
-            FROM coaching_requests 
-            WHERE coach_id = %s AND request_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)
-            GROUP BY DATE_FORMAT(request_date, '%%Y-%%m-%%d')
-            ORDER BY date
-        """, (coach_id,))
-        request_trends = cursor.fetchall()
+        athletes = _fetch_coach_athletes(cursor, coach_id)
+        analytics = _fetch_coach_analytics(cursor, coach_id)
+        requests = _fetch_coach_requests(cursor, coach_id)
         
         cursor.execute("""
-            SELECT status, COUNT(*) as count 
-            FROM coaching_requests 
-            WHERE coach_id = %s
-            GROUP BY status
-        """, (coach_id,))
-        rows = cursor.fetchall()
-        request_status = {row['status']: row['count'] for row in rows} if rows else {}
+            SELECT ca.assignment_id, ca.athlete_id, u.full_name as athlete_name,
+                   ca.task_title, ca.due_date, ca.status, ca.priority, ca.created_date
+            FROM coach_assignments ca
+            JOIN athletes a ON ca.athlete_id = a.athlete_id
+            JOIN users u ON a.user_id = u.user_id
+            WHERE ca.coach_id = %s
+            ORDER BY ca.due_date ASC
+            LIMIT %s
+        """, (coach_id, DASHBOARD_ASSIGNMENT_LIMIT))
+        assignments = cursor.fetchall()
+        cursor.close()
         
-        cursor.execute("""
-            SELECT status, COUNT(*) as count 
-            FROM coach_assignments 
-            WHERE coach_id = %s
-            GROUP BY status
-        """, (coach_id,))
-        rows = cursor.fetchall()
-        task_completion = {row['status']: row['count'] for row in rows} if rows else {}
+        elapsed_ms = (time.perf_counter() - started) * 1000
         
-        cursor.close()
+        response = jsonify({
+            'coach': coach,
+            'athletes': athletes,
+            'analytics': analytics,
+            'requests': requests,
+            'assignments': assignments
+        })
+        response.headers['Server-Timing'] = f'db;dur={elapsed_ms:.1f}'
+        return response, 200
         
+    except Exception as e:
+        cursor.close()
+        return jsonify({'error': str(e)}), 500
+
+@coach_bp.route('/export/<dataset>', methods=['GET'])
+@token_required
+def export_roster_history(current_user, dataset):
+    """Stream one dataset for every athlete on the coach's roster as CSV or JSON Lines"""
+    from app import mysql
+    
+    fmt = request.args.get('format', 'csv')
+    
+    if current_user.get('user_type') != 'coach':
+        return jsonify({'error': 'Unauthorized'}), 403
+    if dataset not in EXPORT_DATASETS:
+        return jsonify({'error': f'Dataset must be one of {", ".join(EXPORT_DATASETS)}'}), 400
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': 'Format must be csv or jsonl'}), 400
+    
+    coach_id = current_user.get('coach_id')
+    if not coach_id:
+        cursor = mysql.connection.cursor()
+        cursor.execute("SELECT coach_id FROM coaches WHERE user_id = %s", (current_user['user_id'],))
+        coach = cursor.fetchone()
+        cursor.close()
+        if not coach:
+            return jsonify({'error': 'Coach not found'}), 404
+        coach_id = coach['coach_id']
+    
+    chunks = stream_export(mysql.connection, build_export_query(dataset, 'roster'), (coach_id,), fmt)
+    
+    return Response(
+        stream_with_context(chunks),
+        mimetype=EXPORT_FORMATS[fmt],
+        headers={'Content-Disposition': f'attachment; filename={export_filename(dataset, f"roster-{coach_id}", fmt)}'}
+    )
+
+@coach_bp.route('/athlete-performance/<int:coach_id>', methods=['GET'])
+def get_roster_performance(coach_id):
+    """Get bucketed performance series for every athlete of a coach"""
+    from app import mysql
+
+    bucket = request.args.get('bucket', 'week')
+    metric_type = request.args.get('metric_type')
+
+    if bucket not in BUCKET_EXPRESSIONS:
+        return jsonify({'error': 'Bucket must be day, week or month'}), 400
+
+    try:
+        start, end = resolve_date_range(bucket, request.args.get('start'), request.args.get('end'))
+        max_points = parse_max_points(request.args.get('max_points'))
+    except ValueError:
+        return jsonify({'error': 'Invalid date range or max_points'}), 400
+
+    cursor = mysql.connection.cursor()
+
+    try:
+        cursor.execute("""
+            SELECT a.athlete_id, u.full_name as athlete_name, a.sport_type,
+                   COALESCE(p.total_workouts, 0) as total_workouts,
+                   COALESCE(g.active_goals, 0) as active_goals,
+                   COALESCE(g.completed_goals, 0) as completed_goals,
+                   COALESCE(t.completed_tasks, 0) as completed_tasks
+            FROM athletes a
+            JOIN users u ON a.user_id = u.user_id
+            LEFT JOIN (
+                SELECT pt.athlete_id, COUNT(*) as total_workouts
+                FROM performance_tracking pt
+                JOIN athletes ra ON pt.athlete_id = ra.athlete_id
+                WHERE ra.coach_id = %s
+                GROUP BY pt.athlete_id
+            ) p ON p.athlete_id = a.athlete_id
+            LEFT JOIN (
+                SELECT gl.athlete_id,
+                       SUM(gl.status = 'active') as active_goals,
+                       SUM(gl.status = 'completed') as completed_goals
+                FROM goals gl
+                JOIN athletes ra ON gl.athlete_id = ra.athlete_id
+                WHERE ra.coach_id = %s
+                GROUP BY gl.athlete_id
+            ) g ON g.athlete_id = a.athlete_id
+            LEFT JOIN (
+                SELECT athlete_id, COUNT(*) as completed_tasks
+                FROM coach_assignments
+                WHERE coach_id = %s AND status = 'completed'
+                GROUP BY athlete_id
+            ) t ON t.athlete_id = a.athlete_id
+            WHERE a.coach_id = %s
+            ORDER BY u.full_name
+        """, (coach_id, coach_id, coach_id, coach_id))
+        athletes = cursor.fetchall()
+
+        query = f"""
+            SELECT pt.athlete_id, pt.metric_type, {BUCKET_EXPRESSIONS[bucket]} as bucket,
+                   {BUCKET_AGGREGATES}
+            FROM performance_tracking pt
+            JOIN athletes a ON pt.athlete_id = a.athlete_id
+            WHERE a.coach_id = %s AND pt.date BETWEEN %s AND %s
+        """
+        params = [coach_id, start, end]
+
+        if metric_type:
+            query += " AND pt.metric_type = %s"
+            params.append(metric_type)
+
+        query += " GROUP BY pt.athlete_id, pt.metric_type, bucket ORDER BY pt.athlete_id, pt.metric_type, bucket"
+
+        cursor.execute(query, tuple(params))
+        series = group_series(cursor.fetchall(), max_points)
+        cursor.close()
+
+        for athlete in athletes:
+            athlete['total_workouts'] = int(athlete['total_workouts'])
+            athlete['active_goals'] = int(athlete['active_goals'])
+            athlete['completed_goals'] = int(athlete['completed_goals'])
+            athlete['completed_tasks'] = int(athlete['completed_tasks'])
+            athlete['series'] = series.get(athlete['athlete_id'], {})
+
         return jsonify({
-            'total_athletes': total_athletes,
-            'active_athletes': active_athletes,
-            'pending_requests': pending_requests,
-            'completed_tasks': completed_tasks,
-            'request_trends': request_trends,
-            'request_status': request_status,
-            'task_completion': task_completion
+            'bucket': bucket,
+            'start': start,
+            'end': end,
+            'max_points': max_points,
+            'performance': athletes
         }), 200
-        
+
     except Exception as e:
         cursor.close()
         return jsonify({'error': str(e)}), 500
@@ -809,6 +1807,8 @@ def upload_picture():
         mysql.connection.commit()
         cursor.close()
         
+        rebuild_coach_documents(mysql, user_id=user_id)
+        
         return jsonify({
             'message': 'Profile picture uploaded successfully',
             'profile_picture': profile_url
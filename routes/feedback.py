@@ -2,6 +2,11 @@ from flask import Blueprint, request, jsonify, current_app
 from functools import wraps
 import jwt
 from utils.logger import logger, log_exception
+from utils.ratings import apply_rating, fetch_rating_aggregate, parse_rating, sync_coach_rating
+from utils.identity import resolve_identities
+from utils.coach_search import refresh_coach_in_index
+from utils.coach_matching import refresh_coach_features
+from utils.coach_profiles import rebuild_coach_documents
 
 feedback_bp = Blueprint('feedback', __name__)
 
@@ -42,10 +47,14 @@ def get_athlete_feedback(current_user, athlete_id):
     """, (athlete_id,))
     feedbacks = cursor.fetchall()
     total_count = len(feedbacks)
-    ratings = [f.get('performance_rating') for f in feedbacks if f.get('performance_rating') is not None]
-    avg_rating = float(sum(ratings) / len(ratings)) if ratings else 0.0
+    ratings = fetch_rating_aggregate(cursor, athlete_id)
     cursor.close()
-    return jsonify({'feedbacks': feedbacks, 'total_count': total_count, 'avg_rating': avg_rating}), 200
+    return jsonify({
+        'feedbacks': feedbacks,
+        'total_count': total_count,
+        'avg_rating': ratings['average'],
+        'ratings': ratings
+    }), 200
 
 @feedback_bp.route('/coach/<int:coach_id>/athletes', methods=['GET'])
 @token_required
@@ -113,6 +122,11 @@ def create_feedback(current_user):
     if not athlete_id or not feedback_text.strip():
         return jsonify({'error': 'Missing or empty fields'}), 400
 
+    try:
+        performance_rating = parse_rating(data.get('performance_rating'))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'performance_rating must be an integer from 1 to 5'}), 400
+
     cursor = mysql.connection.cursor()
     cursor.execute("""
         SELECT 1 FROM coaching_requests WHERE coach_id=%s AND athlete_id=%s AND status='accepted'
@@ -122,19 +136,14 @@ def create_feedback(current_user):
         return jsonify({'error': 'Not your accepted athlete'}), 403
 
     try:
-        cursor.execute("SELECT user_id FROM coaches WHERE coach_id = %s", (coach_id,))
-        coach_user_row = cursor.fetchone()
-        coach_user_id = coach_user_row['user_id'] if coach_user_row and 'user_id' in coach_user_row else None
-
-        cursor.execute("SELECT user_id FROM athletes WHERE athlete_id = %s", (athlete_id,))
-        athlete_user_row = cursor.fetchone()
-        athlete_user_id = athlete_user_row['user_id'] if athlete_user_row and 'user_id' in athlete_user_row else None
+        identities = resolve_identities(mysql, athlete_ids=[athlete_id], coach_ids=[coach_id])
+        coach_user_id = (identities.coach(coach_id) or {}).get('user_id')
+        athlete_user_id = (identities.athlete(athlete_id) or {}).get('user_id')
 
         if not coach_user_id or not athlete_user_id:
             cursor.close()
             return jsonify({'error': 'Invalid coach or athlete id for insertion'}), 400
 
-        performance_rating = data.get('performance_rating')
         focus_areas = data.get('focus_areas')
         strengths = data.get('strengths')
         improvements_needed = data.get('improvements_needed')
@@ -144,8 +153,9 @@ def create_feedback(current_user):
             (coach_id, athlete_id, feedback_text, performance_rating, focus_areas, strengths, improvements_needed)
             VALUES (%s, %s, %s, %s, %s, %s, %s)
         """, (coach_user_id, athlete_user_id, feedback_text, performance_rating, focus_areas, strengths, improvements_needed))
-        mysql.connection.commit()
         feedback_id = cursor.lastrowid
+        apply_rating(cursor, athlete_user_id, performance_rating)
+        mysql.connection.commit()
         cursor.close()
         return jsonify({'message': 'Feedback submitted', 'feedback_id': feedback_id}), 201
     except Exception as e:
@@ -187,7 +197,10 @@ def feedback_detail_or_delete(current_user, feedback_id):
         return jsonify({'feedback': row}), 200
 
     try:
-        cursor.execute("SELECT coach_id FROM feedback WHERE feedback_id = %s", (feedback_id,))
+        cursor.execute("""
+            SELECT coach_id, athlete_id, performance_rating FROM feedback
+            WHERE feedback_id = %s FOR UPDATE
+        """, (feedback_id,))
         frow = cursor.fetchone()
         if not frow:
             cursor.close()
@@ -198,6 +211,7 @@ def feedback_detail_or_delete(current_user, feedback_id):
             return jsonify({'error': 'Access denied'}), 403
 
         cursor.execute("DELETE FROM feedback WHERE feedback_id = %s", (feedback_id,))
+        apply_rating(cursor, frow['athlete_id'], frow.get('performance_rating'), delta=-1)
         mysql.connection.commit()
         cursor.close()
         return jsonify({'message': 'Feedback deleted'}), 200
@@ -205,3 +219,126 @@ def feedback_detail_or_delete(current_user, feedback_id):
         mysql.connection.rollback()
         cursor.close()
         return jsonify({'error': str(e)}), 500
+
+def _review_target(cursor, user_id, coach_id):
+    """The reviewing athlete's id and the coach's user id, if the coach accepted this athlete"""
+    cursor.execute("""
+        SELECT a.athlete_id, c.user_id AS coach_user_id
+        FROM athletes a
+        JOIN coaching_requests cr ON cr.athlete_id = a.athlete_id AND cr.status = 'accepted'
+        JOIN coaches c ON c.coach_id = cr.coach_id
+        WHERE a.user_id = %s AND cr.coach_id = %s
+        LIMIT 1
+    """, (user_id, coach_id))
+    return cursor.fetchone()
+
+def _refresh_coach_ratings(mysql, coach_id):
+    refresh_coach_in_index(mysql, coach_id=coach_id)
+    refresh_coach_features(mysql, coach_ids=[coach_id])
+    rebuild_coach_documents(mysql, coach_ids=[coach_id])
+
+@feedback_bp.route('/coach-review', methods=['POST'])
+@token_required
+@log_exception
+def submit_coach_review(current_user):
+    """An athlete rates a coach who accepted them; a second review replaces the first"""
+    if current_user['user_type'] != 'athlete':
+        return jsonify({'error': 'Only athletes may review coaches'}), 403
+
+    from app import mysql
+    data = request.json or {}
+    coach_id = data.get('coach_id')
+    review_text = (data.get('review_text') or '').strip() or None
+
+    try:
+        rating = parse_rating(data.get('rating'))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'rating must be an integer from 1 to 5'}), 400
+    if not coach_id or rating is None:
+        return jsonify({'error': 'coach_id and rating are required'}), 400
+
+    cursor = mysql.connection.cursor()
+    target = _review_target(cursor, current_user['user_id'], coach_id)
+    if not target:
+        cursor.close()
+        return jsonify({'error': 'You can only review a coach who accepted you'}), 403
+
+    try:
+        cursor.execute("""
+            SELECT rating FROM coach_reviews
+            WHERE coach_id = %s AND athlete_id = %s FOR UPDATE
+        """, (coach_id, target['athlete_id']))
+        existing = cursor.fetchone()
+
+        if existing:
+            cursor.execute("""
+                UPDATE coach_reviews SET rating = %s, review_text = %s
+                WHERE coach_id = %s AND athlete_id = %s
+            """, (rating, review_text, coach_id, target['athlete_id']))
+            apply_rating(cursor, target['coach_user_id'], existing['rating'], delta=-1)
+        else:
+            cursor.execute("""
+                INSERT INTO coach_reviews (coach_id, athlete_id, rating, review_text)
+                VALUES (%s, %s, %s, %s)
+            """, (coach_id, target['athlete_id'], rating, review_text))
+        apply_rating(cursor, target['coach_user_id'], rating)
+        sync_coach_rating(cursor, target['coach_user_id'])
+        mysql.connection.commit()
+        cursor.close()
+    except Exception as e:
+        mysql.connection.rollback()
+        cursor.close()
+        return jsonify({'error': str(e)}), 500
+
+    _refresh_coach_ratings(mysql, coach_id)
+    if existing:
+        return jsonify({'message': 'Review updated'}), 200
+    return jsonify({'message': 'Review submitted'}), 201
+
+@feedback_bp.route('/coach-review/<int:coach_id>', methods=['GET', 'DELETE'])
+@token_required
+@log_exception
+def coach_review_detail_or_delete(current_user, coach_id):
+    """The athlete's own review of a coach: read it, or withdraw it"""
+    if current_user['user_type'] != 'athlete':
+        return jsonify({'error': 'Only athletes may review coaches'}), 403
+
+    from app import mysql
+    cursor = mysql.connection.cursor()
+    target = _review_target(cursor, current_user['user_id'], coach_id)
+    if not target:
+        cursor.close()
+        return jsonify({'error': 'You can only review a coach who accepted you'}), 403
+
+    if request.method == 'GET':
+        cursor.execute("""
+            SELECT rating, review_text, created_at, updated_at FROM coach_reviews
+            WHERE coach_id = %s AND athlete_id = %s
+        """, (coach_id, target['athlete_id']))
+        review = cursor.fetchone()
+        cursor.close()
+        return jsonify({'review': review}), 200
+
+    try:
+        cursor.execute("""
+            SELECT rating FROM coach_reviews
+            WHERE coach_id = %s AND athlete_id = %s FOR UPDATE
+        """, (coach_id, target['athlete_id']))
+        existing = cursor.fetchone()
+        if not existing:
+            cursor.close()
+            return jsonify({'error': 'Review not found'}), 404
+
+        cursor.execute("DELETE FROM coach_reviews WHERE coach_id = %s AND athlete_id = %s",
+                       (coach_id, target['athlete_id']))
+        apply_rating(cursor, target['coach_user_id'], existing['rating'], delta=-1)
+        sync_coach_rating(cursor, target['coach_user_id'])
+        mysql.connection.commit()
+        cursor.close()
+    except Exception as e:
+        mysql.connection.rollback()
+        cursor.close()
+        return jsonify({'error': str(e)}), 500
+
+    _refresh_coach_ratings(mysql, coach_id)
+    return jsonify({'message': 'Review deleted'}), 200
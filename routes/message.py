@@ -1,8 +1,18 @@
 from flask import Blueprint, request, jsonify
 from datetime import datetime
+from routes.auth import token_required
+from utils.identity import resolve_identities
 
 message_bp = Blueprint('message', __name__)
 
+DIRECTORY_PAGE_SIZE = 20
+DIRECTORY_MAX_PAGE_SIZE = 50
+RECENT_CORRESPONDENT_DAYS = 90
+
+
+def _escape_like(value):
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
 
 @message_bp.route('/conversations', methods=['GET'])
 def get_conversations():
@@ -112,9 +122,8 @@ def send_message():
         message_id = cursor.lastrowid
         
         # Get sender name
-        cursor.execute("SELECT full_name FROM users WHERE user_id = %s", (data['sender_id'],))
-        sender = cursor.fetchone()
-        sender_name = sender['full_name'] if sender else 'Someone'
+        identities = resolve_identities(mysql, user_ids=[data['sender_id']])
+        sender_name = identities.name(identities.user(data['sender_id']), 'Someone')
         
         # Notify receiver about new message
         create_notification(
@@ -139,6 +148,103 @@ def send_message():
         return jsonify({'error': str(e)}), 500
 
 
+@message_bp.route('/directory', methods=['GET'])
+@token_required
+def search_directory(current_user):
+    """Find message recipients by name prefix; own coach/athletes and recent correspondents first"""
+    from app import mysql
+    
+    user_id = current_user['user_id']
+    role = request.args.get('role') or ('athlete' if current_user.get('user_type') == 'coach' else 'coach')
+    
+    if role not in ('athlete', 'coach'):
+        return jsonify({'error': 'Invalid role'}), 400
+    
+    try:
+        page = max(int(request.args.get('page', 1)), 1)
+        per_page = min(max(int(request.args.get('per_page', DIRECTORY_PAGE_SIZE)), 1), DIRECTORY_MAX_PAGE_SIZE)
+    except ValueError:
+        return jsonify({'error': 'Invalid page or per_page'}), 400
+    
+    name_prefix = _escape_like(request.args.get('q', '').strip().lower()) + '%'
+    offset = (page - 1) * per_page
+    
+    cursor = mysql.connection.cursor()
+    
+    # Connected people (own coach or own athletes) and recent correspondents are few,
+    # so they are fetched whole and ranked; everyone else is read in name order
+    # straight off the (user_type, full_name_normalized) index.
+    cursor.execute("""
+        SELECT u.user_id, u.full_name, u.profile_picture, a.athlete_id, c.coach_id,
+               MAX(p.is_connected) AS is_connected, MAX(p.last_message_at) AS last_message_at
+        FROM (
+            SELECT ra.user_id, 1 AS is_connected, NULL AS last_message_at
+            FROM athletes ra JOIN coaches mc ON ra.coach_id = mc.coach_id
+            WHERE mc.user_id = %s
+            UNION ALL
+            SELECT oc.user_id, 1, NULL
+            FROM athletes ma JOIN coaches oc ON ma.coach_id = oc.coach_id
+            WHERE ma.user_id = %s
+            UNION ALL
+            SELECT receiver_id, 0, MAX(sent_at) FROM messages
+            WHERE sender_id = %s AND sent_at >= DATE_SUB(NOW(), INTERVAL %s DAY)
+            GROUP BY receiver_id
+            UNION ALL
+            SELECT sender_id, 0, MAX(sent_at) FROM messages
+            WHERE receiver_id = %s AND sent_at >= DATE_SUB(NOW(), INTERVAL %s DAY)
+            GROUP BY sender_id
+        ) p
+        JOIN users u ON u.user_id = p.user_id
+        LEFT JOIN athletes a ON a.user_id = u.user_id
+        LEFT JOIN coaches c ON c.user_id = u.user_id
+        WHERE u.user_type = %s AND u.full_name_normalized LIKE %s AND u.user_id <> %s
+        GROUP BY u.user_id, u.full_name, u.profile_picture, a.athlete_id, c.coach_id
+        ORDER BY is_connected DESC, last_message_at DESC, u.full_name_normalized
+    """, (
+        user_id, user_id,
+        user_id, RECENT_CORRESPONDENT_DAYS,
+        user_id, RECENT_CORRESPONDENT_DAYS,
+        role, name_prefix, user_id
+    ))
+    priority = list(cursor.fetchall())
+    
+    users = priority[offset:offset + per_page + 1]
+    remaining = per_page + 1 - len(users)
+    
+    if remaining > 0:
+        query = """
+            SELECT u.user_id, u.full_name, u.profile_picture, a.athlete_id, c.coach_id,
+                   0 AS is_connected, NULL AS last_message_at
+            FROM users u
+            LEFT JOIN athletes a ON a.user_id = u.user_id
+            LEFT JOIN coaches c ON c.user_id = u.user_id
+            WHERE u.user_type = %s AND u.full_name_normalized LIKE %s AND u.user_id <> %s
+        """
+        params = [role, name_prefix, user_id]
+        
+        if priority:
+            query += f" AND u.user_id NOT IN ({', '.join(['%s'] * len(priority))})"
+            params.extend(row['user_id'] for row in priority)
+        
+        query += " ORDER BY u.full_name_normalized, u.user_id LIMIT %s OFFSET %s"
+        params.extend([remaining, max(offset - len(priority), 0)])
+        
+        cursor.execute(query, tuple(params))
+        users.extend(cursor.fetchall())
+    
+    cursor.close()
+    
+    for row in users:
+        row['is_connected'] = bool(row['is_connected'])
+    
+    return jsonify({
+        'users': users[:per_page],
+        'page': page,
+        'per_page': per_page,
+        'has_more': len(users) > per_page
+    }), 200
+
+
 @message_bp.route('/unread-count', methods=['GET'])
 def get_unread_count():
     """Get total unread message count for a user"""
@@ -12,8 +12,10 @@ CREATE TABLE users (
     registration_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     last_login TIMESTAMP NULL,
     is_active BOOLEAN DEFAULT TRUE,
+    full_name_normalized VARCHAR(255) AS (LOWER(TRIM(full_name))) STORED,
     INDEX idx_email (email),
-    INDEX idx_user_type (user_type)
+    INDEX idx_user_type (user_type),
+    INDEX idx_users_type_name (user_type, full_name_normalized)
 );
 
 CREATE TABLE athletes (
@@ -39,7 +41,12 @@ CREATE TABLE coaches (
     bio TEXT,
     rating DECIMAL(3,2) DEFAULT 0.00,
     total_reviews INT DEFAULT 0,
-    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
+    INDEX idx_coaches_specialization (specialization),
+    INDEX idx_coaches_rate (hourly_rate),
+    INDEX idx_coaches_experience (experience_years),
+    INDEX idx_coaches_rating (rating, total_reviews),
+    FULLTEXT INDEX ft_coaches_bio_certifications (bio, certifications)
 );
 
 CREATE TABLE coaching_requests (
@@ -64,9 +71,12 @@ CREATE TABLE performance_tracking (
     unit VARCHAR(50),
     notes TEXT,
     recorded_by INT,
+    dedupe_key VARCHAR(64) NULL,
     FOREIGN KEY (athlete_id) REFERENCES athletes(athlete_id) ON DELETE CASCADE,
     FOREIGN KEY (recorded_by) REFERENCES coaches(coach_id) ON DELETE SET NULL,
-    INDEX idx_athlete_date (athlete_id, date)
+    INDEX idx_athlete_date (athlete_id, date),
+    UNIQUE INDEX uq_performance_athlete_dedupe (athlete_id, dedupe_key),
+    INDEX idx_performance_athlete_metric_date (athlete_id, metric_type, date, metric_value)
 );
 
 CREATE TABLE feedback (
@@ -168,3 +178,162 @@ CREATE TABLE venue_bookings (
     INDEX idx_venue_date (venue_id, booking_date)
 );
 
+CREATE TABLE meal_plans (
+    meal_plan_id INT AUTO_INCREMENT PRIMARY KEY,
+    coach_id INT NOT NULL,
+    athlete_id INT NOT NULL,
+    plan_name VARCHAR(255) NOT NULL,
+    description TEXT,
+    target_calories INT,
+    target_protein INT,
+    target_carbs INT,
+    target_fats INT,
+    total_days INT NOT NULL DEFAULT 1,
+    total_calories DECIMAL(10,2) NOT NULL DEFAULT 0,
+    total_protein DECIMAL(8,2) NOT NULL DEFAULT 0,
+    total_carbs DECIMAL(8,2) NOT NULL DEFAULT 0,
+    total_fats DECIMAL(8,2) NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (coach_id) REFERENCES coaches(coach_id) ON DELETE CASCADE,
+    FOREIGN KEY (athlete_id) REFERENCES athletes(athlete_id) ON DELETE CASCADE,
+    INDEX idx_coach_created (coach_id, created_at),
+    INDEX idx_athlete_created (athlete_id, created_at)
+);
+
+CREATE TABLE meal_plan_days (
+    day_id INT AUTO_INCREMENT PRIMARY KEY,
+    meal_plan_id INT NOT NULL,
+    day_number INT NOT NULL,
+    total_calories DECIMAL(10,2) NOT NULL DEFAULT 0,
+    total_protein DECIMAL(8,2) NOT NULL DEFAULT 0,
+    total_carbs DECIMAL(8,2) NOT NULL DEFAULT 0,
+    total_fats DECIMAL(8,2) NOT NULL DEFAULT 0,
+    FOREIGN KEY (meal_plan_id) REFERENCES meal_plans(meal_plan_id) ON DELETE CASCADE,
+    UNIQUE KEY uq_plan_day (meal_plan_id, day_number)
+);
+
+CREATE TABLE meal_plan_items (
+    item_id INT AUTO_INCREMENT PRIMARY KEY,
+    day_id INT NOT NULL,
+    meal_type ENUM('breakfast', 'lunch', 'dinner', 'snack') NOT NULL,
+    recipe_id INT NULL,
+    meal_name VARCHAR(255),
+    servings DECIMAL(5,2) NOT NULL DEFAULT 1,
+    calories DECIMAL(8,2) NOT NULL DEFAULT 0,
+    protein DECIMAL(6,2) NOT NULL DEFAULT 0,
+    carbs DECIMAL(6,2) NOT NULL DEFAULT 0,
+    fats DECIMAL(6,2) NOT NULL DEFAULT 0,
+    ingredients TEXT,
+    instructions TEXT,
+    order_number INT,
+    FOREIGN KEY (day_id) REFERENCES meal_plan_days(day_id) ON DELETE CASCADE,
+    INDEX idx_day_order (day_id, order_number),
+    INDEX idx_recipe (recipe_id)
+);
+
+CREATE TABLE rating_aggregates (
+    user_id INT PRIMARY KEY,
+    rating_count INT NOT NULL DEFAULT 0,
+    rating_sum INT NOT NULL DEFAULT 0,
+    rating_1 INT NOT NULL DEFAULT 0,
+    rating_2 INT NOT NULL DEFAULT 0,
+    rating_3 INT NOT NULL DEFAULT 0,
+    rating_4 INT NOT NULL DEFAULT 0,
+    rating_5 INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+);
+
+CREATE TABLE coach_reviews (
+    review_id INT AUTO_INCREMENT PRIMARY KEY,
+    coach_id INT NOT NULL,
+    athlete_id INT NOT NULL,
+    rating TINYINT NOT NULL,
+    review_text TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (coach_id) REFERENCES coaches(coach_id) ON DELETE CASCADE,
+    FOREIGN KEY (athlete_id) REFERENCES athletes(athlete_id) ON DELETE CASCADE,
+    UNIQUE KEY uq_coach_reviews_coach_athlete (coach_id, athlete_id),
+    INDEX idx_coach_reviews_athlete (athlete_id)
+);
+
+CREATE TABLE exercises (
+    exercise_id INT AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    normalized_name VARCHAR(255) NOT NULL,
+    category VARCHAR(100),
+    created_by INT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_exercises_normalized_name (normalized_name),
+    FOREIGN KEY (created_by) REFERENCES coaches(coach_id) ON DELETE SET NULL
+);
+
+CREATE TABLE coach_profile_documents (
+    coach_id INT PRIMARY KEY,
+    document MEDIUMTEXT NOT NULL,
+    etag CHAR(32) NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (coach_id) REFERENCES coaches(coach_id) ON DELETE CASCADE
+);
+
+CREATE TABLE activity_imports (
+    import_id INT AUTO_INCREMENT PRIMARY KEY,
+    athlete_id INT NOT NULL,
+    file_format ENUM('gpx', 'tcx') NOT NULL,
+    file_name VARCHAR(255),
+    file_sha1 CHAR(40) NOT NULL,
+    status ENUM('queued', 'processing', 'completed', 'failed') DEFAULT 'queued',
+    activity_date DATE NULL,
+    summary TEXT NULL,
+    error VARCHAR(500) NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    completed_at TIMESTAMP NULL,
+    FOREIGN KEY (athlete_id) REFERENCES athletes(athlete_id) ON DELETE CASCADE,
+    INDEX idx_activity_imports_athlete (athlete_id, created_at)
+);
+
+CREATE TABLE activity_sample_streams (
+    athlete_id INT NOT NULL,
+    import_id INT NOT NULL,
+    channel VARCHAR(32) NOT NULL,
+    started_at DATETIME NOT NULL,
+    sample_count INT NOT NULL,
+    value_scale INT NOT NULL,
+    samples MEDIUMBLOB NOT NULL,
+    PRIMARY KEY (athlete_id, import_id, channel),
+    FOREIGN KEY (athlete_id) REFERENCES athletes(athlete_id) ON DELETE CASCADE,
+    FOREIGN KEY (import_id) REFERENCES activity_imports(import_id) ON DELETE CASCADE
+);
+
+CREATE TABLE personal_records (
+    athlete_id INT NOT NULL,
+    metric_type VARCHAR(100) NOT NULL,
+    best_value DECIMAL(10,2) NOT NULL,
+    best_date DATE NOT NULL,
+    previous_value DECIMAL(10,2) NULL,
+    previous_date DATE NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (athlete_id, metric_type),
+    FOREIGN KEY (athlete_id) REFERENCES athletes(athlete_id) ON DELETE CASCADE
+);
+
+CREATE TABLE athlete_streaks (
+    athlete_id INT PRIMARY KEY,
+    current_streak INT NOT NULL DEFAULT 0,
+    longest_streak INT NOT NULL DEFAULT 0,
+    streak_start DATE NULL,
+    last_active_date DATE NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (athlete_id) REFERENCES athletes(athlete_id) ON DELETE CASCADE
+);
+
+CREATE TABLE athlete_weekly_adherence (
+    athlete_id INT NOT NULL,
+    week_start DATE NOT NULL,
+    planned INT NOT NULL DEFAULT 0,
+    completed INT NOT NULL DEFAULT 0,
+    skipped INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (athlete_id, week_start),
+    FOREIGN KEY (athlete_id) REFERENCES athletes(athlete_id) ON DELETE CASCADE
+);
@@ -217,44 +217,34 @@ function showNewMessageModal() {
 function closeNewMessageModal() {
     document.getElementById('newMessageModal').style.display = 'none';
     document.getElementById('newMessageText').value = '';
+    document.getElementById('newMessageSearch').value = '';
 }
 
-// Load available users - UPDATED VERSION
-async function loadAvailableUsers() {
+// Load available users from the paginated people directory
+let directorySearchTimer = null;
+
+function searchAvailableUsers(query) {
+    clearTimeout(directorySearchTimer);
+    directorySearchTimer = setTimeout(() => loadAvailableUsers(query), 200);
+}
+
+async function loadAvailableUsers(query = '') {
     const token = localStorage.getItem('token');
     
     try {
-        const userResponse = await fetch(`${API_URL}/auth/me`, {
+        const response = await fetch(`${API_URL}/messages/directory?q=${encodeURIComponent(query)}&per_page=50`, {
             headers: { 'Authorization': `Bearer ${token}` }
         });
         
-        if (userResponse.ok) {
-            const userData = await userResponse.json();
-            const userType = userData.user.role;
-            
-            // Get coaches if athlete, athletes if coach
-            let endpoint;
-            if (userType === 'athlete') {
-                endpoint = `${API_URL}/athlete/all-coaches`;
-            } else {
-                endpoint = `${API_URL}/coach/all-athletes`;
-            }
-            
-            const response = await fetch(endpoint, {
-                headers: { 'Authorization': `Bearer ${token}` }
-            });
+        if (response.ok) {
+            const data = await response.json();
             
-            if (response.ok) {
-                const data = await response.json();
-                const users = data.coaches || data.athletes || [];
-                
-                const select = document.getElementById('newMessageUser');
-                select.innerHTML = '<option value="">Select a user...</option>' + 
-                    users.map(u => `<option value="${u.user_id}">${u.full_name}</option>`).join('');
-            } else {
-                console.error('Failed to load users:', response.status);
-                alert('Failed to load users. Please try again.');
-            }
+            const select = document.getElementById('newMessageUser');
+            select.innerHTML = '<option value="">Select a user...</option>' + 
+                data.users.map(u => `<option value="${u.user_id}">${u.full_name}${u.is_connected ? ' ★' : ''}</option>`).join('');
+        } else {
+            console.error('Failed to load users:', response.status);
+            alert('Failed to load users. Please try again.');
         }
     } catch (error) {
         console.error('Error loading available users:', error);
@@ -0,0 +1,42 @@
+import pytest
+
+
+class FailingConnection:
+    """
+    Stand-in for mysql.connection and its cursor: statements starting with
+    fail_on raise as if the server went away, the rest are recorded.
+    """
+
+    def __init__(self, fail_on=''):
+        self.fail_on = fail_on
+        self.statements = []
+        self.commits = 0
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql, params=None):
+        sql = ' '.join(sql.split())
+        if sql.startswith(self.fail_on):
+            raise RuntimeError('MySQL server has gone away')
+        self.statements.append((sql, params))
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FailingMySQL:
+    def __init__(self, fail_on=''):
+        self.connection = FailingConnection(fail_on)
+
+
+@pytest.fixture
+def failing_mysql():
+    """Build a mysql stand-in whose statements starting with fail_on (default: all) raise"""
+    return FailingMySQL
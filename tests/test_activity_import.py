@@ -0,0 +1,83 @@
+import io
+import os
+import sys
+from datetime import date
+
+# Add parent directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.activity_import import (
+    ActivityImportError, activity_format, iter_track_points, summarize_activity, summary_rows
+)
+
+GPX = b"""<?xml version="1.0" encoding="UTF-8"?>
+<gpx version="1.1" creator="watch" xmlns="http://www.topografix.com/GPX/1/1"
+     xmlns:gpxtpx="http://www.garmin.com/xmlschemas/TrackPointExtension/v1">
+  <metadata><time>2025-05-01T06:00:00Z</time></metadata>
+  <trk><trkseg>
+    <trkpt lat="52.0000" lon="13.0000"><ele>30.0</ele><time>2025-05-01T06:30:00Z</time>
+      <extensions><gpxtpx:TrackPointExtension><gpxtpx:hr>120</gpxtpx:hr></gpxtpx:TrackPointExtension></extensions>
+    </trkpt>
+    <trkpt lat="52.0090" lon="13.0000"><ele>31.0</ele><time>2025-05-01T06:35:00.000Z</time>
+      <extensions><gpxtpx:TrackPointExtension><gpxtpx:hr>150</gpxtpx:hr></gpxtpx:TrackPointExtension></extensions>
+    </trkpt>
+    <trkpt lat="52.0180" lon="13.0000"><ele>40.0</ele><time>2025-05-01T06:40:00Z</time>
+      <extensions><gpxtpx:TrackPointExtension><gpxtpx:hr>165</gpxtpx:hr></gpxtpx:TrackPointExtension></extensions>
+    </trkpt>
+  </trkseg></trk>
+</gpx>
+"""
+
+TCX = b"""<?xml version="1.0" encoding="UTF-8"?>
+<TrainingCenterDatabase xmlns="http://www.garmin.com/xmlschemas/TrainingCenterDatabase/v2">
+  <Activities><Activity Sport="Running"><Lap StartTime="2025-05-02T07:00:00Z"><Track>
+    <Trackpoint><Time>2025-05-02T07:00:00Z</Time><AltitudeMeters>10</AltitudeMeters>
+      <DistanceMeters>0</DistanceMeters><HeartRateBpm><Value>110</Value></HeartRateBpm></Trackpoint>
+    <Trackpoint><Time>2025-05-02T07:30:00Z</Time><AltitudeMeters>8</AltitudeMeters>
+      <DistanceMeters>6000</DistanceMeters><HeartRateBpm><Value>160</Value></HeartRateBpm></Trackpoint>
+  </Track></Lap></Activity></Activities>
+</TrainingCenterDatabase>
+"""
+
+
+class TestActivityImport:
+    def test_activity_format_from_extension(self):
+        assert activity_format('Morning_Run.GPX') == 'gpx'
+        assert activity_format('ride.tcx') == 'tcx'
+        assert activity_format('ride.fit') is None
+
+    def test_gpx_summary(self):
+        summary = summarize_activity(iter_track_points(io.BytesIO(GPX), 'gpx'))
+
+        assert summary['points'] == 3
+        assert summary['distance_km'] == 2.0
+        assert summary['duration_minutes'] == 10.0
+        assert summary['pace_min_per_km'] == 5.0
+        assert summary['elevation_gain_m'] == 10.0
+        assert summary['avg_heart_rate'] == 145
+        assert summary['max_heart_rate'] == 165
+
+    def test_tcx_summary_prefers_device_distance(self):
+        summary = summarize_activity(iter_track_points(io.BytesIO(TCX), 'tcx'))
+
+        assert summary['distance_km'] == 6.0
+        assert summary['duration_minutes'] == 30.0
+        assert summary['elevation_gain_m'] == 0.0
+        assert summary['started_at'].startswith('2025-05-02T07:00:00')
+
+    def test_summary_rows_are_keyed_by_file_hash(self):
+        summary = summarize_activity(iter_track_points(io.BytesIO(TCX), 'tcx'))
+
+        rows = summary_rows(summary, 7, 'a' * 40, 'run.tcx')
+
+        assert {row[2] for row in rows} == {'Distance', 'Activity Duration', 'Pace', 'Elevation Gain', 'Heart Rate', 'Max Heart Rate'}
+        assert all(row[0] == 7 and row[1] == date(2025, 5, 2) for row in rows)
+        assert all(len(row[7]) <= 64 and row[7].startswith('activity:' + 'a' * 40) for row in rows)
+
+    def test_invalid_or_empty_files_are_rejected(self):
+        for body in (b'<gpx><trk>', b'<gpx></gpx>'):
+            try:
+                summarize_activity(iter_track_points(io.BytesIO(body), 'gpx'))
+                assert False, 'Expected ActivityImportError'
+            except ActivityImportError:
+                pass
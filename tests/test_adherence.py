@@ -0,0 +1,66 @@
+import os
+import sys
+from datetime import date
+
+# Add parent directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.adherence import advance_streak, effective_streak, replay_streak, summarize_adherence, week_start
+
+
+class TestAdherence:
+    def test_streak_extends_on_consecutive_days_and_resets_after_gap(self):
+        state = (0, 0, None, None)
+        for day in (1, 2, 2, 3, 6, 7):
+            state = advance_streak(state, date(2025, 4, day))
+
+        assert state == (2, 3, date(2025, 4, 6), date(2025, 4, 7))
+
+    def test_older_log_leaves_streak_unchanged(self):
+        state = (4, 4, date(2025, 4, 1), date(2025, 4, 4))
+
+        assert advance_streak(state, date(2025, 3, 30)) == state
+
+    def test_replay_matches_in_order_folding_for_any_arrival_order(self):
+        days = [date(2025, 4, 3), date(2025, 4, 1), date(2025, 4, 2), date(2025, 4, 2), date(2025, 4, 6)]
+
+        in_order = (0, 0, None, None)
+        for day in sorted(days):
+            in_order = advance_streak(in_order, day)
+
+        assert replay_streak(days) == in_order == (1, 3, date(2025, 4, 6), date(2025, 4, 6))
+
+    def test_stored_streak_breaks_after_a_missed_day(self):
+        assert effective_streak(5, date(2025, 4, 9), today=date(2025, 4, 10)) == 5
+        assert effective_streak(5, date(2025, 4, 10), today=date(2025, 4, 10)) == 5
+        assert effective_streak(5, date(2025, 4, 8), today=date(2025, 4, 10)) == 0
+        assert effective_streak(0, None, today=date(2025, 4, 10)) == 0
+
+    def test_weeks_start_on_monday(self):
+        assert week_start(date(2025, 4, 13)) == date(2025, 4, 7)
+        assert week_start(date(2025, 4, 7)) == date(2025, 4, 7)
+
+    def test_summary_fills_missing_weeks_and_caps_adherence(self):
+        streak_row = {
+            'current_streak': 3, 'longest_streak': 9,
+            'streak_start': date(2025, 4, 7), 'last_active_date': date(2025, 4, 9),
+        }
+        week_rows = [
+            {'week_start': date(2025, 3, 31), 'planned': 4, 'completed': 3, 'skipped': 1},
+            {'week_start': date(2025, 4, 7), 'planned': 2, 'completed': 3, 'skipped': 0},
+        ]
+
+        summary = summarize_adherence(streak_row, week_rows, weeks=3, today=date(2025, 4, 10))
+
+        assert summary['current_streak'] == 3
+        assert summary['longest_streak'] == 9
+        assert [week['week_start'] for week in summary['weeks']] == ['2025-03-24', '2025-03-31', '2025-04-07']
+        assert [week['adherence'] for week in summary['weeks']] == [None, 0.75, 1.0]
+        assert summary['this_week']['completed'] == 3
+
+    def test_summary_without_rows(self):
+        summary = summarize_adherence(None, [], weeks=2, today=date(2025, 4, 10))
+
+        assert summary['current_streak'] == 0
+        assert summary['last_active_date'] is None
+        assert len(summary['weeks']) == 2
@@ -0,0 +1,52 @@
+import os
+import sys
+
+# Add parent directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.athlete_analytics import AnalyticsCache, summarize_analytics
+
+
+class TestAthleteAnalytics:
+    def test_summarize_grouped_rows(self):
+        performance_rows = [
+            {'day': 'Monday', 'total': 10, 'recent': 2},
+            {'day': 'Tuesday', 'total': 5, 'recent': 0},
+            {'day': 'Friday', 'total': 3, 'recent': 1},
+        ]
+        goal_rows = [
+            {'status': 'active', 'count': 2},
+            {'status': 'completed', 'count': 4},
+            {'status': 'abandoned', 'count': 1},
+        ]
+
+        analytics = summarize_analytics(performance_rows, goal_rows)
+
+        assert analytics == {
+            'total_workouts': 18,
+            'week_workouts': 3,
+            'weekly_data': {'Monday': 2, 'Friday': 1},
+            'active_goals': 2,
+            'completed_goals': 4,
+        }
+
+    def test_summarize_without_rows_returns_zeros(self):
+        analytics = summarize_analytics([], [])
+
+        assert analytics['total_workouts'] == 0
+        assert analytics['weekly_data'] == {}
+        assert analytics['completed_goals'] == 0
+
+    def test_cache_invalidation_and_eviction(self):
+        cache = AnalyticsCache(max_size=2)
+        cache.put(1, {'total_workouts': 1})
+        cache.put(2, {'total_workouts': 2})
+        cache.get(1)
+        cache.put(3, {'total_workouts': 3})
+
+        assert cache.get(2) is None
+        assert cache.get(1) == {'total_workouts': 1}
+
+        cache.invalidate(1)
+        assert cache.get(1) is None
+        assert cache.get(3) == {'total_workouts': 3}
@@ -0,0 +1,56 @@
+import os
+import sys
+
+# Add parent directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import coach_matching
+from utils.coach_matching import CoachFeatureMatrix, refresh_coach_features
+
+
+def coach(coach_id, specialization, rate, rating=4.5, reviews=20, experience=5, roster=0):
+    return {'coach_id': coach_id, 'full_name': f'Coach {coach_id}', 'profile_picture': None,
+            'specialization': specialization, 'experience_years': experience, 'hourly_rate': rate,
+            'rating': rating, 'total_reviews': reviews, 'roster_size': roster}
+
+
+class TestCoachMatching:
+    def make_matrix(self):
+        matrix = CoachFeatureMatrix()
+        matrix.load([
+            coach(1, 'Running, Sprinting', 40),
+            coach(2, 'Swimming', 40),
+            coach(3, 'Running', 150),
+            coach(4, 'Running', 40, roster=60),
+        ])
+        return matrix
+
+    def test_sport_match_and_budget_rank_first(self):
+        results = self.make_matrix().recommend('running', 'advanced', budget=50, limit=4)
+
+        ranked = [row['coach_id'] for row, _, _ in results]
+        assert ranked[0] == 1
+        assert ranked.index(4) < ranked.index(2)
+        assert results[0][2]['sport'] == 1.0
+
+    def test_roster_load_breaks_ties(self):
+        ranked = [row['coach_id'] for row, _, _ in self.make_matrix().recommend('running', limit=4)]
+
+        assert ranked.index(1) < ranked.index(4)
+
+    def test_upsert_updates_features_in_place(self):
+        matrix = self.make_matrix()
+        matrix.upsert(coach(2, 'Running', 30))
+
+        results = matrix.recommend('running', budget=35, limit=1)
+
+        assert results[0][0]['coach_id'] == 2
+        assert results[0][2]['budget'] == 1.0
+
+    def test_failed_refresh_invalidates_instead_of_raising(self, monkeypatch, failing_mysql):
+        matrix = self.make_matrix()
+        monkeypatch.setattr(coach_matching, 'coach_feature_matrix', matrix)
+
+        refresh_coach_features(failing_mysql(), coach_ids=[1, 4])
+
+        assert matrix.is_stale()
@@ -0,0 +1,63 @@
+import os
+import sys
+from datetime import datetime
+from decimal import Decimal
+
+# Add parent directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.coach_profiles import build_coach_document, rebuild_coach_documents, serialize_document
+
+
+class ScriptedCursor:
+    def __init__(self, *results):
+        self.results = list(results)
+        self.params = []
+
+    def execute(self, sql, params=None):
+        self.params.append(params)
+
+    def fetchone(self):
+        return self.results.pop(0)
+
+    def fetchall(self):
+        return self.results.pop(0)
+
+
+class TestCoachProfiles:
+    def test_document_bundles_profile_ratings_and_roster(self):
+        cursor = ScriptedCursor(
+            {'coach_id': 2, 'user_id': 18, 'full_name': 'Asha Rao', 'rating': Decimal('4.50'),
+             'total_reviews': 2, 'roster_size': 7, 'rating_count': 2, 'rating_sum': 9, 'rating_4': 1, 'rating_5': 1},
+        )
+
+        document = build_coach_document(cursor, coach_id=2)
+
+        assert cursor.params == [(2,)]
+        assert document['roster_size'] == 7
+        assert document['ratings']['average'] == 4.5
+        assert document['ratings']['histogram']['5'] == 1
+        assert 'rating_count' not in document['profile']
+        assert 'roster_size' not in document['profile']
+        assert document['profile']['rating'] == Decimal('4.50')
+        assert set(document) == {'profile', 'ratings', 'roster_size'}
+
+    def test_missing_coach(self):
+        assert build_coach_document(ScriptedCursor(None), user_id=99) is None
+
+    def test_serialization_is_stable(self):
+        first = serialize_document({'b': Decimal('1.5'), 'a': datetime(2026, 3, 1)})
+        second = serialize_document({'a': datetime(2026, 3, 1), 'b': Decimal('1.5')})
+
+        assert first == second
+        assert len(first[1]) == 32
+
+    def test_failed_rebuild_drops_stored_documents_instead_of_raising(self, failing_mysql):
+        mysql = failing_mysql(fail_on='SELECT')
+        connection = mysql.connection
+
+        rebuild_coach_documents(mysql, coach_ids=[2], user_id=18)
+
+        assert connection.statements[0] == ('DELETE FROM coach_profile_documents WHERE coach_id = %s', (2,))
+        assert connection.statements[1][1] == (18,)
+        assert connection.commits == 1
@@ -0,0 +1,64 @@
+import os
+import sys
+
+# Add parent directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import coach_search
+from utils.coach_search import CoachSearchIndex, refresh_coach_in_index
+
+
+class TestCoachSearch:
+    def make_index(self):
+        index = CoachSearchIndex()
+        index.load([
+            {'coach_id': 1, 'full_name': 'Asha Rao', 'specialization': 'Sprinting, Strength',
+             'bio': 'Former national sprinter', 'certifications': 'NSCA CSCS',
+             'hourly_rate': 40, 'experience_years': 8, 'rating': 4.8, 'total_reviews': 20},
+            {'coach_id': 2, 'full_name': 'Ben Ortiz', 'specialization': 'Swimming',
+             'bio': 'Open water and sprint freestyle', 'certifications': 'ASCA Level 3',
+             'hourly_rate': 70, 'experience_years': 12, 'rating': 4.2, 'total_reviews': 5},
+            {'coach_id': 3, 'full_name': 'Chloe Park', 'specialization': 'Strength',
+             'bio': 'Powerlifting coach', 'certifications': None,
+             'hourly_rate': 25, 'experience_years': 2, 'rating': 3.5, 'total_reviews': 2},
+        ])
+        return index
+
+    def test_prefix_text_search_ranks_field_matches(self):
+        results, total, _ = self.make_index().search('sprint')
+
+        assert total == 2
+        assert results[0]['coach_id'] == 1
+
+    def test_filters_and_disjunctive_specialization_facet(self):
+        results, total, facets = self.make_index().search(
+            None, {'specialization': 'strength', 'max_rate': 50}
+        )
+
+        assert {r['coach_id'] for r in results} == {1, 3}
+        assert total == 2
+        assert facets['specialization'] == {'Strength': 2, 'Sprinting': 1}
+        assert facets['hourly_rate']['25_50'] == 2
+
+    def test_upsert_replaces_old_terms(self):
+        index = self.make_index()
+        index.upsert({'coach_id': 3, 'full_name': 'Chloe Park', 'specialization': 'Yoga',
+                      'bio': 'Mobility', 'certifications': None, 'hourly_rate': 25,
+                      'experience_years': 2, 'rating': 3.5, 'total_reviews': 2})
+
+        assert index.search('powerlifting')[1] == 0
+        assert index.search('yoga')[0][0]['coach_id'] == 3
+
+    def test_pagination(self):
+        results, total, _ = self.make_index().search(None, {}, page=2, per_page=2)
+
+        assert total == 3
+        assert len(results) == 1
+
+    def test_failed_refresh_invalidates_instead_of_raising(self, monkeypatch, failing_mysql):
+        index = self.make_index()
+        monkeypatch.setattr(coach_search, 'coach_search_index', index)
+
+        refresh_coach_in_index(failing_mysql(), coach_id=2)
+
+        assert index.is_stale()
@@ -0,0 +1,63 @@
+import os
+import sys
+
+# Add parent directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import exercise_catalog
+from utils.exercise_catalog import ExerciseCatalog, add_to_catalog, normalize_exercise_name
+
+
+def exercise(exercise_id, name):
+    return {'exercise_id': exercise_id, 'name': name,
+            'normalized_name': normalize_exercise_name(name), 'category': None}
+
+
+class TestExerciseCatalog:
+    def make_catalog(self):
+        catalog = ExerciseCatalog()
+        catalog.load([
+            exercise(1, 'Bench Press'),
+            exercise(2, 'Overhead Press'),
+            exercise(3, 'Back Squat'),
+            exercise(4, 'Pressure Breathing'),
+        ])
+        return catalog
+
+    def test_normalize_collapses_spelling_variants(self):
+        assert normalize_exercise_name('  Bench-Press ') == 'bench press'
+        assert normalize_exercise_name('BENCH   press!') == 'bench press'
+
+    def test_whole_name_matches_rank_before_word_matches(self):
+        names = [e['name'] for e in self.make_catalog().complete('pres')]
+
+        assert names == ['Pressure Breathing', 'Bench Press', 'Overhead Press']
+
+    def test_multi_word_prefix(self):
+        assert [e['exercise_id'] for e in self.make_catalog().complete('bench p')] == [1]
+        assert self.make_catalog().complete('   ') == []
+
+    def test_add_is_visible_immediately_and_idempotent(self):
+        catalog = self.make_catalog()
+        catalog.add(exercise(5, 'Box Jump'))
+        catalog.add(exercise(6, 'box jump'))
+
+        assert [e['exercise_id'] for e in catalog.complete('box')] == [5]
+        assert catalog.lookup('box jump') == 5
+
+    def test_add_to_catalog_uses_the_loaded_catalog(self, monkeypatch, failing_mysql):
+        catalog = self.make_catalog()
+        monkeypatch.setattr(exercise_catalog, 'exercise_catalog', catalog)
+
+        add_to_catalog(failing_mysql(), [exercise(5, 'Box Jump')])
+
+        assert catalog.lookup('box jump') == 5
+
+    def test_failed_catalog_reload_is_left_for_the_next_lookup(self, monkeypatch, failing_mysql):
+        catalog = ExerciseCatalog()
+        monkeypatch.setattr(exercise_catalog, 'exercise_catalog', catalog)
+
+        add_to_catalog(failing_mysql(), [exercise(5, 'Box Jump')])
+
+        assert catalog.is_stale()
+        assert catalog.lookup('box jump') is None
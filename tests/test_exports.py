@@ -0,0 +1,47 @@
+import csv
+import io
+import json
+import os
+import sys
+from datetime import date
+from decimal import Decimal
+
+# Add parent directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.exports import EXPORT_DATASETS, build_export_query, encode_csv, encode_jsonl
+
+
+class TestExports:
+    def test_queries_filter_by_athlete_or_roster(self):
+        for dataset in EXPORT_DATASETS:
+            assert 'WHERE a.athlete_id = %s ORDER BY' in build_export_query(dataset, 'athlete')
+            assert 'a.coach_id = %s' in build_export_query(dataset, 'roster')
+
+    def test_roster_feedback_is_limited_to_the_coach(self):
+        assert 'f.coach_id = c.user_id' in build_export_query('feedback', 'roster')
+        assert 'f.coach_id = c.user_id' not in build_export_query('feedback', 'athlete')
+
+    def test_csv_chunks_concatenate_into_one_document(self):
+        columns = ['performance_id', 'date', 'metric_value', 'notes']
+        rows = [
+            {'performance_id': 1, 'date': date(2025, 1, 2), 'metric_value': Decimal('5.50'), 'notes': None},
+            {'performance_id': 2, 'date': date(2025, 1, 3), 'metric_value': Decimal('6.00'), 'notes': 'windy, hilly'},
+        ]
+
+        body = encode_csv(columns, (), include_header=True) + encode_csv(columns, rows[:1]) + encode_csv(columns, rows[1:])
+        parsed = list(csv.reader(io.StringIO(body)))
+
+        assert parsed == [
+            columns,
+            ['1', '2025-01-02', '5.50', ''],
+            ['2', '2025-01-03', '6.00', 'windy, hilly'],
+        ]
+
+    def test_jsonl_encodes_one_object_per_line(self):
+        body = encode_jsonl([{'goal_id': 1, 'target_date': date(2025, 6, 1)}, {'goal_id': 2, 'target_date': None}])
+
+        lines = body.splitlines()
+        assert len(lines) == 2
+        assert json.loads(lines[0]) == {'goal_id': 1, 'target_date': '2025-06-01'}
+        assert json.loads(lines[1])['target_date'] is None
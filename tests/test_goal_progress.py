@@ -0,0 +1,75 @@
+import os
+import sys
+from datetime import date, datetime
+from decimal import Decimal
+
+# Add parent directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.goal_progress import advance_goal, goal_reached
+
+DIRECTIONS = {'Distance': 'higher', 'Time': 'lower', 'Pace': 'lower'}
+
+
+def make_goal(metric_type='Distance', aggregation='best', target='10', current='4', last_metric_date=None):
+    return {
+        'goal_id': 1,
+        'goal_type': 'Test goal',
+        'metric_type': metric_type,
+        'metric_aggregation': aggregation,
+        'target_value': Decimal(target),
+        'current_value': Decimal(current),
+        'last_metric_date': last_metric_date,
+        'created_date': datetime(2025, 3, 1, 9, 30),
+    }
+
+
+class TestGoalProgress:
+    def test_best_ignores_records_before_goal_was_set(self):
+        goal = make_goal()
+        records = [
+            (date(2025, 2, 20), Decimal('12')),
+            (date(2025, 3, 1), Decimal('6')),
+            (date(2025, 3, 4), Decimal('5')),
+        ]
+
+        assert advance_goal(goal, records, DIRECTIONS) == (Decimal('6'), date(2025, 3, 4))
+
+    def test_first_counted_record_replaces_typed_in_value(self):
+        goal = make_goal(metric_type='Time', target='25', current='28')
+
+        current, _ = advance_goal(goal, [(date(2025, 3, 2), Decimal('29'))], DIRECTIONS)
+        assert current == Decimal('29')
+
+        goal.update(current_value=current, last_metric_date=date(2025, 3, 2))
+        current, _ = advance_goal(goal, [(date(2025, 3, 3), Decimal('30'))], DIRECTIONS)
+        assert current == Decimal('29')
+
+    def test_total_accumulates_across_calls(self):
+        goal = make_goal(aggregation='total', target='50', current='0')
+
+        current, last_date = advance_goal(goal, [(date(2025, 3, 2), Decimal('10')), (date(2025, 3, 3), Decimal('5'))], DIRECTIONS)
+        goal.update(current_value=current, last_metric_date=last_date)
+        current, last_date = advance_goal(goal, [(date(2025, 3, 2), Decimal('7'))], DIRECTIONS)
+
+        assert current == Decimal('22')
+        assert last_date == date(2025, 3, 3)
+
+    def test_latest_skips_backfilled_older_records(self):
+        goal = make_goal(aggregation='latest', last_metric_date=date(2025, 3, 10), current='8')
+
+        assert advance_goal(goal, [(date(2025, 3, 5), Decimal('9'))], DIRECTIONS) == (Decimal('8'), date(2025, 3, 10))
+        assert advance_goal(goal, [(date(2025, 3, 11), Decimal('7'))], DIRECTIONS) == (Decimal('7'), date(2025, 3, 11))
+
+    def test_no_matching_record_leaves_goal_unchanged(self):
+        goal = make_goal()
+
+        assert advance_goal(goal, [(date(2025, 1, 1), Decimal('20'))], DIRECTIONS) == (Decimal('4'), None)
+
+    def test_reached_follows_metric_direction(self):
+        assert goal_reached(make_goal(), Decimal('10'), DIRECTIONS)
+        assert not goal_reached(make_goal(), Decimal('9.99'), DIRECTIONS)
+        assert goal_reached(make_goal(metric_type='Time', target='25'), Decimal('24.5'), DIRECTIONS)
+        assert not goal_reached(make_goal(metric_type='Time', target='25'), Decimal('26'), DIRECTIONS)
+        # A total of time spent is still a grow-to-target goal
+        assert goal_reached(make_goal(metric_type='Time', aggregation='total', target='600'), Decimal('610'), DIRECTIONS)
@@ -0,0 +1,51 @@
+import os
+import sys
+
+# Add parent directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.identity import Identities, IdentityCache
+
+
+def athlete(user_id, athlete_id, name='Athlete'):
+    return {'user_id': user_id, 'full_name': name, 'user_type': 'athlete', 'athlete_id': athlete_id,
+            'athlete_coach_id': None, 'coach_user_id': None, 'coach_id': None}
+
+
+def coach(user_id, coach_id, name='Coach'):
+    return {'user_id': user_id, 'full_name': name, 'user_type': 'coach', 'athlete_id': None,
+            'athlete_coach_id': None, 'coach_user_id': None, 'coach_id': coach_id}
+
+
+class TestIdentityCache:
+    def test_hits_by_any_id_and_reports_misses(self):
+        cache = IdentityCache()
+        cache.put_many([athlete(10, 1), coach(20, 2)])
+
+        hits, users, athletes, coaches = cache.get_many({10, 99}, {1, 5}, {2})
+
+        assert len(hits) == 3
+        assert (users, athletes, coaches) == ([99], [5], [])
+
+    def test_lru_evicts_least_recently_used(self):
+        cache = IdentityCache(max_size=2)
+        cache.put_many([athlete(10, 1), athlete(11, 2)])
+        cache.get_many(athlete_ids={1})
+        cache.put_many([athlete(12, 3)])
+
+        assert cache.get_many(athlete_ids={2})[2] == [2]
+        assert cache.get_many(athlete_ids={1})[2] == []
+
+    def test_invalidate_by_role_id(self):
+        cache = IdentityCache()
+        cache.put_many([athlete(10, 1), coach(20, 2)])
+        cache.invalidate(athlete_ids={1}, coach_ids={2})
+
+        assert cache.get_many({10, 20})[1] == [10, 20]
+
+    def test_identities_lookup_and_name_default(self):
+        identities = Identities([athlete(10, 1, 'Asha'), coach(20, 2, None)])
+
+        assert identities.athlete('1')['user_id'] == 10
+        assert identities.name(identities.coach(2), 'Your coach') == 'Your coach'
+        assert identities.user(30) is None
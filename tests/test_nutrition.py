@@ -0,0 +1,55 @@
+import os
+import sys
+
+# Add parent directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.nutrition import calculate_nutrition, calculate_roster_nutrition, meal_item_macros, sum_macros
+
+
+class TestNutrition:
+    def test_single_athlete_matches_profile_formula(self):
+        result = calculate_nutrition(180, 75, 25)
+
+        assert result['bmi'] == 23.15
+        assert result['bmi_category'] == 'Normal'
+        assert result['bmr'] == 1755
+        assert result['daily_calories'] == 2720
+        assert result['protein_grams'] == 120
+        assert result['fats_grams'] == 76
+
+    def test_missing_inputs_propagate_as_none(self):
+        result = calculate_nutrition(180, None, 25)
+
+        assert result['bmi'] is None
+        assert result['daily_calories'] is None
+        assert result['carbs_grams'] is None
+
+        no_age = calculate_nutrition('170', '90')
+        assert no_age['bmi_category'] == 'Obese'
+        assert no_age['daily_calories'] is None
+
+    def test_roster_pass_keeps_input_order(self):
+        athletes = [
+            {'height': 160, 'weight': 45, 'age': 18},
+            {'height': None, 'weight': None, 'age': None},
+            {'height': 190, 'weight': 100, 'age': 30},
+        ]
+
+        results = calculate_roster_nutrition(athletes, 'active')
+
+        assert len(results) == 3
+        assert results[0]['bmi_category'] == 'Underweight'
+        assert results[1]['bmi'] is None
+        assert results[2]['daily_calories'] > results[0]['daily_calories']
+        assert all(r['activity_level'] == 'active' for r in results)
+
+    def test_meal_item_macros_prefer_recipe_scaled_by_servings(self):
+        recipe = {'calories': 400, 'protein': 30, 'carbs': 45, 'fats': 10}
+
+        from_recipe = meal_item_macros({'servings': '1.5', 'calories': '999'}, recipe)
+        custom = meal_item_macros({'calories': '250', 'protein': '', 'carbs': '30', 'fats': None})
+
+        assert from_recipe == {'calories': 600.0, 'protein': 45.0, 'carbs': 67.5, 'fats': 15.0}
+        assert custom == {'calories': 250.0, 'protein': 0.0, 'carbs': 30.0, 'fats': 0.0}
+        assert sum_macros([from_recipe, custom])['calories'] == 850.0
@@ -0,0 +1,138 @@
+import csv
+import io
+import os
+import sys
+from datetime import date
+from decimal import Decimal
+
+# Add parent directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.performance_ingest import (
+    IngestReport, MAX_REPORTED_ERRORS, MalformedUploadError, detect_format, ingest_performance,
+    iter_records, iter_text_lines, validate_record
+)
+
+
+def records(body, fmt):
+    return list(iter_records(iter_text_lines(io.BytesIO(body.encode('utf-8'))), fmt))
+
+
+class RecordingConnection:
+    def __init__(self):
+        self.inserted = []
+        self.rowcount = 0
+        self.commits = 0
+
+    def cursor(self):
+        return self
+
+    def executemany(self, sql, rows):
+        self.inserted.extend(rows)
+        self.rowcount = len(rows)
+
+    def commit(self):
+        self.commits += 1
+
+    def close(self):
+        pass
+
+
+class FakeMySQL:
+    def __init__(self):
+        self.connection = RecordingConnection()
+
+
+class TestPerformanceIngest:
+    def test_detect_format_from_content_type(self):
+        assert detect_format('text/csv; charset=utf-8') == 'csv'
+        assert detect_format('application/x-ndjson') == 'jsonl'
+        assert detect_format('application/json', 'jsonl') == 'jsonl'
+
+    def test_detect_format_rejects_unknown_type(self):
+        try:
+            detect_format('application/json')
+            assert False, 'Expected ValueError'
+        except ValueError:
+            pass
+
+    def test_csv_rows_carry_line_numbers(self):
+        body = '\ufeffdate,metric_type,metric_value,unit\n2025-01-01,Distance,5,km\n2025-01-02,Distance,6,km,extra\n'
+
+        rows = records(body, 'csv')
+
+        assert rows[0] == (2, {'date': '2025-01-01', 'metric_type': 'Distance', 'metric_value': '5', 'unit': 'km'}, None)
+        assert rows[1][0] == 3
+        assert rows[1][2] == 'Too many columns'
+
+    def test_jsonl_skips_blank_lines_and_reports_bad_json(self):
+        body = '{"date": "2025-01-01"}\n\n{not json\n[1, 2]\n'
+
+        rows = records(body, 'jsonl')
+
+        assert [(line, error) for line, _, error in rows] == [
+            (1, None), (3, 'Invalid JSON'), (4, 'Each line must be a JSON object')
+        ]
+
+    def test_validate_record_builds_insert_params(self):
+        params = validate_record({
+            'date': '2025-03-04', 'metric_type': ' Distance ', 'metric_value': 5.456,
+            'unit': 'km', 'dedupe_key': 'watch-123'
+        }, 7, recorded_by=3)
+
+        assert params == (7, date(2025, 3, 4), 'Distance', Decimal('5.46'), 'km', '', 3, 'watch-123')
+
+    def test_validate_record_rejects_bad_rows(self):
+        base = {'date': '2025-03-04', 'metric_type': 'Distance', 'metric_value': '5', 'unit': 'km'}
+        bad_rows = [
+            dict(base, date='04/03/2025'),
+            dict(base, metric_value='fast'),
+            dict(base, metric_value='1e12'),
+            dict(base, metric_type=''),
+            dict(base, athlete_id=8),
+        ]
+
+        for row in bad_rows:
+            try:
+                validate_record(row, 7)
+                assert False, f'Expected ValueError for {row}'
+            except ValueError:
+                pass
+
+    def test_report_caps_listed_errors(self):
+        report = IngestReport()
+        for line in range(MAX_REPORTED_ERRORS + 5):
+            report.reject(line, 'bad row')
+
+        result = report.to_dict()
+
+        assert result['rejected'] == MAX_REPORTED_ERRORS + 5
+        assert len(result['errors']) == MAX_REPORTED_ERRORS
+        assert result['errors_truncated'] is True
+
+    def test_malformed_csv_stops_with_line_number(self):
+        body = 'date,metric_type,metric_value\n2025-01-01,Distance,5\n2025-01-02,"' + 'x' * (csv.field_size_limit() + 1) + '",6\n'
+
+        try:
+            records(body, 'csv')
+            assert False, 'Expected MalformedUploadError'
+        except MalformedUploadError as e:
+            assert e.line_number == 3
+            assert str(e).startswith('Malformed CSV:')
+
+    def test_malformed_line_keeps_earlier_rows_and_reports_abort(self, monkeypatch):
+        monkeypatch.setattr('utils.performance_ingest.apply_new_records', lambda cursor, athlete_id, rows: ([], []))
+
+        def stream():
+            yield 2, {'date': '2025-01-01', 'metric_type': 'Distance', 'metric_value': '5', 'unit': 'km'}, None
+            yield 3, None, 'Too many columns'
+            raise MalformedUploadError(4, 'Malformed CSV: line contains NUL')
+
+        mysql = FakeMySQL()
+        report = ingest_performance(mysql, stream(), athlete_id=7).to_dict()
+
+        assert report['inserted'] == 1
+        assert report['rejected'] == 1
+        assert report['aborted'] == {'line': 4, 'error': 'Malformed CSV: line contains NUL'}
+        assert mysql.connection.commits == 1
+        assert [row[2] for row in mysql.connection.inserted] == ['Distance']
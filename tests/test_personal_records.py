@@ -0,0 +1,64 @@
+import os
+import sys
+from datetime import date
+from decimal import Decimal
+
+# Add parent directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.personal_records import fold_record, is_better, records_by_metric, replay_records
+
+DIRECTIONS = {'Distance': 'higher', 'Time': 'lower', 'Pace': 'lower'}
+
+
+class TestPersonalRecords:
+    def test_direction_follows_metric(self):
+        assert is_better('Distance', Decimal('10.5'), Decimal('10'), DIRECTIONS)
+        assert not is_better('Distance', Decimal('9'), Decimal('10'), DIRECTIONS)
+        assert is_better('Time', Decimal('19.5'), Decimal('20'), DIRECTIONS)
+        assert not is_better('Time', Decimal('20'), Decimal('20'), DIRECTIONS)
+        assert is_better('Time', Decimal('25'), None, DIRECTIONS)
+
+    def test_replay_tracks_best_and_the_best_before_it(self):
+        records = [
+            (date(2025, 1, 1), Decimal('5')),
+            (date(2025, 1, 4), Decimal('8')),
+            (date(2025, 1, 2), Decimal('6')),
+            (date(2025, 1, 5), Decimal('7')),
+        ]
+
+        assert replay_records('Distance', records, DIRECTIONS) == (
+            Decimal('8'), date(2025, 1, 4), Decimal('6'), date(2025, 1, 2)
+        )
+
+    def test_same_day_improvement_keeps_the_earlier_days_previous(self):
+        state = (Decimal('10'), date(2025, 2, 1), None, None)
+        state = fold_record('Distance', state, date(2025, 2, 3), Decimal('11'), DIRECTIONS)
+        state = fold_record('Distance', state, date(2025, 2, 3), Decimal('12'), DIRECTIONS)
+
+        assert state == (Decimal('12'), date(2025, 2, 3), Decimal('10'), date(2025, 2, 1))
+
+    def test_ties_keep_the_earliest_record(self):
+        records = [
+            (date(2025, 3, 1), Decimal('28')),
+            (date(2025, 2, 1), Decimal('28')),
+        ]
+
+        assert replay_records('Time', records, DIRECTIONS)[:2] == (Decimal('28'), date(2025, 2, 1))
+
+    def test_incremental_folding_matches_a_full_replay(self):
+        history = [(date(2025, 4, day), Decimal(value)) for day, value in ((1, '30'), (3, '29'), (6, '31'))]
+        new = [(date(2025, 4, 8), Decimal('28')), (date(2025, 4, 8), Decimal('27.5'))]
+
+        stored = replay_records('Time', history, DIRECTIONS)
+
+        assert replay_records('Time', new, DIRECTIONS, stored) == replay_records('Time', history + new, DIRECTIONS)
+
+    def test_metrics_outside_the_allow_list_have_no_records(self):
+        records = [
+            (date(2025, 1, 1), 'Heart Rate', Decimal('171')),
+            (date(2025, 1, 1), 'Activity Duration', Decimal('42')),
+            (date(2025, 1, 1), 'Pace', Decimal('5.2')),
+        ]
+
+        assert records_by_metric(records, DIRECTIONS) == {'Pace': [(date(2025, 1, 1), Decimal('5.2'))]}
@@ -0,0 +1,57 @@
+import os
+import sys
+import pytest
+
+# Add parent directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.ratings import apply_rating, format_aggregate, parse_rating, sync_coach_rating
+
+
+class RecordingCursor:
+    def __init__(self):
+        self.calls = []
+
+    def execute(self, sql, params=None):
+        self.calls.append((' '.join(sql.split()), params))
+
+
+class TestRatings:
+    def test_parse_rating(self):
+        assert parse_rating('4') == 4
+        assert parse_rating(None) is None
+        assert parse_rating('') is None
+        with pytest.raises(ValueError):
+            parse_rating(6)
+
+    def test_apply_rating_updates_only_the_rated_user(self):
+        cursor = RecordingCursor()
+
+        apply_rating(cursor, 19, 3, delta=-1)
+
+        assert len(cursor.calls) == 1
+        assert 'rating_3 = rating_3 + VALUES(rating_3)' in cursor.calls[0][0]
+        assert cursor.calls[0][1] == (19, -1, -3, -1)
+        assert 'coaches' not in cursor.calls[0][0]
+
+    def test_sync_coach_rating_copies_the_aggregate(self):
+        cursor = RecordingCursor()
+
+        sync_coach_rating(cursor, 18)
+
+        assert cursor.calls[0][0].startswith('UPDATE coaches c LEFT JOIN rating_aggregates ra')
+        assert cursor.calls[0][1] == (18,)
+
+    def test_apply_rating_skips_unrated_feedback(self):
+        cursor = RecordingCursor()
+
+        apply_rating(cursor, 19, None)
+
+        assert cursor.calls == []
+
+    def test_format_aggregate(self):
+        summary = format_aggregate({'rating_count': 3, 'rating_sum': 13, 'rating_4': 1, 'rating_5': 2})
+
+        assert summary['average'] == 4.33
+        assert summary['histogram'] == {'1': 0, '2': 0, '3': 0, '4': 1, '5': 2}
+        assert format_aggregate(None)['average'] == 0.0
@@ -0,0 +1,57 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+# Add parent directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.sample_streams import SampleRecorder, decode_stream, encode_stream, stream_window
+
+
+def point(second, hr=None, ele=None):
+    return {'time': datetime(2025, 5, 1, 6, 0) + timedelta(seconds=second), 'hr': hr, 'ele': ele,
+            'lat': None, 'lon': None, 'distance': None}
+
+
+class TestSampleStreams:
+    def test_round_trip_keeps_quantized_values(self):
+        offsets = [0, 1, 2, 5, 6]
+        values = [3.25, 3.1, 2.87, -1.5, 0.0]
+
+        decoded_offsets, decoded_values = decode_stream(encode_stream(offsets, values, 100), 100)
+
+        assert list(decoded_offsets) == offsets
+        assert list(decoded_values) == values
+
+    def test_steady_stream_compresses_far_below_raw_size(self):
+        offsets = list(range(3600))
+        values = [140 + (i // 30) % 5 for i in range(3600)]
+
+        blob = encode_stream(offsets, values, 1)
+
+        assert len(blob) < 3600 // 4
+
+    def test_decode_rejects_unknown_encoding(self):
+        try:
+            decode_stream(b'\x09abc', 1)
+            assert False, 'Expected ValueError'
+        except ValueError:
+            pass
+
+    def test_window_selects_range_and_downsamples(self):
+        offsets = list(range(1000))
+        values = [float(i % 10) for i in range(1000)]
+
+        assert stream_window(offsets, values, 100, 104) == [[100, 0.0], [101, 1.0], [102, 2.0], [103, 3.0], [104, 4.0]]
+        assert len(stream_window(offsets, values, max_points=50)) == 50
+
+    def test_recorder_derives_speed_from_cumulative_distance(self):
+        recorder = SampleRecorder()
+        recorder.add(point(0, hr=120, ele=10.0), 0.0)
+        recorder.add(point(2, hr=125), 6.0)
+        recorder.add(point(3), 10.0)
+
+        offsets, values = recorder.channels['speed']
+        assert list(offsets) == [2, 3]
+        assert list(values) == [3.0, 4.0]
+        assert {channel for channel, _, _ in recorder.encoded()} == {'heart_rate', 'elevation', 'distance', 'speed'}
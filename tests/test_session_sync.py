@@ -0,0 +1,100 @@
+import os
+import sys
+from datetime import date, datetime
+from decimal import Decimal
+
+# Add parent directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.session_sync import MAX_SYNC_SESSIONS, parse_sync_payload
+
+TODAY = date(2025, 6, 10)
+
+
+def make_session(client_id='log-1', **overrides):
+    session = {
+        'client_id': client_id,
+        'session_id': 12,
+        'completion_status': 'partial',
+        'completed_date': '2025-06-09',
+        'notes': 'Felt heavy',
+        'sets': [
+            {'client_id': f'{client_id}-a', 'exercise_id': 3, 'exercise_name': 'Squat', 'order_number': 1,
+             'set_number': 2, 'status': 'completed', 'reps': '8', 'weight': 82.5,
+             'recorded_at': '2025-06-09T18:02:11.000Z'},
+            {'client_id': f'{client_id}-b', 'exercise_name': 'Plank', 'status': 'skipped'},
+        ],
+    }
+    session.update(overrides)
+    return session
+
+
+def parse(sessions):
+    return parse_sync_payload({'sessions': sessions}, today=TODAY)
+
+
+class TestSessionSync:
+    def test_parse_normalizes_sessions_and_sets(self):
+        [session] = parse([make_session()]).sessions
+
+        assert session['client_id'] == 'log-1'
+        assert session['completed_date'] == date(2025, 6, 9)
+        assert session['instance_id'] is None
+
+        squat, plank = session['sets']
+        assert squat['reps'] == 8
+        assert squat['weight'] == Decimal('82.50')
+        assert squat['recorded_at'] == datetime(2025, 6, 9, 18, 2, 11)
+        assert plank['set_number'] == 1
+        assert plank['exercise_id'] is None
+
+    def test_completed_date_defaults_to_today(self):
+        [session] = parse([make_session(completed_date=None)]).sessions
+
+        assert session['completed_date'] == TODAY
+
+    def test_bad_entries_are_rejected_without_blocking_the_queue(self):
+        bad_set = make_session('log-2')
+        bad_set['sets'][1]['status'] = 'done'
+
+        batch = parse([
+            make_session('log-1'),
+            bad_set,
+            make_session('log-3', completed_date='2025-06-11'),
+            make_session('log-4', completed_date='2025-04-01'),
+            make_session(client_id=''),
+            make_session('log-6', session_id=None),
+            make_session('log-7'),
+        ])
+
+        assert [session['client_id'] for session in batch.sessions] == ['log-1', 'log-7']
+        assert [(entry['index'], entry['client_id']) for entry in batch.rejected] == [
+            (1, 'log-2'), (2, 'log-3'), (3, 'log-4'), (4, None), (5, 'log-6')
+        ]
+        assert batch.rejected[0]['error'].startswith('sets[1]:')
+        assert 'completed_date' in batch.rejected[2]['error']
+
+    def test_entries_past_the_limit_are_deferred(self):
+        batch = parse([make_session(f'log-{i}') for i in range(MAX_SYNC_SESSIONS + 2)])
+
+        assert len(batch.sessions) == MAX_SYNC_SESSIONS
+        assert batch.deferred == [f'log-{MAX_SYNC_SESSIONS}', f'log-{MAX_SYNC_SESSIONS + 1}']
+        assert batch.rejected == []
+
+    def test_repeated_ids_are_collapsed_or_rejected(self):
+        reused_set = make_session('log-2')
+        reused_set['sets'][0]['client_id'] = 'log-1-a'
+
+        batch = parse([make_session('log-1'), make_session('log-1'), reused_set])
+
+        assert [session['client_id'] for session in batch.sessions] == ['log-1']
+        assert [entry['client_id'] for entry in batch.rejected] == ['log-2']
+
+    def test_payload_that_is_not_a_queue_is_an_error(self):
+        for payload in ({}, None, {'sessions': []}, {'sessions': 'log-1'}):
+            try:
+                parse_sync_payload(payload, today=TODAY)
+            except ValueError as e:
+                assert str(e) == 'sessions must be a non-empty list'
+            else:
+                raise AssertionError(f'Expected ValueError for {payload}')
@@ -0,0 +1,92 @@
+import os
+import sys
+from datetime import date, timedelta
+from decimal import Decimal
+
+# Add parent directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.timeseries import (
+    cap_series, downsample_records, group_series, largest_triangle_three_buckets, resolve_date_range
+)
+
+
+class TestTimeseries:
+    def make_row(self, athlete_id, metric_type, bucket, value, count=1):
+        return {
+            'athlete_id': athlete_id,
+            'metric_type': metric_type,
+            'bucket': bucket,
+            'min_value': Decimal(value),
+            'max_value': Decimal(value),
+            'avg_value': Decimal(value),
+            'count': count,
+            'last_value': str(value)
+        }
+
+    def test_group_series_by_athlete_and_metric(self):
+        rows = [
+            self.make_row(1, 'sprint', '2025-01-06', 12),
+            self.make_row(1, 'sprint', '2025-01-13', 11),
+            self.make_row(1, 'weight', '2025-01-06', 70),
+            self.make_row(2, 'sprint', '2025-01-06', 13),
+        ]
+
+        series = group_series(rows, 10)
+
+        assert set(series.keys()) == {1, 2}
+        assert [p['last'] for p in series[1]['sprint']] == [12.0, 11.0]
+        assert series[1]['weight'][0]['avg'] == 70.0
+
+    def test_cap_series_merges_adjacent_buckets(self):
+        points = [
+            {'bucket': f'2025-01-{day:02d}', 'min': day, 'max': day, 'avg': day, 'count': 1, 'last': day}
+            for day in range(1, 11)
+        ]
+
+        capped = cap_series(points, 4)
+
+        assert len(capped) <= 4
+        assert capped[0]['bucket'] == '2025-01-01'
+        assert capped[0]['min'] == 1
+        assert capped[-1]['last'] == 10
+        assert sum(p['count'] for p in capped) == 10
+
+    def test_resolve_date_range_rejects_inverted_range(self):
+        try:
+            resolve_date_range('day', '2025-02-01', '2025-01-01')
+            assert False, 'Expected ValueError'
+        except ValueError:
+            pass
+
+    def test_lttb_keeps_endpoints_and_peaks(self):
+        points = [(x, 0.0) for x in range(100)]
+        points[37] = (37, 50.0)
+
+        sampled = largest_triangle_three_buckets(points, 10)
+
+        assert len(sampled) == 10
+        assert sampled[0] == points[0]
+        assert sampled[-1] == points[-1]
+        assert (37, 50.0) in sampled
+
+    def test_lttb_below_three_points_keeps_only_endpoints(self):
+        points = [(x, float(x % 7)) for x in range(10000)]
+
+        assert largest_triangle_three_buckets(points, 2) == [points[0], points[-1]]
+        assert largest_triangle_three_buckets(points, 1) == [points[0]]
+
+    def test_lttb_returns_short_series_unchanged(self):
+        points = [(1, 1.0), (2, 2.0), (3, 3.0)]
+
+        assert largest_triangle_three_buckets(points, 10) == points
+
+    def test_downsample_records_returns_dated_points(self):
+        start = date(2025, 1, 1)
+        rows = [{'date': start + timedelta(days=i), 'metric_value': Decimal(i)} for i in range(400)]
+
+        points = downsample_records(rows, 50)
+
+        assert len(points) == 50
+        assert points[0] == {'date': '2025-01-01', 'value': 0.0}
+        assert points[-1]['date'] == (start + timedelta(days=399)).strftime('%Y-%m-%d')
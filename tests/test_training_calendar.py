@@ -0,0 +1,42 @@
+import os
+import sys
+from datetime import date
+
+import pytest
+
+# Add parent directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.training_calendar import build_schedule, calendar_window
+
+
+class TestTrainingCalendar:
+    def test_weekly_block_repeats_for_plan_duration(self):
+        sessions = [{'session_id': 10, 'day_number': 1}, {'session_id': 11, 'day_number': 3}]
+
+        schedule = build_schedule(sessions, date(2026, 3, 2), duration_weeks=3)
+
+        assert len(schedule) == 6
+        assert schedule[0] == (10, date(2026, 3, 2), date(2026, 3, 3))
+        assert schedule[1][1] == date(2026, 3, 4)
+        assert schedule[-1][1] == date(2026, 3, 18)
+
+    def test_long_block_runs_once_without_duration(self):
+        sessions = [{'session_id': n, 'day_number': n} for n in range(1, 11)]
+
+        schedule = build_schedule(sessions, date(2026, 3, 2))
+
+        assert len(schedule) == 10
+        assert schedule[-1][1] == date(2026, 3, 11)
+        assert build_schedule([], date(2026, 3, 2), 4) == []
+
+    def test_calendar_windows(self):
+        wednesday = date(2026, 3, 4)
+
+        assert calendar_window('today', today=wednesday) == (wednesday, wednesday)
+        assert calendar_window('week', today=wednesday) == (date(2026, 3, 2), date(2026, 3, 8))
+        assert calendar_window('range', '2026-03-01', '2026-03-31')[1] == date(2026, 3, 31)
+        with pytest.raises(ValueError):
+            calendar_window('range', '2026-03-31', '2026-03-01')
+        with pytest.raises(ValueError):
+            calendar_window('month')
@@ -1,4 +1,4 @@
-from .notifications import create_notification
+from .notifications import create_notification, create_notifications
 from .logger import logger, log_exception
 
-__all__ = ['create_notification', 'logger', 'log_exception']
\ No newline at end of file
+__all__ = ['create_notification', 'create_notifications', 'logger', 'log_exception']
\ No newline at end of file
@@ -0,0 +1,326 @@
+import hashlib
+import json
+import math
+import os
+import re
+import traceback
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from decimal import Decimal
+
+from utils.athlete_analytics import invalidate_athlete_analytics
+from utils.logger import logger
+from utils.performance_ingest import INGEST_INSERT, apply_new_records, new_rows
+from utils.sample_streams import SampleRecorder, store_streams
+
+ACTIVITY_FORMATS = ('gpx', 'tcx')
+
+# Element that holds one track point in each format
+POINT_TAGS = {'gpx': 'trkpt', 'tcx': 'Trackpoint'}
+
+# Elevation changes smaller than this are treated as GPS/barometer noise
+ELEVATION_NOISE_METERS = 2.0
+
+EARTH_RADIUS_METERS = 6371008.8
+
+ACTIVITY_IMPORT_WORKERS = 2
+
+FILE_CHUNK_SIZE = 64 * 1024
+
+FRACTION_PATTERN = re.compile(r'\.\d+')
+
+# (summary field, dedupe suffix, performance_tracking metric_type, unit)
+# 'Time' is a result where lower is better (a race time); how long an imported
+# workout lasted is a different quantity and gets its own metric name
+SUMMARY_METRICS = (
+    ('distance_km', 'distance', 'Distance', 'km'),
+    ('duration_minutes', 'time', 'Activity Duration', 'minutes'),
+    ('pace_min_per_km', 'pace', 'Pace', 'min/km'),
+    ('elevation_gain_m', 'elevation', 'Elevation Gain', 'meters'),
+    ('avg_heart_rate', 'hr_avg', 'Heart Rate', 'bpm'),
+    ('max_heart_rate', 'hr_max', 'Max Heart Rate', 'bpm'),
+)
+
+
+class ActivityImportError(Exception):
+    """The uploaded file is not a usable activity"""
+
+
+def activity_format(filename):
+    """gpx or tcx from a file name, or None"""
+    extension = os.path.splitext(filename or '')[1].lower().lstrip('.')
+    return extension if extension in ACTIVITY_FORMATS else None
+
+
+def _local(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def _float(text):
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_point_time(text):
+    """ISO 8601 timestamp as written by watches ('...Z', fractions, offsets)"""
+    if not text:
+        return None
+    value = text.strip().replace('Z', '+00:00')
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        try:
+            return datetime.fromisoformat(FRACTION_PATTERN.sub('', value, count=1))
+        except ValueError:
+            return None
+
+
+def _read_point(elem, fmt):
+    """(time, lat, lon, elevation, heart rate, device distance) for one point element"""
+    point = {'time': None, 'lat': None, 'lon': None, 'ele': None, 'hr': None, 'distance': None}
+
+    if fmt == 'gpx':
+        point['lat'] = _float(elem.get('lat'))
+        point['lon'] = _float(elem.get('lon'))
+
+    for child in elem.iter():
+        name = _local(child.tag)
+        if name == 'time' or name == 'Time':
+            point['time'] = parse_point_time(child.text)
+        elif name == 'ele' or name == 'AltitudeMeters':
+            point['ele'] = _float(child.text)
+        elif name == 'LatitudeDegrees':
+            point['lat'] = _float(child.text)
+        elif name == 'LongitudeDegrees':
+            point['lon'] = _float(child.text)
+        elif name == 'DistanceMeters':
+            point['distance'] = _float(child.text)
+        elif name == 'hr':
+            point['hr'] = _float(child.text)
+        elif name == 'HeartRateBpm':
+            for value in child:
+                if _local(value.tag) == 'Value':
+                    point['hr'] = _float(value.text)
+
+    return point
+
+
+def iter_track_points(source, fmt):
+    """
+    Yield track points from a GPX or TCX file object with incremental parsing.
+    Each point element is dropped from the tree once read, so memory stays
+    flat however long the activity is.
+    """
+    point_tag = POINT_TAGS[fmt]
+    parents = []
+
+    try:
+        for event, elem in ET.iterparse(source, events=('start', 'end')):
+            if event == 'start':
+                parents.append(elem)
+                continue
+
+            parents.pop()
+            if _local(elem.tag) != point_tag:
+                continue
+
+            point = _read_point(elem, fmt)
+            if parents:
+                parents[-1].remove(elem)
+            elem.clear()
+            yield point
+    except ET.ParseError as e:
+        raise ActivityImportError(f'Invalid {fmt.upper()} file: {e}')
+
+
+def haversine_meters(lat1, lon1, lat2, lon2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_METERS * math.asin(math.sqrt(a))
+
+
+class ActivitySummary:
+    """Single-pass accumulator for distance, duration, elevation and heart rate"""
+
+    def __init__(self):
+        self.points = 0
+        self.started_at = None
+        self.ended_at = None
+        self.gps_distance = 0.0
+        self.device_distance = None
+        self.elevation_gain = 0.0
+        self.heart_rate_sum = 0.0
+        self.heart_rate_count = 0
+        self.max_heart_rate = None
+        self._last_position = None
+        self._elevation_reference = None
+
+    def add(self, point):
+        self.points += 1
+
+        if point['time'] is not None:
+            if self.started_at is None:
+                self.started_at = point['time']
+            self.ended_at = point['time']
+
+        if point['lat'] is not None and point['lon'] is not None:
+            if self._last_position is not None:
+                self.gps_distance += haversine_meters(*self._last_position, point['lat'], point['lon'])
+            self._last_position = (point['lat'], point['lon'])
+
+        # TCX files carry the device's own cumulative distance; trust it over GPS
+        if point['distance'] is not None:
+            self.device_distance = max(self.device_distance or 0.0, point['distance'])
+
+        if point['ele'] is not None:
+            if self._elevation_reference is None:
+                self._elevation_reference = point['ele']
+            elif point['ele'] - self._elevation_reference >= ELEVATION_NOISE_METERS:
+                self.elevation_gain += point['ele'] - self._elevation_reference
+                self._elevation_reference = point['ele']
+            elif self._elevation_reference - point['ele'] >= ELEVATION_NOISE_METERS:
+                self._elevation_reference = point['ele']
+
+        if point['hr']:
+            self.heart_rate_sum += point['hr']
+            self.heart_rate_count += 1
+            self.max_heart_rate = max(self.max_heart_rate or 0.0, point['hr'])
+
+    @property
+    def distance_m(self):
+        """Cumulative distance so far, or None when the file has no distance at all"""
+        if self.device_distance is not None:
+            return self.device_distance
+        return self.gps_distance if self._last_position is not None else None
+
+    def to_dict(self):
+        distance_m = self.distance_m or 0.0
+        duration_s = (self.ended_at - self.started_at).total_seconds() if self.started_at else 0.0
+
+        summary = {
+            'points': self.points,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'distance_km': round(distance_m / 1000, 2) if distance_m else None,
+            'duration_minutes': round(duration_s / 60, 2) if duration_s > 0 else None,
+            'pace_min_per_km': None,
+            'elevation_gain_m': round(self.elevation_gain, 1) if self._elevation_reference is not None else None,
+            'avg_heart_rate': round(self.heart_rate_sum / self.heart_rate_count) if self.heart_rate_count else None,
+            'max_heart_rate': round(self.max_heart_rate) if self.max_heart_rate else None,
+        }
+        if summary['distance_km'] and summary['duration_minutes']:
+            summary['pace_min_per_km'] = round((duration_s / 60) / (distance_m / 1000), 2)
+        return summary
+
+
+def summarize_activity(points, recorder=None):
+    """Summarize track points; a SampleRecorder, if given, collects its streams in the same pass"""
+    summary = ActivitySummary()
+    for point in points:
+        summary.add(point)
+        if recorder is not None:
+            recorder.add(point, summary.distance_m)
+    if not summary.points:
+        raise ActivityImportError('No track points found')
+    return summary.to_dict()
+
+
+def summary_rows(summary, athlete_id, file_sha1, file_name):
+    """
+    performance_tracking INSERT parameters for a summary. Dedupe keys are
+    derived from the file hash, so importing the same file twice adds nothing.
+    """
+    activity_date = date.fromisoformat(summary['started_at'][:10]) if summary['started_at'] else date.today()
+    notes = f'Imported from {file_name}'
+
+    return [
+        (athlete_id, activity_date, metric_type, Decimal(str(summary[field])), unit, notes, None,
+         f'activity:{file_sha1}:{suffix}')
+        for field, suffix, metric_type, unit in SUMMARY_METRICS
+        if summary[field] is not None
+    ]
+
+
+def save_upload(file_storage, path):
+    """Copy an uploaded file to disk in chunks; returns its SHA-1"""
+    digest = hashlib.sha1()
+    with open(path, 'wb') as target:
+        while True:
+            chunk = file_storage.stream.read(FILE_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            target.write(chunk)
+    return digest.hexdigest()
+
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=ACTIVITY_IMPORT_WORKERS, thread_name_prefix='activity-import')
+    return _executor
+
+
+def process_import(app, mysql, import_id, path):
+    """Parse a stored activity file and write its summary rows (runs on the worker pool)"""
+    with app.app_context():
+        cursor = mysql.connection.cursor()
+        try:
+            cursor.execute("""
+                UPDATE activity_imports SET status = 'processing' WHERE import_id = %s
+            """, (import_id,))
+            cursor.execute("""
+                SELECT athlete_id, file_format, file_name, file_sha1
+                FROM activity_imports WHERE import_id = %s
+            """, (import_id,))
+            job = cursor.fetchone()
+            mysql.connection.commit()
+
+            recorder = SampleRecorder()
+            with open(path, 'rb') as source:
+                summary = summarize_activity(iter_track_points(source, job['file_format']), recorder)
+
+            rows = summary_rows(summary, job['athlete_id'], job['file_sha1'], job['file_name'])
+            fresh = new_rows(cursor, rows)
+            summary['records_written'] = 0
+            if rows:
+                cursor.executemany(INGEST_INSERT, rows)
+                # executemany with no rows runs nothing and leaves the SELECT's rowcount behind
+                summary['records_written'] = cursor.rowcount
+            _, summary['completed_goals'] = apply_new_records(cursor, job['athlete_id'], fresh)
+            summary['streams'] = store_streams(cursor, job['athlete_id'], import_id, recorder)
+
+            cursor.execute("""
+                UPDATE activity_imports
+                SET status = 'completed', summary = %s, activity_date = %s, completed_at = NOW()
+                WHERE import_id = %s
+            """, (json.dumps(summary), rows[0][1] if rows else None, import_id))
+            mysql.connection.commit()
+            invalidate_athlete_analytics(job['athlete_id'])
+
+        except Exception as e:
+            mysql.connection.rollback()
+            if not isinstance(e, ActivityImportError):
+                logger.error(f"Activity import {import_id} failed: {str(e)}\nTraceback:\n{traceback.format_exc()}")
+            cursor.execute("""
+                UPDATE activity_imports
+                SET status = 'failed', error = %s, completed_at = NOW()
+                WHERE import_id = %s
+            """, (str(e)[:500], import_id))
+            mysql.connection.commit()
+        finally:
+            cursor.close()
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def submit_import(app, mysql, import_id, path):
+    """Queue an activity file for processing off the request thread"""
+    return _get_executor().submit(process_import, app, mysql, import_id, path)
@@ -0,0 +1,256 @@
+from datetime import date, timedelta
+
+# Logged statuses that count as training on that day; a skipped session does not
+ACTIVE_STATUSES = ('completed', 'partial')
+
+# Weeks of adherence returned by default
+ADHERENCE_WEEKS = 8
+
+# Monday of the row's week, matching week_start() below
+SQL_WEEK_START = "DATE_SUB({column}, INTERVAL WEEKDAY({column}) DAY)"
+
+
+def week_start(day):
+    """Monday of the week containing day"""
+    return day - timedelta(days=day.weekday())
+
+
+def advance_streak(state, log_date):
+    """
+    Fold one active day into (current_streak, longest_streak, streak_start,
+    last_active_date). Days must arrive in date order: a second log on the
+    same day, or a log dated before the last active day, leaves the streak as
+    it is. Backdated days go through replay_streak() instead.
+    """
+    current, longest, streak_start, last_active = state
+
+    if last_active is not None and log_date <= last_active:
+        return state
+
+    if last_active is not None and log_date - last_active == timedelta(days=1):
+        current += 1
+    else:
+        current = 1
+        streak_start = log_date
+
+    return current, max(longest, current), streak_start, log_date
+
+
+def replay_streak(active_days):
+    """Streak state for a whole history of active days, in any order"""
+    state = (0, 0, None, None)
+    for day in sorted(set(active_days)):
+        state = advance_streak(state, day)
+    return state
+
+
+def effective_streak(current_streak, last_active_date, today=None):
+    """A stored streak is broken once a whole day passes without training"""
+    today = today or date.today()
+    if last_active_date is None or (today - last_active_date).days > 1:
+        return 0
+    return int(current_streak)
+
+
+def adherence_ratio(planned, completed):
+    if not planned:
+        return None
+    return round(min(completed / planned, 1.0), 3)
+
+
+def record_workout(cursor, athlete_id, log_date, completion_status):
+    """
+    Fold one workout log into the athlete's streak and weekly counters inside
+    the caller's transaction: one primary-key read and two primary-key upserts,
+    however long the log history is. The log itself must already be inserted.
+
+    A backdated day (synced late from an offline queue, or logged after a
+    later day) cannot be folded in, so the streak is replayed from the
+    athlete's active days in workout_logs instead.
+    """
+    active = completion_status in ACTIVE_STATUSES
+
+    cursor.execute("""
+        INSERT INTO athlete_weekly_adherence (athlete_id, week_start, completed, skipped)
+        VALUES (%s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE completed = completed + VALUES(completed), skipped = skipped + VALUES(skipped)
+    """, (athlete_id, week_start(log_date), int(active), int(not active)))
+
+    if not active:
+        return
+
+    cursor.execute("""
+        SELECT current_streak, longest_streak, streak_start, last_active_date
+        FROM athlete_streaks
+        WHERE athlete_id = %s
+        FOR UPDATE
+    """, (athlete_id,))
+    row = cursor.fetchone()
+    state = (
+        (row['current_streak'], row['longest_streak'], row['streak_start'], row['last_active_date'])
+        if row else (0, 0, None, None)
+    )
+
+    last_active = state[3]
+    if last_active is not None and log_date == last_active:
+        return
+    if last_active is not None and log_date < last_active:
+        # Served by idx_workout_logs_athlete_date; one row per active day
+        cursor.execute(f"""
+            SELECT DISTINCT completed_date
+            FROM workout_logs
+            WHERE athlete_id = %s AND completed_date IS NOT NULL
+              AND completion_status IN ({', '.join(['%s'] * len(ACTIVE_STATUSES))})
+        """, (athlete_id, *ACTIVE_STATUSES))
+        updated = replay_streak([row['completed_date'] for row in cursor.fetchall()] + [log_date])
+    else:
+        updated = advance_streak(state, log_date)
+
+    if updated == state:
+        return
+
+    cursor.execute("""
+        INSERT INTO athlete_streaks (athlete_id, current_streak, longest_streak, streak_start, last_active_date)
+        VALUES (%s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE current_streak = VALUES(current_streak), longest_streak = VALUES(longest_streak),
+                                streak_start = VALUES(streak_start), last_active_date = VALUES(last_active_date)
+    """, (athlete_id, *updated))
+
+
+def refresh_planned_weeks(cursor, athlete_id, start_date, end_date):
+    """
+    Recount planned sessions for the weeks spanning start_date..end_date from
+    the athlete's calendar, after instances there were added or dropped.
+    """
+    if not athlete_id or start_date is None or end_date is None:
+        return
+
+    first_week = week_start(start_date)
+    last_day = week_start(end_date) + timedelta(days=6)
+
+    cursor.execute("""
+        UPDATE athlete_weekly_adherence SET planned = 0
+        WHERE athlete_id = %s AND week_start BETWEEN %s AND %s
+    """, (athlete_id, first_week, last_day))
+
+    cursor.execute(f"""
+        INSERT INTO athlete_weekly_adherence (athlete_id, week_start, planned)
+        SELECT athlete_id, {SQL_WEEK_START.format(column='scheduled_date')} AS week_start, COUNT(*)
+        FROM athlete_session_instances
+        WHERE athlete_id = %s AND scheduled_date BETWEEN %s AND %s
+        GROUP BY athlete_id, week_start
+        ON DUPLICATE KEY UPDATE planned = VALUES(planned)
+    """, (athlete_id, first_week, last_day))
+
+
+def summarize_adherence(streak_row, week_rows, weeks=ADHERENCE_WEEKS, today=None):
+    """Streak and per-week adherence payload; weeks without a stored row read as zero"""
+    today = today or date.today()
+    stored = {row['week_start']: row for row in week_rows}
+    current_week = week_start(today)
+
+    week_list = []
+    for offset in range(weeks - 1, -1, -1):
+        start = current_week - timedelta(weeks=offset)
+        row = stored.get(start) or {'planned': 0, 'completed': 0, 'skipped': 0}
+        planned, completed = int(row['planned']), int(row['completed'])
+        week_list.append({
+            'week_start': start.isoformat(),
+            'planned': planned,
+            'completed': completed,
+            'skipped': int(row['skipped']),
+            'adherence': adherence_ratio(planned, completed),
+        })
+
+    if streak_row:
+        last_active = streak_row['last_active_date']
+        current_streak = effective_streak(streak_row['current_streak'], last_active, today)
+        longest_streak = int(streak_row['longest_streak'])
+    else:
+        last_active, current_streak, longest_streak = None, 0, 0
+
+    return {
+        'current_streak': current_streak,
+        'longest_streak': longest_streak,
+        'last_active_date': last_active.isoformat() if last_active else None,
+        'this_week': week_list[-1] if week_list else None,
+        'weeks': week_list,
+    }
+
+
+def load_adherence(cursor, athlete_id, weeks=ADHERENCE_WEEKS, today=None):
+    today = today or date.today()
+
+    cursor.execute("""
+        SELECT current_streak, longest_streak, streak_start, last_active_date
+        FROM athlete_streaks
+        WHERE athlete_id = %s
+    """, (athlete_id,))
+    streak_row = cursor.fetchone()
+
+    cursor.execute("""
+        SELECT week_start, planned, completed, skipped
+        FROM athlete_weekly_adherence
+        WHERE athlete_id = %s AND week_start BETWEEN %s AND %s
+    """, (athlete_id, week_start(today) - timedelta(weeks=weeks - 1), week_start(today)))
+
+    return summarize_adherence(streak_row, cursor.fetchall(), weeks, today)
+
+
+def rebuild_adherence(mysql):
+    """
+    Recompute streaks and weekly counters from the whole workout log and
+    calendar. Returns (athletes with a streak, weeks stored).
+    """
+    from MySQLdb.cursors import SSDictCursor
+
+    streaks = {}
+    weeks = {}
+
+    reader = mysql.connection.cursor(SSDictCursor)
+    try:
+        reader.execute("""
+            SELECT athlete_id, completed_date, completion_status
+            FROM workout_logs
+            WHERE completed_date IS NOT NULL
+            ORDER BY athlete_id, completed_date
+        """)
+        for row in reader:
+            athlete_id = row['athlete_id']
+            active = row['completion_status'] in ACTIVE_STATUSES
+            counts = weeks.setdefault((athlete_id, week_start(row['completed_date'])), [0, 0, 0])
+            counts[1 if active else 2] += 1
+            if active:
+                streaks[athlete_id] = advance_streak(
+                    streaks.get(athlete_id, (0, 0, None, None)), row['completed_date']
+                )
+
+        reader.execute(f"""
+            SELECT athlete_id, {SQL_WEEK_START.format(column='scheduled_date')} AS week_start, COUNT(*) AS planned
+            FROM athlete_session_instances
+            GROUP BY athlete_id, week_start
+        """)
+        for row in reader:
+            weeks.setdefault((row['athlete_id'], row['week_start']), [0, 0, 0])[0] = row['planned']
+    finally:
+        reader.close()
+
+    cursor = mysql.connection.cursor()
+    try:
+        cursor.execute("DELETE FROM athlete_streaks")
+        cursor.execute("DELETE FROM athlete_weekly_adherence")
+        cursor.executemany("""
+            INSERT INTO athlete_streaks (athlete_id, current_streak, longest_streak, streak_start, last_active_date)
+            VALUES (%s, %s, %s, %s, %s)
+        """, [(athlete_id, *state) for athlete_id, state in streaks.items()])
+        cursor.executemany("""
+            INSERT INTO athlete_weekly_adherence (athlete_id, week_start, planned, completed, skipped)
+            VALUES (%s, %s, %s, %s, %s)
+        """, [(athlete_id, week, *counts) for (athlete_id, week), counts in weeks.items()])
+        mysql.connection.commit()
+        return len(streaks), len(weeks)
+    except Exception:
+        mysql.connection.rollback()
+        raise
+    finally:
+        cursor.close()
@@ -0,0 +1,129 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+
+from utils.adherence import ADHERENCE_WEEKS, load_adherence
+
+ANALYTICS_CACHE_SIZE = 5000
+
+# Other workers write performance and goals too; cached analytics are re-read after this long
+ANALYTICS_TTL_SECONDS = 60
+
+WEEK_WINDOW_DAYS = 7
+
+
+class AnalyticsCache:
+    """
+    In-process LRU of per-athlete analytics. Entries also expire at midnight,
+    since the week window moves with the date.
+    """
+
+    def __init__(self, max_size=ANALYTICS_CACHE_SIZE):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.max_size = max_size
+
+    def get(self, athlete_id):
+        with self._lock:
+            entry = self._entries.get(athlete_id)
+            if entry is None:
+                return None
+            stored_at, stored_on, analytics = entry
+            if time.monotonic() - stored_at > ANALYTICS_TTL_SECONDS or stored_on != date.today():
+                del self._entries[athlete_id]
+                return None
+            self._entries.move_to_end(athlete_id)
+            return analytics
+
+    def put(self, athlete_id, analytics):
+        with self._lock:
+            self._entries[athlete_id] = (time.monotonic(), date.today(), analytics)
+            self._entries.move_to_end(athlete_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, athlete_id):
+        with self._lock:
+            self._entries.pop(athlete_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+analytics_cache = AnalyticsCache()
+
+
+def summarize_analytics(performance_rows, goal_rows):
+    """Build the analytics payload from the two grouped queries"""
+    analytics = {
+        'total_workouts': 0,
+        'week_workouts': 0,
+        'weekly_data': {},
+        'active_goals': 0,
+        'completed_goals': 0,
+    }
+
+    for row in performance_rows:
+        recent = int(row['recent'] or 0)
+        analytics['total_workouts'] += int(row['total'])
+        analytics['week_workouts'] += recent
+        if recent:
+            analytics['weekly_data'][row['day']] = recent
+
+    for row in goal_rows:
+        if row['status'] in ('active', 'completed'):
+            analytics[f"{row['status']}_goals"] = int(row['count'])
+
+    return analytics
+
+
+def compute_athlete_analytics(cursor, athlete_id, adherence_weeks=ADHERENCE_WEEKS):
+    # One pass over the athlete's records: totals per weekday, split into all time and the last week
+    cursor.execute("""
+        SELECT DAYNAME(date) as day, COUNT(*) as total,
+               SUM(date >= CURDATE() - INTERVAL %s DAY) as recent
+        FROM performance_tracking
+        WHERE athlete_id = %s
+        GROUP BY DAYNAME(date)
+    """, (WEEK_WINDOW_DAYS, athlete_id))
+    performance_rows = cursor.fetchall()
+
+    cursor.execute("""
+        SELECT status, COUNT(*) as count
+        FROM goals
+        WHERE athlete_id = %s
+        GROUP BY status
+    """, (athlete_id,))
+    goal_rows = cursor.fetchall()
+
+    analytics = summarize_analytics(performance_rows, goal_rows)
+    # Streaks and weekly adherence are kept up to date per logged session; read, never recomputed here
+    analytics['adherence'] = load_adherence(cursor, athlete_id, adherence_weeks)
+    return analytics
+
+
+def load_athlete_analytics(mysql, athlete_id):
+    """Cached analytics for one athlete; database errors propagate to the caller"""
+    analytics = analytics_cache.get(athlete_id)
+    if analytics is not None:
+        return analytics
+
+    cursor = mysql.connection.cursor()
+    try:
+        analytics = compute_athlete_analytics(cursor, athlete_id)
+    finally:
+        cursor.close()
+
+    analytics_cache.put(athlete_id, analytics)
+    return analytics
+
+
+def invalidate_athlete_analytics(*athlete_ids):
+    """Forget cached analytics after a performance or goal change"""
+    for athlete_id in athlete_ids:
+        try:
+            analytics_cache.invalidate(int(athlete_id))
+        except (TypeError, ValueError):
+            continue
@@ -0,0 +1,249 @@
+import heapq
+import threading
+import time
+from array import array
+
+from utils.coach_search import tokenize
+from utils.logger import log_and_recover
+
+COACH_FEATURE_QUERY = """
+    SELECT c.coach_id, u.full_name, u.profile_picture, c.specialization,
+           c.experience_years, c.hourly_rate, c.rating, c.total_reviews,
+           (SELECT COUNT(*) FROM athletes a WHERE a.coach_id = c.coach_id) AS roster_size
+    FROM coaches c
+    JOIN users u ON c.user_id = u.user_id
+"""
+
+# Contribution of each component to the final score (components are 0..1)
+MATCH_WEIGHTS = {
+    'sport': 0.35,
+    'budget': 0.2,
+    'rating': 0.2,
+    'experience': 0.15,
+    'load': 0.1,
+}
+
+# Years of coaching experience that fully satisfy each athlete skill level
+SKILL_EXPERIENCE_YEARS = {
+    'beginner': 1,
+    'intermediate': 3,
+    'advanced': 6,
+    'professional': 10,
+}
+DEFAULT_SKILL_LEVEL = 'intermediate'
+
+# Roster size at which the load component has dropped to one half
+ROSTER_HALF_LOAD = 20
+
+# Rating confidence: a coach needs this many reviews before the rating counts fully
+RATING_PRIOR_REVIEWS = 5
+
+FULL_RELOAD_SECONDS = 300
+
+
+class CoachFeatureMatrix:
+    """
+    Column-oriented coach features for recommendation scoring.
+
+    Each feature is a flat array indexed by row position, so a request scores
+    every coach in a single pass over the columns. Per-coach terms that do not
+    depend on the athlete (rating, roster load, experience fit per skill level)
+    are computed when a coach is loaded or updated, not per request.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+        self._loaded_at = None
+
+    def _reset(self):
+        self.coach_ids = array('l')
+        self.hourly_rate = array('d')
+        self.static_score = array('d')
+        self.experience_fit = {level: array('d') for level in SKILL_EXPERIENCE_YEARS}
+        self.specialization_rows = {}
+        self.rows = []
+        self.positions = {}
+
+    @staticmethod
+    def _features(row):
+        rating = float(row['rating'] or 0)
+        reviews = int(row.get('total_reviews') or 0)
+        roster_size = int(row.get('roster_size') or 0)
+        experience = float(row['experience_years'] or 0)
+
+        confidence = reviews / (reviews + RATING_PRIOR_REVIEWS)
+        rating_score = (rating / 5.0) * confidence
+        load_score = ROSTER_HALF_LOAD / (ROSTER_HALF_LOAD + roster_size)
+
+        return {
+            'hourly_rate': float(row['hourly_rate']) if row.get('hourly_rate') is not None else -1.0,
+            'static_score': MATCH_WEIGHTS['rating'] * rating_score + MATCH_WEIGHTS['load'] * load_score,
+            'experience_fit': {
+                level: min(experience / years, 1.0) for level, years in SKILL_EXPERIENCE_YEARS.items()
+            },
+            'terms': set(tokenize(row.get('specialization'))),
+        }
+
+    def _append(self, row):
+        features = self._features(row)
+        position = len(self.coach_ids)
+        self.positions[row['coach_id']] = position
+        self.coach_ids.append(row['coach_id'])
+        self.hourly_rate.append(features['hourly_rate'])
+        self.static_score.append(features['static_score'])
+        for level, column in self.experience_fit.items():
+            column.append(features['experience_fit'][level])
+        for term in features['terms']:
+            self.specialization_rows.setdefault(term, set()).add(position)
+        self.rows.append(dict(row))
+
+    def _write(self, position, row):
+        old_terms = set(tokenize(self.rows[position].get('specialization')))
+        for term in old_terms:
+            self.specialization_rows.get(term, set()).discard(position)
+
+        features = self._features(row)
+        self.hourly_rate[position] = features['hourly_rate']
+        self.static_score[position] = features['static_score']
+        for level, column in self.experience_fit.items():
+            column[position] = features['experience_fit'][level]
+        for term in features['terms']:
+            self.specialization_rows.setdefault(term, set()).add(position)
+        self.rows[position] = dict(row)
+
+    def load(self, rows):
+        with self._lock:
+            self._reset()
+            for row in rows:
+                self._append(row)
+            self._loaded_at = time.monotonic()
+
+    def upsert(self, row):
+        with self._lock:
+            position = self.positions.get(row['coach_id'])
+            if position is None:
+                self._append(row)
+            else:
+                self._write(position, row)
+
+    def invalidate(self):
+        """Force a full reload on the next recommendation"""
+        with self._lock:
+            self._loaded_at = None
+
+    def is_stale(self):
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > FULL_RELOAD_SECONDS
+
+    def recommend(self, sport_type, skill_level=None, budget=None, limit=10):
+        """
+        Score every coach for one athlete and return the top `limit` as
+        (coach row, score, component breakdown) tuples, best first.
+        """
+        skill_level = skill_level if skill_level in SKILL_EXPERIENCE_YEARS else DEFAULT_SKILL_LEVEL
+
+        with self._lock:
+            count = len(self.coach_ids)
+
+            sport_rows = set()
+            for term in tokenize(sport_type):
+                sport_rows |= self.specialization_rows.get(term, set())
+
+            experience = self.experience_fit[skill_level]
+            experience_weight = MATCH_WEIGHTS['experience']
+            budget_weight = MATCH_WEIGHTS['budget']
+
+            if budget:
+                # Full marks within budget, linear fall-off to zero at twice the budget,
+                # half marks for coaches who have not published a rate
+                overspend = budget_weight / budget
+                ceiling = 2 * budget
+                scores = array('d', (
+                    base + experience_weight * fit + (
+                        budget_weight if 0 <= rate <= budget
+                        else budget_weight * 0.5 if rate < 0
+                        else (ceiling - rate) * overspend if rate < ceiling
+                        else 0.0
+                    )
+                    for base, fit, rate in zip(self.static_score, experience, self.hourly_rate)
+                ))
+            else:
+                scores = array('d', (
+                    base + experience_weight * fit + budget_weight
+                    for base, fit in zip(self.static_score, experience)
+                ))
+
+            for position in sport_rows:
+                scores[position] += MATCH_WEIGHTS['sport']
+
+            top = heapq.nlargest(limit, range(count), key=scores.__getitem__)
+
+            results = []
+            for position in top:
+                rate = self.hourly_rate[position]
+                if not budget:
+                    budget_score = 1.0
+                elif rate < 0:
+                    budget_score = 0.5
+                else:
+                    budget_score = max(0.0, min(1.0, 1 - (rate - budget) / budget))
+                results.append((
+                    self.rows[position],
+                    round(scores[position], 4),
+                    {
+                        'sport': 1.0 if position in sport_rows else 0.0,
+                        'experience': round(experience[position], 3),
+                        'budget': round(budget_score, 3),
+                    }
+                ))
+
+        return results
+
+
+coach_feature_matrix = CoachFeatureMatrix()
+
+
+def ensure_coach_features(mysql):
+    """Build (or periodically rebuild) the feature matrix from the coaches table"""
+    if not coach_feature_matrix.is_stale():
+        return coach_feature_matrix
+
+    cursor = mysql.connection.cursor()
+    cursor.execute(COACH_FEATURE_QUERY)
+    rows = cursor.fetchall()
+    cursor.close()
+
+    coach_feature_matrix.load(rows)
+    return coach_feature_matrix
+
+
+def _invalidate_features(*args, **kwargs):
+    coach_feature_matrix.invalidate()
+
+
+@log_and_recover(_invalidate_features)
+def refresh_coach_features(mysql, coach_ids=None, user_id=None):
+    """Re-read coaches after a profile, rating or roster change and update their rows"""
+    if coach_feature_matrix.is_stale():
+        return
+
+    if user_id is None:
+        coach_ids = [coach_id for coach_id in set(coach_ids or ()) if coach_id]
+        if not coach_ids:
+            return
+
+    cursor = mysql.connection.cursor()
+    try:
+        if user_id is not None:
+            cursor.execute(COACH_FEATURE_QUERY + " WHERE c.user_id = %s", (user_id,))
+        else:
+            cursor.execute(
+                COACH_FEATURE_QUERY + f" WHERE c.coach_id IN ({', '.join(['%s'] * len(coach_ids))})",
+                tuple(coach_ids)
+            )
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+
+    for row in rows:
+        coach_feature_matrix.upsert(row)
@@ -0,0 +1,139 @@
+import hashlib
+import json
+
+from utils.logger import log_and_recover, logger
+from utils.ratings import AGGREGATE_COLUMNS, format_aggregate
+
+PROFILE_DOCUMENT_QUERY = f"""
+    SELECT c.coach_id, c.specialization, c.experience_years, c.bio,
+           c.hourly_rate, c.certifications, c.achievements, c.coaching_philosophy,
+           c.rating, c.total_reviews,
+           u.user_id, u.full_name, u.email, u.phone_number, u.profile_picture,
+           (SELECT COUNT(*) FROM athletes a WHERE a.coach_id = c.coach_id) AS roster_size,
+           {AGGREGATE_COLUMNS}
+    FROM coaches c
+    JOIN users u ON c.user_id = u.user_id
+    LEFT JOIN rating_aggregates ra ON ra.user_id = c.user_id
+"""
+
+
+def build_coach_document(cursor, coach_id=None, user_id=None):
+    """
+    Assemble the public profile document for one coach from its sources.
+    Returns None when the coach does not exist.
+    """
+    if coach_id is not None:
+        cursor.execute(PROFILE_DOCUMENT_QUERY + " WHERE c.coach_id = %s", (coach_id,))
+    else:
+        cursor.execute(PROFILE_DOCUMENT_QUERY + " WHERE c.user_id = %s", (user_id,))
+    row = cursor.fetchone()
+    if not row:
+        return None
+
+    profile = {key: value for key, value in row.items() if not key.startswith('rating_')}
+    roster_size = profile.pop('roster_size')
+
+    return {
+        'profile': profile,
+        'ratings': format_aggregate(row),
+        'roster_size': roster_size,
+    }
+
+
+def serialize_document(document):
+    """Stable JSON body and its ETag"""
+    body = json.dumps(document, default=str, sort_keys=True, separators=(',', ':'))
+    return body, hashlib.md5(body.encode('utf-8')).hexdigest()
+
+
+def _store_document(cursor, document):
+    body, etag = serialize_document(document)
+    cursor.execute("""
+        INSERT INTO coach_profile_documents (coach_id, document, etag)
+        VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE document = VALUES(document), etag = VALUES(etag)
+    """, (document['profile']['coach_id'], body, etag))
+    return body, etag
+
+
+def _targets(coach_ids, user_id):
+    targets = [('coach', coach_id) for coach_id in set(coach_ids or ()) if coach_id]
+    if user_id is not None:
+        targets.append(('user', user_id))
+    return targets
+
+
+def _drop_documents(mysql, coach_ids=None, user_id=None):
+    """Delete the stored documents so load_coach_document rebuilds them on the next read"""
+    cursor = mysql.connection.cursor()
+    try:
+        mysql.connection.rollback()
+        for kind, key in _targets(coach_ids, user_id):
+            if kind == 'coach':
+                cursor.execute("DELETE FROM coach_profile_documents WHERE coach_id = %s", (key,))
+            else:
+                cursor.execute("""
+                    DELETE d FROM coach_profile_documents d
+                    JOIN coaches c ON c.coach_id = d.coach_id
+                    WHERE c.user_id = %s
+                """, (key,))
+        mysql.connection.commit()
+    except Exception as e:
+        mysql.connection.rollback()
+        logger.error(f"Dropping stale coach profile documents failed: {str(e)}")
+    finally:
+        cursor.close()
+
+
+@log_and_recover(_drop_documents)
+def rebuild_coach_documents(mysql, coach_ids=None, user_id=None):
+    """
+    Rebuild and store the documents of the given coaches after one of their
+    sources (profile, ratings, roster) changed. Coaches that no longer exist
+    lose their stored document.
+    """
+    targets = _targets(coach_ids, user_id)
+    if not targets:
+        return
+
+    cursor = mysql.connection.cursor()
+    try:
+        for kind, key in targets:
+            if kind == 'coach':
+                document = build_coach_document(cursor, coach_id=key)
+            else:
+                document = build_coach_document(cursor, user_id=key)
+
+            if document is None:
+                if kind == 'coach':
+                    cursor.execute("DELETE FROM coach_profile_documents WHERE coach_id = %s", (key,))
+                continue
+
+            _store_document(cursor, document)
+
+        mysql.connection.commit()
+    finally:
+        cursor.close()
+
+
+def load_coach_document(mysql, coach_id):
+    """
+    Return (body, etag) for a coach, building and storing the document on
+    first request. Returns (None, None) for unknown coaches.
+    """
+    cursor = mysql.connection.cursor()
+    try:
+        cursor.execute("SELECT document, etag FROM coach_profile_documents WHERE coach_id = %s", (coach_id,))
+        row = cursor.fetchone()
+        if row:
+            return row['document'], row['etag']
+
+        document = build_coach_document(cursor, coach_id=coach_id)
+        if document is None:
+            return None, None
+
+        stored = _store_document(cursor, document)
+        mysql.connection.commit()
+        return stored
+    finally:
+        cursor.close()
@@ -0,0 +1,255 @@
+import re
+import threading
+import time
+from bisect import bisect_left
+
+from utils.logger import log_and_recover
+
+COACH_DOCUMENT_QUERY = """
+    SELECT c.coach_id, u.user_id, u.full_name, u.profile_picture,
+           c.specialization, c.experience_years, c.bio, c.hourly_rate,
+           c.certifications, c.rating, c.total_reviews
+    FROM coaches c
+    JOIN users u ON c.user_id = u.user_id
+"""
+
+# How much a query term found in each field counts towards relevance
+FIELD_WEIGHTS = {
+    'full_name': 3.0,
+    'specialization': 3.0,
+    'certifications': 2.0,
+    'bio': 1.0,
+}
+
+RATE_BUCKETS = [('under_25', 0, 25), ('25_50', 25, 50), ('50_100', 50, 100), ('100_plus', 100, None)]
+EXPERIENCE_BUCKETS = [('0_2', 0, 3), ('3_5', 3, 6), ('6_10', 6, 11), ('10_plus', 11, None)]
+RATING_THRESHOLDS = [4, 3, 2, 1]
+
+# Other workers update profiles too; rebuild from the database at least this often
+FULL_RELOAD_SECONDS = 300
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall((text or '').lower())
+
+
+def split_specializations(value):
+    return [s.strip() for s in (value or '').split(',') if s.strip()]
+
+
+def _in_bucket(value, low, high):
+    return value is not None and value >= low and (high is None or value < high)
+
+
+class CoachSearchIndex:
+    """
+    In-memory inverted index over coach profiles.
+
+    Postings map each term to {coach_id: weight}; query terms are matched as
+    prefixes against a sorted vocabulary so partial words still hit. The index
+    is built lazily from the database and updated per coach when a profile
+    changes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._docs = {}
+        self._postings = {}
+        self._vocabulary = []
+        self._loaded_at = None
+
+    def _normalize(self, row):
+        doc = dict(row)
+        doc['hourly_rate'] = float(row['hourly_rate']) if row.get('hourly_rate') is not None else None
+        doc['rating'] = float(row['rating']) if row.get('rating') is not None else 0.0
+        doc['experience_years'] = row.get('experience_years')
+        doc['specializations'] = split_specializations(row.get('specialization'))
+        return doc
+
+    def _terms(self, doc):
+        weights = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            for term in set(tokenize(doc.get(field))):
+                weights[term] = weights.get(term, 0) + weight
+        return weights
+
+    def _add(self, doc):
+        self._docs[doc['coach_id']] = doc
+        for term, weight in self._terms(doc).items():
+            self._postings.setdefault(term, {})[doc['coach_id']] = weight
+
+    def _remove(self, coach_id):
+        doc = self._docs.pop(coach_id, None)
+        if not doc:
+            return
+        for term in self._terms(doc):
+            postings = self._postings.get(term)
+            if postings:
+                postings.pop(coach_id, None)
+                if not postings:
+                    del self._postings[term]
+
+    def load(self, rows):
+        with self._lock:
+            self._docs = {}
+            self._postings = {}
+            for row in rows:
+                self._add(self._normalize(row))
+            self._vocabulary = sorted(self._postings)
+            self._loaded_at = time.monotonic()
+
+    def upsert(self, row):
+        with self._lock:
+            self._remove(row['coach_id'])
+            self._add(self._normalize(row))
+            self._vocabulary = sorted(self._postings)
+
+    def remove(self, coach_id):
+        with self._lock:
+            self._remove(coach_id)
+            self._vocabulary = sorted(self._postings)
+
+    def invalidate(self):
+        """Force a full reload on the next search"""
+        with self._lock:
+            self._loaded_at = None
+
+    def is_stale(self):
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > FULL_RELOAD_SECONDS
+
+    def _match_term(self, token):
+        """Best weight per coach over every vocabulary term starting with token"""
+        matches = {}
+        idx = bisect_left(self._vocabulary, token)
+        while idx < len(self._vocabulary) and self._vocabulary[idx].startswith(token):
+            for coach_id, weight in self._postings[self._vocabulary[idx]].items():
+                if weight > matches.get(coach_id, 0):
+                    matches[coach_id] = weight
+            idx += 1
+        return matches
+
+    def _passes(self, doc, filters, skip=None):
+        if skip != 'specialization' and filters.get('specialization'):
+            wanted = filters['specialization'].lower()
+            if wanted not in (s.lower() for s in doc['specializations']):
+                return False
+        rate = doc['hourly_rate']
+        if filters.get('min_rate') is not None and (rate is None or rate < filters['min_rate']):
+            return False
+        if filters.get('max_rate') is not None and (rate is None or rate > filters['max_rate']):
+            return False
+        experience = doc['experience_years']
+        if filters.get('min_experience') is not None and (experience is None or experience < filters['min_experience']):
+            return False
+        if filters.get('min_rating') is not None and doc['rating'] < filters['min_rating']:
+            return False
+        return True
+
+    def search(self, text=None, filters=None, page=1, per_page=20):
+        """
+        Return (results, total, facets) for a free-text query plus filters.
+        Every query token must match (as a prefix) somewhere in the profile.
+        """
+        filters = filters or {}
+
+        with self._lock:
+            tokens = tokenize(text)
+            if tokens:
+                relevance = None
+                for token in tokens:
+                    matches = self._match_term(token)
+                    if relevance is None:
+                        relevance = matches
+                    else:
+                        relevance = {cid: score + matches[cid] for cid, score in relevance.items() if cid in matches}
+                    if not relevance:
+                        break
+                candidates = relevance or {}
+            else:
+                candidates = dict.fromkeys(self._docs, 0.0)
+
+            docs = [self._docs[cid] for cid in candidates]
+            matched = [doc for doc in docs if self._passes(doc, filters)]
+
+            # Specialization facet ignores its own filter so the other options stay visible
+            specialization_counts = {}
+            for doc in docs:
+                if self._passes(doc, filters, skip='specialization'):
+                    for specialization in doc['specializations']:
+                        specialization_counts[specialization] = specialization_counts.get(specialization, 0) + 1
+
+        def rank(doc):
+            quality = doc['rating'] * 0.5 + min(doc['experience_years'] or 0, 20) * 0.05
+            return (candidates[doc['coach_id']] + quality, doc.get('total_reviews') or 0)
+
+        matched.sort(key=rank, reverse=True)
+
+        facets = {
+            'specialization': dict(sorted(specialization_counts.items(), key=lambda item: (-item[1], item[0]))),
+            'hourly_rate': {
+                name: sum(1 for d in matched if _in_bucket(d['hourly_rate'], low, high))
+                for name, low, high in RATE_BUCKETS
+            },
+            'experience_years': {
+                name: sum(1 for d in matched if _in_bucket(d['experience_years'], low, high))
+                for name, low, high in EXPERIENCE_BUCKETS
+            },
+            'rating': {
+                f'{threshold}_plus': sum(1 for d in matched if d['rating'] >= threshold)
+                for threshold in RATING_THRESHOLDS
+            },
+        }
+
+        start = (page - 1) * per_page
+        results = []
+        for doc in matched[start:start + per_page]:
+            result = {key: value for key, value in doc.items() if key != 'specializations'}
+            result['score'] = round(rank(doc)[0], 3)
+            results.append(result)
+
+        return results, len(matched), facets
+
+
+coach_search_index = CoachSearchIndex()
+
+
+def ensure_coach_index(mysql):
+    """Build (or periodically rebuild) the index from the coaches table"""
+    if not coach_search_index.is_stale():
+        return coach_search_index
+
+    cursor = mysql.connection.cursor()
+    cursor.execute(COACH_DOCUMENT_QUERY)
+    rows = cursor.fetchall()
+    cursor.close()
+
+    coach_search_index.load(rows)
+    return coach_search_index
+
+
+def _invalidate_index(*args, **kwargs):
+    coach_search_index.invalidate()
+
+
+@log_and_recover(_invalidate_index)
+def refresh_coach_in_index(mysql, coach_id=None, user_id=None):
+    """Re-read one coach after a profile write and update the index in place"""
+    if coach_search_index.is_stale():
+        return
+
+    cursor = mysql.connection.cursor()
+    try:
+        if coach_id is not None:
+            cursor.execute(COACH_DOCUMENT_QUERY + " WHERE c.coach_id = %s", (coach_id,))
+        else:
+            cursor.execute(COACH_DOCUMENT_QUERY + " WHERE c.user_id = %s", (user_id,))
+        row = cursor.fetchone()
+    finally:
+        cursor.close()
+
+    if row:
+        coach_search_index.upsert(row)
+    elif coach_id is not None:
+        coach_search_index.remove(coach_id)
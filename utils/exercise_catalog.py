@@ -0,0 +1,175 @@
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+
+from utils.logger import log_and_recover
+
+NON_WORD_PATTERN = re.compile(r'[^a-z0-9]+')
+
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_MAX_LIMIT = 50
+
+# Other workers add exercises too; reload from the database at least this often
+FULL_RELOAD_SECONDS = 300
+
+
+def normalize_exercise_name(name):
+    """Canonical catalog key: lowercase words separated by single spaces"""
+    return NON_WORD_PATTERN.sub(' ', (name or '').lower()).strip()
+
+
+def display_exercise_name(name):
+    return ' '.join((name or '').split())
+
+
+class ExerciseCatalog:
+    """
+    Sorted in-memory index for exercise autocomplete.
+
+    Every exercise is indexed under its full normalized name and under each
+    later word start ("bench press" is also found by "press"), so a lookup is
+    one bisect into a sorted key list followed by a short forward scan.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys = []
+        self._exercises = {}
+        self._by_name = {}
+        self._loaded_at = None
+
+    @staticmethod
+    def _index_keys(normalized, exercise_id):
+        words = normalized.split(' ')
+        return [(' '.join(words[i:]), i, exercise_id) for i in range(len(words))]
+
+    def _add(self, exercise):
+        normalized = exercise['normalized_name']
+        self._exercises[exercise['exercise_id']] = exercise
+        self._by_name[normalized] = exercise['exercise_id']
+        return self._index_keys(normalized, exercise['exercise_id'])
+
+    def load(self, rows):
+        with self._lock:
+            self._exercises = {}
+            self._by_name = {}
+            keys = []
+            for row in rows:
+                keys.extend(self._add(dict(row)))
+            keys.sort()
+            self._keys = keys
+            self._loaded_at = time.monotonic()
+
+    def add(self, exercise):
+        with self._lock:
+            if exercise['normalized_name'] in self._by_name:
+                return
+            for key in self._add(dict(exercise)):
+                insort(self._keys, key)
+
+    def invalidate(self):
+        """Force a full reload on the next lookup"""
+        with self._lock:
+            self._loaded_at = None
+
+    def is_stale(self):
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > FULL_RELOAD_SECONDS
+
+    def lookup(self, normalized):
+        """Exercise id for an exact normalized name, or None"""
+        return self._by_name.get(normalized)
+
+    def complete(self, prefix, limit=AUTOCOMPLETE_LIMIT):
+        """
+        Exercises whose name, or any word within it, starts with prefix.
+        Whole-name matches come before mid-name matches, then alphabetical.
+        """
+        prefix = normalize_exercise_name(prefix)
+        if not prefix:
+            return []
+
+        with self._lock:
+            matches = {}
+            idx = bisect_left(self._keys, (prefix,))
+            while idx < len(self._keys) and self._keys[idx][0].startswith(prefix):
+                _, word_position, exercise_id = self._keys[idx]
+                if exercise_id not in matches or word_position < matches[exercise_id]:
+                    matches[exercise_id] = word_position
+                idx += 1
+
+            ranked = sorted(
+                matches,
+                key=lambda exercise_id: (matches[exercise_id] > 0, self._exercises[exercise_id]['normalized_name'])
+            )
+            return [self._exercises[exercise_id] for exercise_id in ranked[:limit]]
+
+
+exercise_catalog = ExerciseCatalog()
+
+
+def ensure_exercise_catalog(mysql):
+    """Build (or periodically rebuild) the catalog index from the exercises table"""
+    if not exercise_catalog.is_stale():
+        return exercise_catalog
+
+    cursor = mysql.connection.cursor()
+    cursor.execute("SELECT exercise_id, name, normalized_name, category FROM exercises")
+    rows = cursor.fetchall()
+    cursor.close()
+
+    exercise_catalog.load(rows)
+    return exercise_catalog
+
+
+def _invalidate_catalog(*args, **kwargs):
+    exercise_catalog.invalidate()
+
+
+@log_and_recover(_invalidate_catalog)
+def add_to_catalog(mysql, exercises):
+    """Add exercises committed by resolve_exercises() to the in-memory catalog"""
+    if not exercises:
+        return
+    catalog = ensure_exercise_catalog(mysql)
+    for exercise in exercises:
+        catalog.add(exercise)
+
+
+def resolve_exercises(mysql, cursor, names, coach_id=None):
+    """
+    Map free-text exercise names to catalog ids inside the caller's transaction,
+    creating catalog entries for names not seen before.
+
+    Returns ({normalized_name: exercise}, [new exercises]). New exercises should
+    be passed to add_to_catalog() only after the caller commits.
+    """
+    catalog = ensure_exercise_catalog(mysql)
+
+    wanted = {}
+    for name in names:
+        normalized = normalize_exercise_name(name)
+        if normalized and normalized not in wanted:
+            wanted[normalized] = display_exercise_name(name)
+
+    missing = [normalized for normalized in wanted if catalog.lookup(normalized) is None]
+    if missing:
+        cursor.executemany("""
+            INSERT IGNORE INTO exercises (name, normalized_name, created_by)
+            VALUES (%s, %s, %s)
+        """, [(wanted[normalized], normalized, coach_id) for normalized in missing])
+
+    resolved = {}
+    new_exercises = []
+    if wanted:
+        cursor.execute(f"""
+            SELECT exercise_id, name, normalized_name, category
+            FROM exercises
+            WHERE normalized_name IN ({', '.join(['%s'] * len(wanted))})
+        """, tuple(wanted))
+        for row in cursor.fetchall():
+            resolved[row['normalized_name']] = row
+            if catalog.lookup(row['normalized_name']) is None:
+                new_exercises.append(row)
+
+    return resolved, new_exercises
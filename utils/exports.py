@@ -0,0 +1,108 @@
+import csv
+import io
+import json
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+# Rows read from the server-side cursor (and encoded) per chunk
+EXPORT_FETCH_SIZE = 500
+
+# Every dataset is read through `athletes a`, so the same query serves one
+# athlete (a.athlete_id) or a coach's whole roster (a.coach_id).
+EXPORT_DATASETS = {
+    'performance': {
+        'select': """pt.performance_id, pt.athlete_id, pt.date, pt.metric_type, pt.metric_value,
+                     pt.unit, pt.notes""",
+        'from': """performance_tracking pt
+                   JOIN athletes a ON pt.athlete_id = a.athlete_id""",
+        'order': "pt.athlete_id, pt.date, pt.performance_id",
+    },
+    'workouts': {
+        'select': """wl.log_id, wl.athlete_id, wl.session_id, ws.session_name, wp.plan_name,
+                     wl.completed_date, wl.completion_status, wl.notes""",
+        'from': """workout_logs wl
+                   JOIN athletes a ON wl.athlete_id = a.athlete_id
+                   LEFT JOIN workout_sessions ws ON wl.session_id = ws.session_id
+                   LEFT JOIN workout_plans wp ON ws.plan_id = wp.plan_id""",
+        'order': "wl.athlete_id, wl.completed_date, wl.log_id",
+    },
+    'goals': {
+        'select': """g.goal_id, g.athlete_id, g.goal_type, g.metric_type, g.metric_aggregation,
+                     g.target_value, g.current_value, g.target_date, g.status, g.created_date""",
+        'from': """goals g
+                   JOIN athletes a ON g.athlete_id = a.athlete_id""",
+        'order': "g.athlete_id, g.created_date, g.goal_id",
+    },
+    'feedback': {
+        'select': """f.feedback_id, a.athlete_id, cu.full_name AS coach_name, f.feedback_text,
+                     f.performance_rating, f.focus_areas, f.strengths, f.improvements_needed,
+                     f.created_at""",
+        'from': """feedback f
+                   JOIN athletes a ON f.athlete_id = a.user_id
+                   JOIN users cu ON f.coach_id = cu.user_id
+                   LEFT JOIN coaches c ON a.coach_id = c.coach_id""",
+        'order': "a.athlete_id, f.created_at, f.feedback_id",
+        # A coach exports only the feedback they wrote themselves
+        'roster_filter': "a.coach_id = %s AND f.coach_id = c.user_id",
+    },
+}
+
+
+def build_export_query(dataset, scope):
+    """SELECT for a dataset, filtered to one athlete or to a coach's roster"""
+    spec = EXPORT_DATASETS[dataset]
+    if scope == 'athlete':
+        condition = "a.athlete_id = %s"
+    else:
+        condition = spec.get('roster_filter', "a.coach_id = %s")
+    return f"SELECT {spec['select']} FROM {spec['from']} WHERE {condition} ORDER BY {spec['order']}"
+
+
+def _csv_value(value):
+    return '' if value is None else value
+
+
+def encode_csv(columns, rows, include_header=False):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if include_header:
+        writer.writerow(columns)
+    for row in rows:
+        writer.writerow([_csv_value(row[column]) for column in columns])
+    return buffer.getvalue()
+
+
+def encode_jsonl(rows):
+    return ''.join(json.dumps(row, default=str) + '\n' for row in rows)
+
+
+def stream_export(connection, query, params, fmt, fetch_size=EXPORT_FETCH_SIZE):
+    """
+    Generator of encoded export chunks. Rows come from an unbuffered
+    server-side cursor a chunk at a time, so memory stays flat however much
+    history is exported. Wrap with stream_with_context when returning it.
+    """
+    from MySQLdb.cursors import SSDictCursor
+
+    cursor = connection.cursor(SSDictCursor)
+    try:
+        cursor.execute(query, params)
+        columns = [column[0] for column in cursor.description]
+
+        if fmt == 'csv':
+            yield encode_csv(columns, (), include_header=True)
+
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            yield encode_csv(columns, rows) if fmt == 'csv' else encode_jsonl(rows)
+    finally:
+        cursor.close()
+
+
+def export_filename(dataset, owner, fmt):
+    return f'{dataset}-{owner}.{fmt}'
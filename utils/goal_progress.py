@@ -0,0 +1,127 @@
+from datetime import datetime
+
+from utils.personal_records import is_better, record_metrics, records_by_metric
+
+# How a metric-linked goal turns matching records into its current value:
+# best    - best single record (direction from RECORD_METRICS)
+# latest  - most recent record
+# total   - sum of all records, e.g. distance run this month
+GOAL_AGGREGATIONS = ('best', 'latest', 'total')
+DEFAULT_GOAL_AGGREGATION = 'best'
+
+
+def _as_date(value):
+    return value.date() if isinstance(value, datetime) else value
+
+
+def advance_goal(goal, records, directions):
+    """
+    Fold (date, value) records into a goal's current value. Only records dated
+    on or after the day the goal was set count. Returns (current_value,
+    last_metric_date); both unchanged when no record applies.
+    """
+    current = goal['current_value']
+    last_date = goal['last_metric_date']
+    created_on = _as_date(goal['created_date'])
+    aggregation = goal['metric_aggregation'] or DEFAULT_GOAL_AGGREGATION
+    # Until a record has been counted, current_value is whatever the athlete typed in
+    counted = last_date is not None
+
+    for record_date, value in sorted(records, key=lambda record: record[0]):
+        if created_on and record_date < created_on:
+            continue
+
+        if aggregation == 'total':
+            current = value + (current if counted else 0)
+        elif aggregation == 'latest':
+            if last_date is None or record_date >= last_date:
+                current = value
+        elif not counted or is_better(goal['metric_type'], value, current, directions):
+            current = value
+
+        counted = True
+        last_date = record_date if last_date is None else max(last_date, record_date)
+
+    return current, last_date
+
+
+def goal_reached(goal, value, directions):
+    """A lower-is-better metric goal is reached at or below target, everything else at or above"""
+    if directions.get(goal['metric_type']) == 'lower' and goal['metric_aggregation'] != 'total':
+        return value <= goal['target_value']
+    return value >= goal['target_value']
+
+
+def apply_goal_progress(cursor, athlete_id, records, directions=None):
+    """
+    Advance the athlete's active goals linked to the metrics of new
+    (date, metric_type, value) records, inside the caller's transaction; only
+    RECORD_METRICS drive goals. Goals that reach their target are completed
+    and the coach is notified, as when the athlete completes a goal by hand.
+
+    Returns the goal ids that were completed.
+    """
+    directions = record_metrics() if directions is None else directions
+
+    by_metric = records_by_metric(records, directions)
+    if not by_metric:
+        return []
+
+    metric_types = list(by_metric)
+
+    # Served by idx_goals_athlete_metric_status: only active goals on these metrics are read
+    cursor.execute(f"""
+        SELECT goal_id, goal_type, metric_type, metric_aggregation, target_value,
+               current_value, last_metric_date, created_date
+        FROM goals
+        WHERE athlete_id = %s AND status = 'active'
+          AND metric_type IN ({', '.join(['%s'] * len(metric_types))})
+        FOR UPDATE
+    """, (athlete_id, *metric_types))
+    goals = cursor.fetchall()
+
+    updates = []
+    completed = []
+    for goal in goals:
+        current, last_date = advance_goal(goal, by_metric[goal['metric_type']], directions)
+        if last_date == goal['last_metric_date'] and current == goal['current_value']:
+            continue
+
+        status = 'completed' if goal_reached(goal, current, directions) else 'active'
+        updates.append((current, last_date, status, goal['goal_id']))
+        if status == 'completed':
+            completed.append(goal)
+
+    if updates:
+        cursor.executemany("""
+            UPDATE goals
+            SET current_value = %s, last_metric_date = %s, status = %s
+            WHERE goal_id = %s
+        """, updates)
+
+    if completed:
+        _notify_completed(cursor, athlete_id, completed)
+
+    return [goal['goal_id'] for goal in completed]
+
+
+def _notify_completed(cursor, athlete_id, goals):
+    cursor.execute("""
+        SELECT u.full_name, c.user_id AS coach_user_id
+        FROM athletes a
+        JOIN users u ON a.user_id = u.user_id
+        LEFT JOIN coaches c ON a.coach_id = c.coach_id
+        WHERE a.athlete_id = %s
+    """, (athlete_id,))
+    athlete = cursor.fetchone()
+    if not athlete or not athlete['coach_user_id']:
+        return
+
+    cursor.executemany("""
+        INSERT INTO notifications (user_id, notification_type, title, message, related_id)
+        VALUES (%s, %s, %s, %s, %s)
+    """, [
+        (athlete['coach_user_id'], 'goal', ' Goal Completed!',
+         f'{athlete["full_name"] or "An athlete"} completed their {goal["goal_type"]} goal!', goal['goal_id'])
+        for goal in goals
+    ])
@@ -0,0 +1,165 @@
+import threading
+import time
+from collections import OrderedDict
+
+IDENTITY_CACHE_SIZE = 10000
+
+# Other workers update profiles too; cached identities are re-read after this long
+IDENTITY_TTL_SECONDS = 300
+
+IDENTITY_SELECT = """
+    SELECT u.user_id, u.full_name, u.user_type,
+           a.athlete_id, a.coach_id AS athlete_coach_id, ac.user_id AS coach_user_id,
+           c.coach_id
+    FROM users u
+    LEFT JOIN athletes a ON a.user_id = u.user_id
+    LEFT JOIN coaches ac ON ac.coach_id = a.coach_id
+    LEFT JOIN coaches c ON c.user_id = u.user_id
+"""
+
+
+class Identities:
+    """Result of one resolve_identities() call, looked up by whichever id the caller holds"""
+
+    def __init__(self, records):
+        self._by_user = {record['user_id']: record for record in records}
+        self._by_athlete = {r['athlete_id']: r for r in records if r.get('athlete_id')}
+        self._by_coach = {r['coach_id']: r for r in records if r.get('coach_id')}
+
+    def user(self, user_id):
+        return self._by_user.get(_as_int(user_id))
+
+    def athlete(self, athlete_id):
+        return self._by_athlete.get(_as_int(athlete_id))
+
+    def coach(self, coach_id):
+        return self._by_coach.get(_as_int(coach_id))
+
+    def name(self, record, default):
+        return record['full_name'] if record and record.get('full_name') else default
+
+
+def _as_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class IdentityCache:
+    """
+    In-process LRU of user identities keyed by user_id, with athlete_id and
+    coach_id pointing at the same entries.
+    """
+
+    def __init__(self, max_size=IDENTITY_CACHE_SIZE):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._athletes = {}
+        self._coaches = {}
+        self.max_size = max_size
+
+    def _drop(self, user_id):
+        entry = self._entries.pop(user_id, None)
+        if entry:
+            record = entry[1]
+            self._athletes.pop(record.get('athlete_id'), None)
+            self._coaches.pop(record.get('coach_id'), None)
+
+    def _get(self, user_id, now):
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        if now - entry[0] > IDENTITY_TTL_SECONDS:
+            self._drop(user_id)
+            return None
+        self._entries.move_to_end(user_id)
+        return entry[1]
+
+    def get_many(self, user_ids=(), athlete_ids=(), coach_ids=()):
+        """Return (hits, missing user_ids, missing athlete_ids, missing coach_ids)"""
+        now = time.monotonic()
+        hits = []
+        missing = ([], [], [])
+
+        with self._lock:
+            for ids, index, slot in ((user_ids, None, 0), (athlete_ids, self._athletes, 1), (coach_ids, self._coaches, 2)):
+                for key in ids:
+                    user_id = key if index is None else index.get(key)
+                    record = self._get(user_id, now) if user_id is not None else None
+                    if record is None:
+                        missing[slot].append(key)
+                    else:
+                        hits.append(record)
+
+        return (hits,) + missing
+
+    def put_many(self, records):
+        now = time.monotonic()
+        with self._lock:
+            for record in records:
+                self._drop(record['user_id'])
+                self._entries[record['user_id']] = (now, record)
+                if record.get('athlete_id'):
+                    self._athletes[record['athlete_id']] = record['user_id']
+                if record.get('coach_id'):
+                    self._coaches[record['coach_id']] = record['user_id']
+            while len(self._entries) > self.max_size:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate(self, user_ids=(), athlete_ids=(), coach_ids=()):
+        with self._lock:
+            targets = set(user_ids)
+            targets.update(self._athletes.get(athlete_id) for athlete_id in athlete_ids)
+            targets.update(self._coaches.get(coach_id) for coach_id in coach_ids)
+            for user_id in targets:
+                if user_id is not None:
+                    self._drop(user_id)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._athletes.clear()
+            self._coaches.clear()
+
+
+identity_cache = IdentityCache()
+
+
+def _ids(values):
+    return {value for value in (_as_int(v) for v in values or ()) if value is not None}
+
+
+def resolve_identities(mysql, user_ids=(), athlete_ids=(), coach_ids=()):
+    """
+    Resolve any mix of user, athlete and coach ids to identity records
+    (user_id, full_name, user_type, athlete_id, coach_id, plus an athlete's
+    current coach as athlete_coach_id/coach_user_id). Cache misses are read
+    with a single batched query.
+    """
+    user_ids, athlete_ids, coach_ids = _ids(user_ids), _ids(athlete_ids), _ids(coach_ids)
+    hits, missing_users, missing_athletes, missing_coaches = identity_cache.get_many(
+        user_ids, athlete_ids, coach_ids
+    )
+
+    parts, params = [], []
+    for column, ids in (('u.user_id', missing_users), ('a.athlete_id', missing_athletes), ('c.coach_id', missing_coaches)):
+        if ids:
+            parts.append(IDENTITY_SELECT + f" WHERE {column} IN ({', '.join(['%s'] * len(ids))})")
+            params.extend(ids)
+
+    if parts:
+        cursor = mysql.connection.cursor()
+        cursor.execute(" UNION ".join(parts), tuple(params))
+        loaded = list(cursor.fetchall())
+        cursor.close()
+
+        identity_cache.put_many(loaded)
+        hits.extend(loaded)
+
+    return Identities(hits)
+
+
+def invalidate_identities(user_ids=(), athlete_ids=(), coach_ids=()):
+    """Forget cached identities after a profile or roster change"""
+    identity_cache.invalidate(_ids(user_ids), _ids(athlete_ids), _ids(coach_ids))
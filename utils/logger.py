@@ -26,4 +26,21 @@ def log_exception(func):
         except Exception as e:
             logger.error(f"Exception in {func.__name__}: {str(e)}\nTraceback:\n{traceback.format_exc()}")
             raise
-    return wrapper
\ No newline at end of file
+    return wrapper
+def log_and_recover(recover):
+    """
+    Decorator for refreshing derived data (indexes, caches, stored documents)
+    after the request's write has been committed. An error is logged and
+    recover(*args, **kwargs) lets the derived data rebuild itself later,
+    instead of failing a request whose data is already stored.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                logger.error(f"Exception in {func.__name__}: {str(e)}\nTraceback:\n{traceback.format_exc()}")
+                recover(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -16,4 +16,25 @@ def create_notification(mysql, user_id, notification_type, title, message, relat
         VALUES (%s, %s, %s, %s, %s)
     """, (user_id, notification_type, title, message, related_id))
     mysql.connection.commit()
+    cursor.close()
+
+def create_notifications(mysql, notifications, commit=True):
+    """
+    Helper function to create many notifications with one multi-row insert
+    
+    Args:
+        mysql: MySQL connection object
+        notifications: List of (user_id, notification_type, title, message, related_id) tuples
+        commit: Set to False to keep the rows inside the caller's transaction
+    """
+    if not notifications:
+        return
+    
+    cursor = mysql.connection.cursor()
+    cursor.executemany("""
+        INSERT INTO notifications (user_id, notification_type, title, message, related_id)
+        VALUES (%s, %s, %s, %s, %s)
+    """, notifications)
+    if commit:
+        mysql.connection.commit()
     cursor.close()
\ No newline at end of file
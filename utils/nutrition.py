@@ -0,0 +1,110 @@
+ACTIVITY_MULTIPLIERS = {
+    'sedentary': 1.2,
+    'light': 1.375,
+    'moderate': 1.55,
+    'active': 1.725,
+    'very_active': 1.9,
+}
+
+DEFAULT_ACTIVITY_LEVEL = 'moderate'
+
+# Macro targets: protein per kg of body weight, fats as a share of daily calories,
+# carbohydrates fill the remainder
+PROTEIN_GRAMS_PER_KG = 1.6
+FAT_CALORIE_SHARE = 0.25
+
+
+def bmi_category(bmi):
+    if bmi is None:
+        return None
+    if bmi < 18.5:
+        return 'Underweight'
+    if bmi < 25:
+        return 'Normal'
+    if bmi < 30:
+        return 'Overweight'
+    return 'Obese'
+
+
+def _to_float(value):
+    if value is None or value == '':
+        return None
+    return float(value)
+
+
+def calculate_roster_nutrition(athletes, activity_level=DEFAULT_ACTIVITY_LEVEL):
+    """
+    Compute BMI, BMR, daily calories and macros for many athletes in one pass.
+
+    athletes is a list of dicts with height (cm), weight (kg) and age. The
+    inputs are split into columns once and every derived value is computed
+    column-wise, so a whole roster costs a handful of list passes instead of
+    one call chain per athlete. Missing inputs propagate as None.
+    """
+    if activity_level not in ACTIVITY_MULTIPLIERS:
+        raise ValueError(f'Unknown activity level: {activity_level}')
+
+    multiplier = ACTIVITY_MULTIPLIERS[activity_level]
+
+    heights = [_to_float(a.get('height')) for a in athletes]
+    weights = [_to_float(a.get('weight')) for a in athletes]
+    ages = [_to_float(a.get('age')) for a in athletes]
+
+    bmis = [
+        round(w / ((h / 100) ** 2), 2) if h and w else None
+        for h, w in zip(heights, weights)
+    ]
+    bmrs = [
+        (10 * w) + (6.25 * h) - (5 * age) + 5 if h and w and age is not None else None
+        for h, w, age in zip(heights, weights, ages)
+    ]
+    calories = [round(bmr * multiplier) if bmr is not None else None for bmr in bmrs]
+    proteins = [
+        round(w * PROTEIN_GRAMS_PER_KG) if kcal is not None else None
+        for w, kcal in zip(weights, calories)
+    ]
+    fats = [round(kcal * FAT_CALORIE_SHARE / 9) if kcal is not None else None for kcal in calories]
+    carbs = [
+        max(round((kcal - protein * 4 - fat * 9) / 4), 0) if kcal is not None else None
+        for kcal, protein, fat in zip(calories, proteins, fats)
+    ]
+
+    return [
+        {
+            'bmi': bmi,
+            'bmi_category': bmi_category(bmi),
+            'bmr': round(bmr) if bmr is not None else None,
+            'daily_calories': kcal,
+            'protein_grams': protein,
+            'carbs_grams': carb,
+            'fats_grams': fat,
+            'activity_level': activity_level
+        }
+        for bmi, bmr, kcal, protein, carb, fat in zip(bmis, bmrs, calories, proteins, carbs, fats)
+    ]
+
+
+def calculate_nutrition(height, weight, age=None, activity_level=DEFAULT_ACTIVITY_LEVEL):
+    """Compute nutrition targets for a single athlete"""
+    return calculate_roster_nutrition(
+        [{'height': height, 'weight': weight, 'age': age}],
+        activity_level
+    )[0]
+
+
+MACRO_FIELDS = ('calories', 'protein', 'carbs', 'fats')
+
+
+def meal_item_macros(meal, recipe=None):
+    """
+    Resolve the macros of one meal-plan item. Items that reference a recipe
+    take the recipe's values scaled by servings; custom items use their own.
+    """
+    servings = _to_float(meal.get('servings')) or 1
+    source = recipe if recipe else meal
+    return {field: round((_to_float(source.get(field)) or 0) * servings, 2) for field in MACRO_FIELDS}
+
+
+def sum_macros(items):
+    """Total the macro fields over a list of items (or of per-day totals)"""
+    return {field: round(sum(item[field] for item in items), 2) for field in MACRO_FIELDS}
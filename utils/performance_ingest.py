@@ -0,0 +1,299 @@
+import csv
+import json
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+from utils.goal_progress import apply_goal_progress
+from utils.personal_records import apply_personal_records
+
+# Rows per multi-row INSERT (and per commit)
+INGEST_BATCH_SIZE = 1000
+
+# Per-row errors returned in the response; the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+INGEST_FORMATS = ('csv', 'jsonl')
+
+CSV_CONTENT_TYPES = ('text/csv', 'application/csv')
+JSONL_CONTENT_TYPES = ('application/x-ndjson', 'application/jsonl', 'application/x-jsonlines')
+
+# performance_tracking.metric_value is DECIMAL(10,2)
+MAX_METRIC_VALUE = Decimal('99999999.99')
+
+INGEST_INSERT = """
+    INSERT INTO performance_tracking
+    (athlete_id, date, metric_type, metric_value, unit, notes, recorded_by, dedupe_key)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE performance_id = performance_id
+"""
+
+
+class MalformedUploadError(Exception):
+    """The upload stream cannot be parsed past line_number"""
+
+    def __init__(self, line_number, message):
+        super().__init__(message)
+        self.line_number = line_number
+
+
+def detect_format(content_type, requested=None):
+    """Pick csv or jsonl from an explicit format parameter or the Content-Type"""
+    if requested:
+        if requested not in INGEST_FORMATS:
+            raise ValueError(f'format must be one of {", ".join(INGEST_FORMATS)}')
+        return requested
+
+    mimetype = (content_type or '').split(';')[0].strip().lower()
+    if mimetype in CSV_CONTENT_TYPES:
+        return 'csv'
+    if mimetype in JSONL_CONTENT_TYPES:
+        return 'jsonl'
+    raise ValueError('Send text/csv or application/x-ndjson, or pass format=csv|jsonl')
+
+
+def iter_text_lines(stream):
+    """Decode a binary request stream line by line without reading it whole"""
+    first = True
+    for raw in stream:
+        line = raw.decode('utf-8', errors='replace')
+        if first:
+            line = line.lstrip('\ufeff')
+            first = False
+        yield line
+
+
+def iter_records(lines, fmt):
+    """
+    Yield (line number, record dict or None, parse error or None) for every
+    data line. CSV input needs a header row naming the columns; CSV that the
+    reader cannot continue past raises MalformedUploadError.
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(lines)
+        try:
+            for record in reader:
+                if None in record:
+                    yield reader.line_num, None, 'Too many columns'
+                else:
+                    yield reader.line_num, record, None
+        except csv.Error as e:
+            # line_num still counts the lines of the last complete row
+            raise MalformedUploadError(reader.line_num + 1, f'Malformed CSV: {e}') from e
+        return
+
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield line_number, None, 'Invalid JSON'
+            continue
+        if not isinstance(record, dict):
+            yield line_number, None, 'Each line must be a JSON object'
+        else:
+            yield line_number, record, None
+
+
+def _text(record, field, max_length, required=True):
+    value = record.get(field)
+    value = '' if value is None else str(value).strip()
+    if required and not value:
+        raise ValueError(f'{field} is required')
+    if len(value) > max_length:
+        raise ValueError(f'{field} is longer than {max_length} characters')
+    return value
+
+
+def validate_record(record, athlete_id, recorded_by=None):
+    """
+    Turn one uploaded record into an INSERT parameter tuple for athlete_id.
+    Raises ValueError with a client-facing message for invalid rows.
+    """
+    if record.get('athlete_id') not in (None, '') and str(record['athlete_id']) != str(athlete_id):
+        raise ValueError('athlete_id does not match the upload')
+
+    try:
+        record_date = date.fromisoformat(str(record.get('date') or '').strip())
+    except ValueError:
+        raise ValueError('date must be YYYY-MM-DD')
+
+    try:
+        metric_value = Decimal(str(record.get('metric_value')).strip())
+    except (InvalidOperation, ValueError):
+        raise ValueError('metric_value must be a number')
+    if not metric_value.is_finite() or abs(metric_value) > MAX_METRIC_VALUE:
+        raise ValueError('metric_value is out of range')
+
+    dedupe_key = _text(record, 'dedupe_key', 64, required=False) or None
+
+    return (
+        athlete_id,
+        record_date,
+        _text(record, 'metric_type', 100),
+        metric_value.quantize(Decimal('0.01')),
+        _text(record, 'unit', 50),
+        _text(record, 'notes', 65535, required=False),
+        recorded_by,
+        dedupe_key,
+    )
+
+
+def new_rows(cursor, rows):
+    """
+    The INGEST_INSERT parameter rows that will actually be stored: rows whose
+    dedupe_key the athlete already has (or that repeat a key earlier in the
+    same batch) are dropped, so goal totals do not count a re-upload twice.
+    """
+    keys = {row[7] for row in rows if row[7]}
+    existing = set()
+    if keys:
+        cursor.execute(f"""
+            SELECT dedupe_key FROM performance_tracking
+            WHERE athlete_id = %s AND dedupe_key IN ({', '.join(['%s'] * len(keys))})
+        """, (rows[0][0], *keys))
+        existing = {row['dedupe_key'] for row in cursor.fetchall()}
+
+    fresh = []
+    for row in rows:
+        if row[7]:
+            if row[7] in existing:
+                continue
+            existing.add(row[7])
+        fresh.append(row)
+    return fresh
+
+
+def apply_new_records(cursor, athlete_id, rows):
+    """Fold stored INGEST_INSERT rows into personal records and metric-linked goals"""
+    records = [(row[1], row[2], row[3]) for row in rows]
+    beaten = apply_personal_records(cursor, athlete_id, records)
+    completed_goals = apply_goal_progress(cursor, athlete_id, records)
+    return beaten, completed_goals
+
+
+class IngestReport:
+    """Running totals of one upload"""
+
+    def __init__(self):
+        self.received = 0
+        self.inserted = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.batches = 0
+        self.errors = []
+        self.personal_records = {}
+        self.completed_goals = []
+        self.aborted = None
+
+    def reject(self, line_number, message):
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line_number, 'error': message})
+
+    def to_dict(self):
+        return {
+            'received': self.received,
+            'inserted': self.inserted,
+            'duplicates': self.duplicates,
+            'rejected': self.rejected,
+            'batches': self.batches,
+            'errors': self.errors,
+            'errors_truncated': self.rejected > len(self.errors),
+            'personal_records': list(self.personal_records.values()),
+            'completed_goals': self.completed_goals,
+            'aborted': self.aborted,
+        }
+
+    def abort(self, line_number, message):
+        # Rows before line_number were still ingested; nothing after it was read
+        self.aborted = {'line': line_number, 'error': message}
+
+    def add_personal_records(self, beaten):
+        # A later batch that beats the same metric again replaces the earlier entry
+        for record in beaten:
+            self.personal_records[record['metric_type']] = record
+
+
+def _flush(mysql, cursor, batch, report):
+    """
+    Insert one batch with a single multi-row statement, fold the new rows into
+    the athlete's personal records and metric-linked goals, and commit it all
+    together. If the database
+    rejects the batch, retry its rows one by one so a single bad row does not
+    cost the whole batch.
+    """
+    report.batches += 1
+    rows = [params for _, params in batch]
+
+    try:
+        fresh = new_rows(cursor, rows)
+        cursor.executemany(INGEST_INSERT, rows)
+        # Rows whose dedupe key already exists are left untouched and count 0
+        inserted = cursor.rowcount
+        beaten, completed_goals = apply_new_records(cursor, rows[0][0], fresh)
+        mysql.connection.commit()
+        report.inserted += inserted
+        report.duplicates += len(rows) - inserted
+        report.add_personal_records(beaten)
+        report.completed_goals.extend(completed_goals)
+        return
+    except Exception:
+        mysql.connection.rollback()
+
+    for line_number, params in batch:
+        try:
+            cursor.execute(INGEST_INSERT, params)
+            inserted = cursor.rowcount
+            beaten, completed_goals = apply_new_records(cursor, params[0], [params] if inserted else [])
+            mysql.connection.commit()
+        except Exception as e:
+            mysql.connection.rollback()
+            report.reject(line_number, str(e))
+            continue
+        if inserted:
+            report.inserted += 1
+        else:
+            report.duplicates += 1
+        report.add_personal_records(beaten)
+        report.completed_goals.extend(completed_goals)
+
+
+def ingest_performance(mysql, records, athlete_id, recorded_by=None, batch_size=INGEST_BATCH_SIZE):
+    """
+    Validate and insert (line number, record, parse error) tuples from
+    iter_records() as they arrive. Each batch is committed on its own, so an
+    interrupted upload can be sent again; rows with a dedupe_key that was
+    already stored for the athlete are counted as duplicates, not inserted.
+
+    A stream that cannot be parsed any further stops the upload: the rows read
+    before it are still inserted and the report's `aborted` names the line.
+    """
+    report = IngestReport()
+    batch = []
+    cursor = mysql.connection.cursor()
+
+    try:
+        try:
+            for line_number, record, error in records:
+                report.received += 1
+                if error is None:
+                    try:
+                        batch.append((line_number, validate_record(record, athlete_id, recorded_by)))
+                    except ValueError as e:
+                        error = str(e)
+                if error is not None:
+                    report.reject(line_number, error)
+
+                if len(batch) >= batch_size:
+                    _flush(mysql, cursor, batch, report)
+                    batch = []
+        except MalformedUploadError as e:
+            report.abort(e.line_number, str(e))
+
+        if batch:
+            _flush(mysql, cursor, batch, report)
+    finally:
+        cursor.close()
+
+    return report
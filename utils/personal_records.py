@@ -0,0 +1,221 @@
+from flask import current_app
+
+# Metrics that have personal records and drive metric-linked goals, with the
+# direction that counts as better. Anything else (heart rate, calories,
+# imported activity durations) is stored but never called a "best".
+# Override with RECORD_METRICS in the app config.
+RECORD_METRICS = {
+    'Distance': 'higher',
+    'Time': 'lower',
+    'Pace': 'lower',
+    'Speed': 'higher',
+    'Weight Lifted': 'higher',
+    'Repetitions': 'higher',
+}
+
+
+def record_metrics():
+    return dict(current_app.config.get('RECORD_METRICS', RECORD_METRICS))
+
+
+def is_better(metric_type, value, best, directions):
+    if best is None:
+        return True
+    return value < best if directions.get(metric_type) == 'lower' else value > best
+
+
+def records_by_metric(records, directions):
+    """(date, value) lists per record metric from (date, metric_type, value) tuples"""
+    by_metric = {}
+    for record_date, metric_type, value in records:
+        if metric_type in directions:
+            by_metric.setdefault(metric_type, []).append((record_date, value))
+    return by_metric
+
+
+def fold_record(metric_type, state, record_date, value, directions):
+    """
+    Advance a (best_value, best_date, previous_value, previous_date) state by
+    one record, replaying history in date order: previous is the best value
+    from days before the current best was set. Records must not be dated
+    before the state's best_date; ties keep the earlier record.
+    """
+    if state is None:
+        return value, record_date, None, None
+
+    best, best_date, previous, previous_date = state
+    if not is_better(metric_type, value, best, directions):
+        return state
+    if record_date == best_date:
+        # Beaten again on the same day; the best from earlier days stays the previous one
+        return value, record_date, previous, previous_date
+    return value, record_date, best, best_date
+
+
+def replay_records(metric_type, records, directions, state=None):
+    """Fold (date, value) records in date order into a personal record state"""
+    for record_date, value in sorted(records, key=lambda record: record[0]):
+        state = fold_record(metric_type, state, record_date, value, directions)
+    return state
+
+
+def apply_personal_records(cursor, athlete_id, records, directions=None):
+    """
+    Fold new (date, metric_type, value) records for one athlete into
+    personal_records inside the caller's transaction, and queue a notification
+    for the athlete and their coach for every record that was beaten. The
+    records must already be inserted into performance_tracking.
+
+    Records dated on or after a metric's best_date are folded into the stored
+    state directly. A backdated record can change what came before the best,
+    so that metric is replayed from the athlete's history instead; either way
+    the result is what `flask rebuild-personal-records` stores.
+
+    Returns a list of {metric_type, value, date, previous_value, previous_date}
+    for the beaten records. A metric's first record sets its PR silently.
+    """
+    directions = record_metrics() if directions is None else directions
+
+    by_metric = records_by_metric(records, directions)
+    if not by_metric:
+        return []
+
+    metric_types = list(by_metric)
+    cursor.execute(f"""
+        SELECT metric_type, best_value, best_date, previous_value, previous_date
+        FROM personal_records
+        WHERE athlete_id = %s AND metric_type IN ({', '.join(['%s'] * len(metric_types))})
+        FOR UPDATE
+    """, (athlete_id, *metric_types))
+    current = {
+        row['metric_type']: (row['best_value'], row['best_date'], row['previous_value'], row['previous_date'])
+        for row in cursor.fetchall()
+    }
+
+    upserts = []
+    beaten = []
+    for metric_type, new_records in by_metric.items():
+        existing = current.get(metric_type)
+        if existing is not None and min(record_date for record_date, _ in new_records) < existing[1]:
+            updated = replay_records(metric_type, _metric_history(cursor, athlete_id, metric_type), directions)
+        else:
+            updated = replay_records(metric_type, new_records, directions, existing)
+
+        if updated == existing:
+            continue
+        upserts.append((athlete_id, metric_type, *updated))
+
+        if existing is not None and is_better(metric_type, updated[0], existing[0], directions):
+            beaten.append({
+                'metric_type': metric_type,
+                'value': updated[0],
+                'date': updated[1],
+                'previous_value': updated[2],
+                'previous_date': updated[3],
+            })
+
+    if upserts:
+        cursor.executemany("""
+            INSERT INTO personal_records
+            (athlete_id, metric_type, best_value, best_date, previous_value, previous_date)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE best_value = VALUES(best_value), best_date = VALUES(best_date),
+                                    previous_value = VALUES(previous_value), previous_date = VALUES(previous_date)
+        """, upserts)
+
+    if beaten:
+        _notify_beaten(cursor, athlete_id, beaten)
+
+    return beaten
+
+
+def _metric_history(cursor, athlete_id, metric_type):
+    # Answered from idx_performance_athlete_metric_date alone
+    cursor.execute("""
+        SELECT date, metric_value
+        FROM performance_tracking
+        WHERE athlete_id = %s AND metric_type = %s
+        ORDER BY date, performance_id
+    """, (athlete_id, metric_type))
+    return [(row['date'], row['metric_value']) for row in cursor.fetchall()]
+
+
+def _notify_beaten(cursor, athlete_id, beaten):
+    cursor.execute("""
+        SELECT a.user_id, u.full_name, c.user_id AS coach_user_id
+        FROM athletes a
+        JOIN users u ON a.user_id = u.user_id
+        LEFT JOIN coaches c ON a.coach_id = c.coach_id
+        WHERE a.athlete_id = %s
+    """, (athlete_id,))
+    athlete = cursor.fetchone()
+    if not athlete:
+        return
+
+    notifications = []
+    for record in beaten:
+        notifications.append((
+            athlete['user_id'], 'goal', ' New Personal Record!',
+            f'New {record["metric_type"]} best: {record["value"]} (previous {record["previous_value"]})',
+            athlete_id
+        ))
+        if athlete['coach_user_id']:
+            notifications.append((
+                athlete['coach_user_id'], 'goal', ' Athlete Personal Record',
+                f'{athlete["full_name"] or "An athlete"} set a new {record["metric_type"]} best: {record["value"]}',
+                athlete_id
+            ))
+
+    cursor.executemany("""
+        INSERT INTO notifications (user_id, notification_type, title, message, related_id)
+        VALUES (%s, %s, %s, %s, %s)
+    """, notifications)
+
+
+def rebuild_personal_records(mysql):
+    """
+    Recompute personal_records from the whole performance history by replaying
+    every record in date order with fold_record(), the same definition the
+    live path uses. Returns the number of records stored.
+    """
+    from MySQLdb.cursors import SSDictCursor
+
+    directions = record_metrics()
+    records = {}
+    if not directions:
+        return _store_rebuilt_records(mysql, records)
+
+    # Stream the history; only one (best, previous) pair per athlete and metric is kept
+    reader = mysql.connection.cursor(SSDictCursor)
+    try:
+        reader.execute(f"""
+            SELECT athlete_id, metric_type, date, metric_value
+            FROM performance_tracking
+            WHERE metric_type IN ({', '.join(['%s'] * len(directions))})
+            ORDER BY athlete_id, metric_type, date, performance_id
+        """, tuple(directions))
+        for row in reader:
+            key = (row['athlete_id'], row['metric_type'])
+            records[key] = fold_record(row['metric_type'], records.get(key), row['date'], row['metric_value'], directions)
+    finally:
+        reader.close()
+
+    return _store_rebuilt_records(mysql, records)
+
+
+def _store_rebuilt_records(mysql, records):
+    cursor = mysql.connection.cursor()
+    try:
+        cursor.execute("DELETE FROM personal_records")
+        cursor.executemany("""
+            INSERT INTO personal_records
+            (athlete_id, metric_type, best_value, best_date, previous_value, previous_date)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, [(athlete_id, metric_type, *values) for (athlete_id, metric_type), values in records.items()])
+        mysql.connection.commit()
+        return len(records)
+    except Exception:
+        mysql.connection.rollback()
+        raise
+    finally:
+        cursor.close()
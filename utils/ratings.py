@@ -0,0 +1,114 @@
+RATING_VALUES = (1, 2, 3, 4, 5)
+HISTOGRAM_COLUMNS = tuple(f'rating_{value}' for value in RATING_VALUES)
+
+AGGREGATE_COLUMNS = "ra.rating_count, ra.rating_sum, " + ", ".join(f"ra.{column}" for column in HISTOGRAM_COLUMNS)
+
+
+def parse_rating(value):
+    """Return the rating as an int in 1..5, None when absent; raise ValueError otherwise"""
+    if value is None or value == '':
+        return None
+    rating = int(value)
+    if rating not in RATING_VALUES:
+        raise ValueError('Rating must be between 1 and 5')
+    return rating
+
+
+def apply_rating(cursor, user_id, rating, delta=1):
+    """
+    Add (delta=1) or remove (delta=-1) one rating from a user's stored
+    aggregate, inside the caller's transaction. Athletes are rated by their
+    coach's feedback (performance_rating), coaches by athletes' coach reviews.
+
+    Args:
+        cursor: Cursor on the connection that writes the feedback or review row
+        user_id: The rated user
+        rating: Parsed rating (1..5); nothing is recorded for None
+        delta: +1 when the rating is added, -1 when it is removed
+    """
+    if rating is None:
+        return
+
+    histogram_column = f'rating_{rating}'
+    cursor.execute(f"""
+        INSERT INTO rating_aggregates (user_id, rating_count, rating_sum, {histogram_column})
+        VALUES (%s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            rating_count = rating_count + VALUES(rating_count),
+            rating_sum = rating_sum + VALUES(rating_sum),
+            {histogram_column} = {histogram_column} + VALUES({histogram_column})
+    """, (user_id, delta, rating * delta, delta))
+
+
+def sync_coach_rating(cursor, coach_user_id):
+    """Copy a coach's aggregate into the denormalized coaches.rating / total_reviews"""
+    cursor.execute("""
+        UPDATE coaches c
+        LEFT JOIN rating_aggregates ra ON ra.user_id = c.user_id
+        SET c.rating = IF(ra.rating_count > 0, ra.rating_sum / ra.rating_count, 0),
+            c.total_reviews = COALESCE(ra.rating_count, 0)
+        WHERE c.user_id = %s
+    """, (coach_user_id,))
+
+
+def format_aggregate(row):
+    """Shape a row carrying AGGREGATE_COLUMNS into the API's rating summary"""
+    row = row or {}
+    count = int(row.get('rating_count') or 0)
+    total = int(row.get('rating_sum') or 0)
+    return {
+        'count': count,
+        'sum': total,
+        'average': round(total / count, 2) if count else 0.0,
+        'histogram': {str(value): int(row.get(f'rating_{value}') or 0) for value in RATING_VALUES},
+    }
+
+
+def fetch_rating_aggregate(cursor, user_id):
+    cursor.execute(f"""
+        SELECT {AGGREGATE_COLUMNS}
+        FROM rating_aggregates ra
+        WHERE ra.user_id = %s
+    """, (user_id,))
+    return format_aggregate(cursor.fetchone())
+
+
+def reconcile_rating_aggregates(mysql):
+    """
+    Recompute every aggregate from feedback (athletes) and coach_reviews
+    (coaches), refresh coaches.rating / total_reviews and repair drift.
+
+    Returns the number of users whose stored aggregate was rebuilt.
+    """
+    histogram_sums = ", ".join(f"SUM(rating = {value})" for value in RATING_VALUES)
+
+    cursor = mysql.connection.cursor()
+    try:
+        cursor.execute("DELETE FROM rating_aggregates")
+        cursor.execute(f"""
+            INSERT INTO rating_aggregates (user_id, rating_count, rating_sum, {', '.join(HISTOGRAM_COLUMNS)})
+            SELECT user_id, COUNT(*), SUM(rating), {histogram_sums}
+            FROM (
+                SELECT athlete_id AS user_id, performance_rating AS rating FROM feedback
+                WHERE performance_rating IS NOT NULL
+                UNION ALL
+                SELECT c.user_id, cr.rating FROM coach_reviews cr
+                JOIN coaches c ON c.coach_id = cr.coach_id
+            ) rated
+            GROUP BY user_id
+        """)
+        rebuilt = cursor.rowcount
+
+        cursor.execute("""
+            UPDATE coaches c
+            LEFT JOIN rating_aggregates ra ON ra.user_id = c.user_id
+            SET c.rating = IF(ra.rating_count > 0, ra.rating_sum / ra.rating_count, 0),
+                c.total_reviews = COALESCE(ra.rating_count, 0)
+        """)
+        mysql.connection.commit()
+        return rebuilt
+    except Exception:
+        mysql.connection.rollback()
+        raise
+    finally:
+        cursor.close()
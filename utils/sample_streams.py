@@ -0,0 +1,172 @@
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+
+from utils.timeseries import largest_triangle_three_buckets
+
+STREAM_ENCODING_VERSION = 1
+
+# channel: (unit, scale). Values are stored as round(value * scale) integers.
+SAMPLE_CHANNELS = {
+    'heart_rate': ('bpm', 1),
+    'speed': ('m/s', 100),
+    'elevation': ('m', 10),
+    'distance': ('m', 1),
+}
+
+DEFAULT_STREAM_POINTS = 500
+MAX_STREAM_POINTS = 5000
+
+
+def _write_varint(out, value):
+    # Zigzag so small negative deltas stay small, then 7 bits per byte
+    value = (value << 1) ^ (value >> 63)
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varints(data):
+    value = shift = 0
+    for byte in data:
+        value |= (byte & 0x7f) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        yield (value >> 1) ^ -(value & 1)
+        value = shift = 0
+
+
+def encode_stream(offsets, values, scale):
+    """
+    Pack one channel into a blob: sample count, then delta-encoded second
+    offsets, then delta-encoded quantized values, all as zigzag varints,
+    compressed with zlib.
+    """
+    out = bytearray()
+    _write_varint(out, len(offsets))
+
+    previous = 0
+    for offset in offsets:
+        _write_varint(out, offset - previous)
+        previous = offset
+
+    previous = 0
+    for value in values:
+        quantized = int(round(value * scale))
+        _write_varint(out, quantized - previous)
+        previous = quantized
+
+    return bytes([STREAM_ENCODING_VERSION]) + zlib.compress(bytes(out), 9)
+
+
+def decode_stream(blob, scale):
+    """Inverse of encode_stream: (offsets array, values array)"""
+    if not blob or blob[0] != STREAM_ENCODING_VERSION:
+        raise ValueError('Unknown sample stream encoding')
+
+    numbers = _read_varints(zlib.decompress(blob[1:]))
+    count = next(numbers, 0)
+
+    offsets = array('l')
+    running = 0
+    for _ in range(count):
+        running += next(numbers)
+        offsets.append(running)
+
+    values = array('d')
+    running = 0
+    for _ in range(count):
+        running += next(numbers)
+        values.append(running / scale)
+
+    return offsets, values
+
+
+def stream_window(offsets, values, start=None, end=None, max_points=None):
+    """
+    Samples between start and end seconds (inclusive), as [offset, value]
+    pairs, downsampled with LTTB when there are more than max_points.
+    """
+    lo = bisect_left(offsets, start) if start is not None else 0
+    hi = bisect_right(offsets, end) if end is not None else len(offsets)
+    points = list(zip(offsets[lo:hi], values[lo:hi]))
+
+    if max_points:
+        points = largest_triangle_three_buckets(points, max_points)
+
+    return [[offset, value] for offset, value in points]
+
+
+class SampleRecorder:
+    """
+    Collects per-second channels from activity track points alongside the
+    activity summary, in the same single pass over the file.
+    """
+
+    def __init__(self):
+        self.started_at = None
+        self.channels = {channel: (array('l'), array('d')) for channel in SAMPLE_CHANNELS}
+        self._previous = None
+
+    def _append(self, channel, offset, value):
+        offsets, values = self.channels[channel]
+        offsets.append(offset)
+        values.append(value)
+
+    def add(self, point, distance_m):
+        """Record one point; distance_m is the cumulative distance at that point"""
+        if point['time'] is None:
+            return
+        if self.started_at is None:
+            self.started_at = point['time']
+
+        offset = int((point['time'] - self.started_at).total_seconds())
+        if offset < 0:
+            return
+
+        if point['hr']:
+            self._append('heart_rate', offset, point['hr'])
+        if point['ele'] is not None:
+            self._append('elevation', offset, point['ele'])
+        if distance_m is not None:
+            self._append('distance', offset, distance_m)
+            if self._previous is not None and offset > self._previous[0]:
+                speed = max(distance_m - self._previous[1], 0.0) / (offset - self._previous[0])
+                self._append('speed', offset, speed)
+            self._previous = (offset, distance_m)
+
+    def encoded(self):
+        """(channel, sample count, blob) for every channel that has samples"""
+        return [
+            (channel, len(offsets), encode_stream(offsets, values, SAMPLE_CHANNELS[channel][1]))
+            for channel, (offsets, values) in self.channels.items()
+            if offsets
+        ]
+
+
+def store_streams(cursor, athlete_id, import_id, recorder):
+    """Write a recorder's channels inside the caller's transaction"""
+    rows = [
+        (athlete_id, import_id, channel, recorder.started_at, count, SAMPLE_CHANNELS[channel][1], blob)
+        for channel, count, blob in recorder.encoded()
+    ]
+    if not rows:
+        return 0
+
+    cursor.executemany("""
+        INSERT INTO activity_sample_streams
+        (athlete_id, import_id, channel, started_at, sample_count, value_scale, samples)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE started_at = VALUES(started_at), sample_count = VALUES(sample_count),
+                                value_scale = VALUES(value_scale), samples = VALUES(samples)
+    """, rows)
+    return len(rows)
+
+
+def parse_stream_points(value):
+    if value is None:
+        return DEFAULT_STREAM_POINTS
+    points = int(value)
+    return 0 if points <= 0 else min(points, MAX_STREAM_POINTS)
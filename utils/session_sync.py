@@ -0,0 +1,323 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
+
+from utils.adherence import record_workout
+from utils.training_calendar import LOGGED_STATUSES, close_session_instance
+
+# Per request; the rest of a longer queue is deferred to the next round trip
+MAX_SYNC_SESSIONS = 50
+MAX_SYNC_SETS = 2000
+
+# Client-generated ids (UUIDs in practice) are stored as given
+MAX_CLIENT_ID_LENGTH = 64
+
+# Oldest queued session a client may still sync
+SYNC_MAX_AGE_DAYS = 30
+
+# Inserts the log, or on a replayed client id leaves it alone and still
+# reports its log_id through lastrowid (rowcount 0)
+SYNC_LOG_INSERT = """
+    INSERT INTO workout_logs
+    (athlete_id, session_id, completed_date, completion_status, notes, client_log_id)
+    VALUES (%s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE log_id = LAST_INSERT_ID(log_id)
+"""
+
+SYNC_SET_INSERT = """
+    INSERT INTO workout_set_results
+    (log_id, athlete_id, client_set_id, exercise_id, exercise_name, order_number, set_number,
+     status, reps, weight, duration_seconds, recorded_at)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE result_id = result_id
+"""
+
+
+def _client_id(entry, field='client_id'):
+    value = entry.get(field)
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError(f'{field} is required')
+    value = value.strip()
+    if len(value) > MAX_CLIENT_ID_LENGTH:
+        raise ValueError(f'{field} is longer than {MAX_CLIENT_ID_LENGTH} characters')
+    return value
+
+
+def _optional_int(entry, field):
+    value = entry.get(field)
+    if value in (None, ''):
+        return None
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'{field} must be an integer')
+    if number < 0:
+        raise ValueError(f'{field} must not be negative')
+    return number
+
+
+def _optional_decimal(entry, field):
+    value = entry.get(field)
+    if value in (None, ''):
+        return None
+    try:
+        number = Decimal(str(value))
+    except (InvalidOperation, ValueError):
+        raise ValueError(f'{field} must be a number')
+    if not number.is_finite() or number < 0:
+        raise ValueError(f'{field} is out of range')
+    return number.quantize(Decimal('0.01'))
+
+
+def _recorded_at(entry):
+    value = entry.get('recorded_at')
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).replace(tzinfo=None)
+    except ValueError:
+        raise ValueError('recorded_at must be an ISO 8601 timestamp')
+
+
+def parse_set_result(entry):
+    if not isinstance(entry, dict):
+        raise ValueError('set result must be an object')
+
+    status = entry.get('status', 'completed')
+    if status not in LOGGED_STATUSES:
+        raise ValueError(f'status must be one of {", ".join(LOGGED_STATUSES)}')
+
+    return {
+        'client_id': _client_id(entry),
+        'exercise_id': _optional_int(entry, 'exercise_id'),
+        'exercise_name': str(entry.get('exercise_name') or '')[:255] or None,
+        'order_number': _optional_int(entry, 'order_number'),
+        'set_number': _optional_int(entry, 'set_number') or 1,
+        'status': status,
+        'reps': _optional_int(entry, 'reps'),
+        'weight': _optional_decimal(entry, 'weight'),
+        'duration_seconds': _optional_int(entry, 'duration_seconds'),
+        'recorded_at': _recorded_at(entry),
+    }
+
+
+def parse_sync_session(entry, today):
+    if not isinstance(entry, dict):
+        raise ValueError('session must be an object')
+
+    session_id = _optional_int(entry, 'session_id')
+    if not session_id:
+        raise ValueError('session_id is required')
+
+    status = entry.get('completion_status', 'completed')
+    if status not in LOGGED_STATUSES:
+        raise ValueError(f'completion_status must be one of {", ".join(LOGGED_STATUSES)}')
+
+    # The day the athlete trained, which may be before the day the queue reaches us
+    try:
+        completed_date = date.fromisoformat(str(entry.get('completed_date') or today.isoformat()))
+    except ValueError:
+        raise ValueError('completed_date must be YYYY-MM-DD')
+    if completed_date > today or completed_date < today - timedelta(days=SYNC_MAX_AGE_DAYS):
+        raise ValueError(f'completed_date must be within the last {SYNC_MAX_AGE_DAYS} days')
+
+    sets = entry.get('sets') or []
+    if not isinstance(sets, list):
+        raise ValueError('sets must be a list')
+
+    parsed_sets = []
+    for index, set_entry in enumerate(sets):
+        try:
+            parsed_sets.append(parse_set_result(set_entry))
+        except ValueError as e:
+            raise ValueError(f'sets[{index}]: {e}')
+
+    return {
+        'client_id': _client_id(entry),
+        'session_id': session_id,
+        'instance_id': _optional_int(entry, 'instance_id'),
+        'completion_status': status,
+        'completed_date': completed_date,
+        'notes': entry.get('notes'),
+        'sets': parsed_sets,
+    }
+
+
+class SyncBatch:
+    """
+    A queue split into what this request applies, entries rejected for good
+    (the client drops them) and entries deferred to a later request.
+    """
+
+    def __init__(self):
+        self.sessions = []
+        self.rejected = []
+        self.deferred = []
+
+    def reject(self, index, client_id, message):
+        self.rejected.append({'index': index, 'client_id': client_id, 'error': message})
+
+
+def _entry_client_id(entry):
+    try:
+        return _client_id(entry)
+    except (AttributeError, ValueError):
+        return None
+
+
+def parse_sync_payload(payload, today=None):
+    """
+    Validate a queued-sessions payload entry by entry. A bad entry is
+    rejected on its own, so it never blocks the rest of the queue; entries
+    past the per-request limits are deferred. Raises ValueError only when the
+    payload is not a queue at all.
+    """
+    today = today or date.today()
+    sessions = payload.get('sessions') if isinstance(payload, dict) else None
+    if not isinstance(sessions, list) or not sessions:
+        raise ValueError('sessions must be a non-empty list')
+
+    batch = SyncBatch()
+    session_ids = set()
+    set_ids = set()
+    set_count = 0
+
+    for index, entry in enumerate(sessions):
+        client_id = _entry_client_id(entry)
+        if client_id is not None and client_id in session_ids:
+            # The same queued session twice; the first copy answers for both
+            continue
+
+        if len(batch.sessions) >= MAX_SYNC_SESSIONS:
+            if client_id is not None:
+                batch.deferred.append(client_id)
+            continue
+
+        try:
+            session = parse_sync_session(entry, today)
+        except ValueError as e:
+            batch.reject(index, client_id, str(e))
+            continue
+
+        session_set_ids = {result['client_id'] for result in session['sets']}
+        if len(session_set_ids) != len(session['sets']) or session_set_ids & set_ids:
+            batch.reject(index, client_id, 'set client ids must be unique')
+            continue
+
+        if set_count + len(session['sets']) > MAX_SYNC_SETS:
+            if len(session['sets']) > MAX_SYNC_SETS:
+                batch.reject(index, client_id, f'At most {MAX_SYNC_SETS} set results per session')
+            else:
+                batch.deferred.append(client_id)
+            continue
+
+        session_ids.add(session['client_id'])
+        set_ids |= session_set_ids
+        set_count += len(session['sets'])
+        batch.sessions.append(session)
+
+    return batch
+
+
+def apply_session_sync(cursor, athlete_id, batch):
+    """
+    Write a SyncBatch's sessions and their set results inside the caller's
+    transaction. A session whose client id was already synced is not logged
+    again (no second calendar close, streak or adherence count), but set
+    results it brings that the server has not seen yet are still stored.
+
+    Each session runs under its own savepoint: one the database refuses
+    (e.g. a deleted session_id) is rolled back alone and added to
+    batch.rejected. Any other database error aborts the whole sync.
+
+    Returns {client_id: {'log_id', 'instance_id', 'duplicate'}}.
+    """
+    from MySQLdb import DataError, IntegrityError
+
+    outcome = {}
+
+    # Queues from several devices arrive in any order; streaks fold days oldest first
+    for session in sorted(batch.sessions, key=lambda session: session['completed_date']):
+        cursor.execute("SAVEPOINT sync_session")
+        try:
+            outcome[session['client_id']] = _apply_session(cursor, athlete_id, session)
+        except (DataError, IntegrityError) as e:
+            cursor.execute("ROLLBACK TO SAVEPOINT sync_session")
+            batch.reject(None, session['client_id'], f'Could not be saved: {e.args[-1] if e.args else e}')
+        cursor.execute("RELEASE SAVEPOINT sync_session")
+
+    return outcome
+
+
+def _apply_session(cursor, athlete_id, session):
+    cursor.execute(SYNC_LOG_INSERT, (
+        athlete_id,
+        session['session_id'],
+        session['completed_date'],
+        session['completion_status'],
+        session['notes'],
+        session['client_id'],
+    ))
+    log_id = cursor.lastrowid
+    created = cursor.rowcount == 1
+
+    instance_id = None
+    if created:
+        instance_id = close_session_instance(
+            cursor, athlete_id, session['session_id'], log_id,
+            session['completion_status'], session['instance_id']
+        )
+        record_workout(cursor, athlete_id, session['completed_date'], session['completion_status'])
+
+    if session['sets']:
+        cursor.executemany(SYNC_SET_INSERT, [
+            (
+                log_id, athlete_id, result['client_id'], result['exercise_id'], result['exercise_name'],
+                result['order_number'], result['set_number'], result['status'], result['reps'],
+                result['weight'], result['duration_seconds'], result['recorded_at'],
+            )
+            for result in session['sets']
+        ])
+
+    return {'log_id': log_id, 'instance_id': instance_id, 'duplicate': not created}
+
+
+def load_sync_state(cursor, athlete_id, client_ids):
+    """Server copy of the synced logs, with the set result ids stored for each"""
+    if not client_ids:
+        return []
+
+    placeholders = ', '.join(['%s'] * len(client_ids))
+    cursor.execute(f"""
+        SELECT wl.log_id, wl.client_log_id, wl.session_id, wl.completed_date, wl.completion_status,
+               wl.notes, si.instance_id
+        FROM workout_logs wl
+        LEFT JOIN athlete_session_instances si ON si.log_id = wl.log_id
+        WHERE wl.athlete_id = %s AND wl.client_log_id IN ({placeholders})
+    """, (athlete_id, *client_ids))
+    logs = cursor.fetchall()
+    if not logs:
+        return []
+
+    cursor.execute(f"""
+        SELECT log_id, client_set_id
+        FROM workout_set_results
+        WHERE log_id IN ({', '.join(['%s'] * len(logs))})
+        ORDER BY order_number, set_number, result_id
+    """, tuple(log['log_id'] for log in logs))
+    set_ids = {}
+    for row in cursor.fetchall():
+        set_ids.setdefault(row['log_id'], []).append(row['client_set_id'])
+
+    return [
+        {
+            'client_id': log['client_log_id'],
+            'log_id': log['log_id'],
+            'session_id': log['session_id'],
+            'instance_id': log['instance_id'],
+            'completed_date': log['completed_date'].isoformat() if log['completed_date'] else None,
+            'completion_status': log['completion_status'],
+            'notes': log['notes'],
+            'set_ids': set_ids.get(log['log_id'], []),
+        }
+        for log in logs
+    ]
@@ -0,0 +1,160 @@
+from datetime import date, datetime, timedelta
+
+# SQL expressions that map a performance_tracking date onto the first day of its bucket.
+# '%%' is escaped for MySQLdb parameter substitution.
+BUCKET_EXPRESSIONS = {
+    'day': "DATE_FORMAT(pt.date, '%%Y-%%m-%%d')",
+    'week': "DATE_FORMAT(DATE_SUB(pt.date, INTERVAL WEEKDAY(pt.date) DAY), '%%Y-%%m-%%d')",
+    'month': "DATE_FORMAT(pt.date, '%%Y-%%m-01')",
+}
+
+# Per-bucket aggregates selected next to one of the bucket expressions above.
+# last_value is the value of the most recent record in the bucket.
+BUCKET_AGGREGATES = """
+    MIN(pt.metric_value) as min_value,
+    MAX(pt.metric_value) as max_value,
+    AVG(pt.metric_value) as avg_value,
+    COUNT(*) as count,
+    SUBSTRING_INDEX(
+        GROUP_CONCAT(pt.metric_value ORDER BY pt.date DESC, pt.performance_id DESC),
+        ',', 1
+    ) as last_value
+"""
+
+# 'buckets' returns SQL aggregates per bucket; 'lttb' returns raw records
+# downsampled to max_points with largest-triangle-three-buckets
+SERIES_MODES = ('buckets', 'lttb')
+
+# How far back to look when the client doesn't send a start date
+DEFAULT_WINDOW_DAYS = {
+    'day': 90,
+    'week': 364,
+    'month': 730,
+}
+
+DEFAULT_MAX_POINTS = 60
+MAX_POINTS_LIMIT = 500
+
+
+def resolve_date_range(bucket, start=None, end=None):
+    """Return (start, end) as YYYY-MM-DD strings, defaulting to the bucket's window"""
+    end_date = datetime.strptime(end, '%Y-%m-%d').date() if end else datetime.now().date()
+    if start:
+        start_date = datetime.strptime(start, '%Y-%m-%d').date()
+    else:
+        start_date = end_date - timedelta(days=DEFAULT_WINDOW_DAYS[bucket])
+
+    if start_date > end_date:
+        raise ValueError('start must be before end')
+
+    return start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')
+
+
+def parse_max_points(value):
+    """Clamp the requested number of points per series"""
+    if value is None:
+        return DEFAULT_MAX_POINTS
+    return max(1, min(int(value), MAX_POINTS_LIMIT))
+
+
+def bucket_point(row):
+    """Turn an aggregated SQL row into a JSON friendly bucket point"""
+    return {
+        'bucket': row['bucket'],
+        'min': float(row['min_value']),
+        'max': float(row['max_value']),
+        'avg': round(float(row['avg_value']), 2),
+        'count': int(row['count']),
+        'last': float(row['last_value']),
+    }
+
+
+def merge_points(points):
+    """Combine consecutive bucket points (sorted oldest first) into one"""
+    total = sum(p['count'] for p in points)
+    return {
+        'bucket': points[0]['bucket'],
+        'min': min(p['min'] for p in points),
+        'max': max(p['max'] for p in points),
+        'avg': round(sum(p['avg'] * p['count'] for p in points) / total, 2),
+        'count': total,
+        'last': points[-1]['last'],
+    }
+
+
+def cap_series(points, max_points):
+    """
+    Keep a series at or below max_points by merging adjacent buckets.
+    The whole date range stays covered; resolution drops instead.
+    """
+    if len(points) <= max_points:
+        return points
+
+    group_size = -(-len(points) // max_points)
+    return [merge_points(points[i:i + group_size]) for i in range(0, len(points), group_size)]
+
+
+def group_series(rows, max_points):
+    """
+    Group aggregated rows ordered by (athlete_id, metric_type, bucket) into
+    {athlete_id: {metric_type: [points]}} with every series capped.
+    """
+    grouped = {}
+    for row in rows:
+        metrics = grouped.setdefault(row['athlete_id'], {})
+        metrics.setdefault(row['metric_type'], []).append(bucket_point(row))
+
+    for metrics in grouped.values():
+        for metric_type, points in metrics.items():
+            metrics[metric_type] = cap_series(points, max_points)
+
+    return grouped
+
+
+def largest_triangle_three_buckets(points, threshold):
+    """
+    Downsample (x, y) points sorted by x to at most threshold points while
+    keeping the visual shape of the line: the first and last points are kept,
+    and from every bucket in between the point forming the largest triangle
+    with the previously kept point and the next bucket's average is chosen.
+    Below three points there are no buckets; the endpoints alone are kept.
+    """
+    count = len(points)
+    if threshold >= count:
+        return list(points)
+    if threshold < 3:
+        return [points[0]] if threshold <= 1 else [points[0], points[-1]]
+
+    sampled = [points[0]]
+    every = (count - 2) / (threshold - 2)
+    previous = 0
+
+    for i in range(threshold - 2):
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, count)
+        next_points = points[next_start:next_end]
+        avg_x = sum(p[0] for p in next_points) / len(next_points)
+        avg_y = sum(p[1] for p in next_points) / len(next_points)
+
+        prev_x, prev_y = points[previous]
+        best, best_area = None, -1.0
+        for index in range(int(i * every) + 1, next_start):
+            x, y = points[index]
+            area = abs((prev_x - avg_x) * (y - prev_y) - (prev_x - x) * (avg_y - prev_y))
+            if area > best_area:
+                best, best_area = index, area
+
+        sampled.append(points[best])
+        previous = best
+
+    sampled.append(points[-1])
+    return sampled
+
+
+def downsample_records(rows, max_points):
+    """Downsample raw (date, metric_value) rows ordered by date into chart points"""
+    points = [(row['date'].toordinal(), float(row['metric_value'])) for row in rows]
+    return [
+        {'date': date.fromordinal(x).strftime('%Y-%m-%d'), 'value': y}
+        for x, y in largest_triangle_three_buckets(points, max_points)
+    ]
@@ -0,0 +1,197 @@
+from datetime import date, datetime, timedelta
+
+from utils.adherence import refresh_planned_weeks
+
+# Days after the scheduled date an athlete can still log a session before it counts as missed
+SESSION_GRACE_DAYS = 1
+
+# workout_logs.completion_status values; each closes the matching calendar instance
+LOGGED_STATUSES = ('completed', 'partial', 'skipped')
+
+CALENDAR_VIEWS = ('today', 'week', 'missed', 'range')
+
+CALENDAR_SELECT = """
+    SELECT si.instance_id, si.athlete_id, si.plan_id, si.session_id, si.log_id,
+           si.scheduled_date, si.due_date, si.completed_at,
+           IF(si.status = 'scheduled' AND si.due_date < CURDATE(), 'missed', si.status) AS status,
+           ws.session_name, ws.day_number, ws.description, wp.plan_name
+    FROM athlete_session_instances si
+    JOIN workout_sessions ws ON si.session_id = ws.session_id
+    JOIN workout_plans wp ON si.plan_id = wp.plan_id
+"""
+
+
+def parse_start_date(value):
+    """Plan start date from a request payload; defaults to today"""
+    if not value:
+        return date.today()
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+def build_schedule(sessions, start_date, duration_weeks=None):
+    """
+    Expand a plan's relative sessions into dated (session_id, scheduled, due) rows.
+
+    Sessions are placed day_number - 1 days after the start date. Plans whose
+    sessions fit in whole weeks repeat that block for duration_weeks.
+    """
+    if not sessions:
+        return []
+
+    last_day = max(int(session['day_number'] or 1) for session in sessions)
+    cycle_days = 7 * -(-last_day // 7)
+    total_days = 7 * int(duration_weeks) if duration_weeks else cycle_days
+    cycles = max(total_days // cycle_days, 1)
+
+    schedule = []
+    for cycle in range(cycles):
+        for session in sessions:
+            scheduled = start_date + timedelta(days=cycle * cycle_days + int(session['day_number'] or 1) - 1)
+            schedule.append((session['session_id'], scheduled, scheduled + timedelta(days=SESSION_GRACE_DAYS)))
+
+    schedule.sort(key=lambda row: (row[1], row[0]))
+    return schedule
+
+
+def materialize_plan(cursor, plan_id, athlete_id, start_date, duration_weeks=None):
+    """
+    Write dated session instances for a plan assigned to an athlete, inside the
+    caller's transaction. Instances that already exist are left untouched.
+
+    Returns the number of instances inserted.
+    """
+    if not athlete_id:
+        return 0
+
+    cursor.execute("""
+        SELECT session_id, day_number FROM workout_sessions WHERE plan_id = %s
+    """, (plan_id,))
+    schedule = build_schedule(cursor.fetchall(), start_date, duration_weeks)
+
+    if not schedule:
+        return 0
+
+    cursor.executemany("""
+        INSERT IGNORE INTO athlete_session_instances
+        (athlete_id, plan_id, session_id, scheduled_date, due_date, status)
+        VALUES (%s, %s, %s, %s, %s, 'scheduled')
+    """, [(athlete_id, plan_id, session_id, scheduled, due) for session_id, scheduled, due in schedule])
+    inserted = cursor.rowcount
+
+    refresh_planned_weeks(cursor, athlete_id, schedule[0][1], schedule[-1][1])
+    return inserted
+
+
+def reschedule_plan(cursor, plan_id, athlete_id, start_date, duration_weeks=None):
+    """
+    Bring a plan's calendar in line after its athlete, start date or sessions
+    change. Logged instances are history and are kept; everything still open
+    is dropped and rebuilt from the current plan.
+    """
+    # Weeks losing open sessions, possibly of an athlete the plan no longer belongs to
+    cursor.execute("""
+        SELECT athlete_id, MIN(scheduled_date) AS first_date, MAX(scheduled_date) AS last_date
+        FROM athlete_session_instances
+        WHERE plan_id = %s AND status = 'scheduled'
+        GROUP BY athlete_id
+    """, (plan_id,))
+    dropped = cursor.fetchall()
+
+    cursor.execute("""
+        DELETE FROM athlete_session_instances
+        WHERE plan_id = %s AND status = 'scheduled'
+    """, (plan_id,))
+
+    for row in dropped:
+        refresh_planned_weeks(cursor, row['athlete_id'], row['first_date'], row['last_date'])
+
+    return materialize_plan(cursor, plan_id, athlete_id, start_date, duration_weeks)
+
+
+def materialize_all_plans(mysql):
+    """
+    Backfill calendars for every plan assigned to an athlete. Plans without a
+    start date are scheduled from the day they were created.
+
+    Returns (plans, instances inserted).
+    """
+    cursor = mysql.connection.cursor()
+    try:
+        cursor.execute("""
+            SELECT plan_id, athlete_id, duration_weeks,
+                   COALESCE(start_date, DATE(created_at)) AS start_date
+            FROM workout_plans
+            WHERE athlete_id IS NOT NULL
+        """)
+        plans = cursor.fetchall()
+
+        inserted = 0
+        for plan in plans:
+            inserted += materialize_plan(
+                cursor, plan['plan_id'], plan['athlete_id'], plan['start_date'], plan['duration_weeks']
+            )
+
+        mysql.connection.commit()
+        return len(plans), inserted
+    except Exception:
+        mysql.connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def close_session_instance(cursor, athlete_id, session_id, log_id, completion_status, instance_id=None):
+    """
+    Link a new workout log to its calendar instance. Without an explicit
+    instance_id, the open instance of that session scheduled closest to today
+    is closed. Returns the instance id, or None when nothing was scheduled.
+    """
+    status = completion_status if completion_status in LOGGED_STATUSES else 'completed'
+
+    if instance_id:
+        cursor.execute("""
+            SELECT instance_id FROM athlete_session_instances
+            WHERE instance_id = %s AND athlete_id = %s AND session_id = %s AND status = 'scheduled'
+            FOR UPDATE
+        """, (instance_id, athlete_id, session_id))
+    else:
+        cursor.execute("""
+            SELECT instance_id FROM athlete_session_instances
+            WHERE athlete_id = %s AND session_id = %s AND status = 'scheduled'
+            ORDER BY ABS(DATEDIFF(scheduled_date, CURDATE())), scheduled_date
+            LIMIT 1
+            FOR UPDATE
+        """, (athlete_id, session_id))
+
+    row = cursor.fetchone()
+    if not row:
+        return None
+
+    cursor.execute("""
+        UPDATE athlete_session_instances
+        SET status = %s, log_id = %s, completed_at = NOW()
+        WHERE instance_id = %s
+    """, (status, log_id, row['instance_id']))
+
+    return row['instance_id']
+
+
+def calendar_window(view, start=None, end=None, today=None):
+    """Date range (inclusive) for a calendar view; raises ValueError on bad input"""
+    today = today or date.today()
+
+    if view == 'today':
+        return today, today
+    if view == 'week':
+        week_start = today - timedelta(days=today.weekday())
+        return week_start, week_start + timedelta(days=6)
+    if view == 'range':
+        if not start or not end:
+            raise ValueError('start and end are required for a range view')
+        start_date = datetime.strptime(start, '%Y-%m-%d').date()
+        end_date = datetime.strptime(end, '%Y-%m-%d').date()
+        if end_date < start_date:
+            raise ValueError('end must not be before start')
+        return start_date, end_date
+
+    raise ValueError(f'view must be one of {", ".join(CALENDAR_VIEWS)}')